@@ -36,7 +36,9 @@ from charms.istio_ingress_k8s.v0.istio_ingress_route import (
     ProtocolType,
     HTTPMethod,
     HTTPRouteMatch,
+    HTTPRouteTimeouts,
     HTTPPathMatch,
+    BackendTrafficPolicy,
     PathMatchType,
     GRPCMethodMatch,
     GRPCRouteMatch,
@@ -74,6 +76,8 @@ class MyCharm(CharmBase):
                       )
                   ],
                   backends=[BackendRef(service=self.app.name, port=3200)],
+                  # Optional: give up on slow requests instead of holding gateway connections
+                  timeouts=HTTPRouteTimeouts(request="30s", backendRequest="10s"),
               ),
           ],
           grpc_routes=[
@@ -148,6 +152,7 @@ class IstioIngressCharm(CharmBase):
 """
 
 import logging
+import re
 from abc import ABC
 from enum import Enum
 from typing import List, Optional, Union
@@ -166,7 +171,7 @@ LIBAPI = 0
 
 # Increment this PATCH version before using `charmcraft publish-lib` or reset
 # to 0 if you are raising the major API version
-LIBPATCH = 3
+LIBPATCH = 8
 
 log = logging.getLogger(__name__)
 
@@ -251,6 +256,55 @@ def to_gateway_protocol(protocol: ProtocolType, tls_enabled: bool = False) -> st
 # -------------------------------------------------------------------
 # Base Models
 # -------------------------------------------------------------------
+class ListenerRateLimit(BaseModel):
+    """Local rate limit of a listener, enforced by each gateway replica with a token bucket.
+
+    Requests beyond the limit are rejected with 429 (Too Many Requests).  It is only honoured on
+    a listener that no other charm uses, so not on ports 80 and 443 of the istio-ingress charm's
+    ingress relation, and the stricter of it and the limit configured on the istio-ingress charm applies.
+    """
+
+    requestsPerSecond: int = Field(
+        ge=1, le=1_000_000,
+        description="Sustained number of requests per second"
+    )
+    burst: Optional[int] = Field(
+        default=None, ge=1, le=10_000_000,
+        description="Number of requests allowed in a burst, defaults to requestsPerSecond"
+    )
+
+
+class CompressionAlgorithm(str, Enum):
+    """Algorithms the gateway can compress responses with."""
+
+    GZIP = "gzip"
+    BROTLI = "brotli"
+    ZSTD = "zstd"
+
+
+class ListenerCompression(BaseModel):
+    """Compression of the responses served by a listener.
+
+    It is only honoured on a listener that no other charm uses, so not on ports 80 and 443 of
+    the istio-ingress charm's ingress relation, and only if no compression is configured on the
+    istio-ingress charm, which then applies instead.  An empty list of algorithms requests no
+    compression.
+    """
+
+    algorithms: List[CompressionAlgorithm] = Field(
+        max_length=3,
+        description="Algorithms to compress with, the preferred first"
+    )
+    minContentLength: int = Field(
+        default=1024, ge=0, le=10_485_760,
+        description="Minimum size, in bytes, of the responses to compress"
+    )
+    contentTypes: Optional[List[str]] = Field(
+        default=None, max_length=50,
+        description="Content types of the responses to compress, defaults to common text types"
+    )
+
+
 class Listener(BaseModel):
     """Gateway listener configuration.
 
@@ -263,6 +317,14 @@ class Listener(BaseModel):
 
     port: int = Field(ge=1, le=65535, description="Port number")
     protocol: ProtocolType = Field(description="Protocol type")
+    rateLimit: Optional[ListenerRateLimit] = Field(
+        default=None,
+        description="Local rate limit of the requests to this listener"
+    )
+    compression: Optional[ListenerCompression] = Field(
+        default=None,
+        description="Compression of the responses served by this listener"
+    )
     # TODO: uncomment the below when support is added for both wildcards and using subdomains
     # hostname: Optional[str] = Field(default=None, description="Hostname binding for this listener")
 
@@ -514,6 +576,163 @@ HTTPRouteFilter = Union[URLRewriteFilter, RequestRedirectFilter]
 GRPCRouteFilter = Union[RequestRedirectFilter]
 
 
+# -------------------------------------------------------------------
+# Timeouts
+# -------------------------------------------------------------------
+# Gateway API duration format (GEP-2257), e.g. "500ms", "30s" or "1m30s"
+_DURATION_PATTERN = re.compile(r"^([0-9]{1,5}(h|m|s|ms)){1,4}$")
+_DURATION_UNIT_MS = {"h": 3_600_000, "m": 60_000, "s": 1_000, "ms": 1}
+# Upper bound of route timeouts, so that no route can pin gateway connections indefinitely
+MAX_ROUTE_TIMEOUT_MS = 3_600_000
+
+
+def _duration_ms(duration: str) -> int:
+    """Return a Gateway API duration in milliseconds."""
+    if not _DURATION_PATTERN.match(duration):
+        raise ValueError(
+            f"invalid duration {duration!r}: expected a Gateway API duration, e.g. '500ms' or '1m30s'"
+        )
+    return sum(
+        int(value) * _DURATION_UNIT_MS[unit]
+        for value, unit in re.findall(r"([0-9]+)(ms|h|m|s)", duration)
+    )
+
+
+class HTTPRouteTimeouts(BaseModel):
+    """Timeouts of an HTTP route, as Gateway API durations (e.g. "500ms", "30s" or "1m30s").
+
+    Both timeouts must be positive and at most one hour, and `backendRequest` can't be longer
+    than `request`.
+    """
+
+    request: Optional[str] = Field(
+        default=None,
+        description="Timeout for the gateway to respond to the client, retries included"
+    )
+    backendRequest: Optional[str] = Field(
+        default=None,
+        description="Timeout of each request from the gateway to the backend"
+    )
+
+    @field_validator("request", "backendRequest")
+    @classmethod
+    def validate_duration(cls, value: Optional[str]) -> Optional[str]:
+        """Validate that a timeout is a positive, bounded duration."""
+        if value is not None and not 0 < _duration_ms(value) <= MAX_ROUTE_TIMEOUT_MS:
+            raise ValueError(f"timeout {value!r} must be positive and at most 1h")
+        return value
+
+    @model_validator(mode="after")
+    def validate_backend_request(self):
+        """Validate that a single backend request can't outlive the whole request."""
+        if (
+            self.request
+            and self.backendRequest
+            and _duration_ms(self.backendRequest) > _duration_ms(self.request)
+        ):
+            raise ValueError("backendRequest timeout cannot be longer than the request timeout")
+        return self
+
+
+# -------------------------------------------------------------------
+# Backend Traffic Policy
+# -------------------------------------------------------------------
+class LoadBalancerType(str, Enum):
+    """Algorithms the gateway can use to balance requests across the endpoints of a backend."""
+
+    ROUND_ROBIN = "ROUND_ROBIN"
+    LEAST_REQUEST = "LEAST_REQUEST"
+    RANDOM = "RANDOM"
+
+
+# HTTP header and cookie names are RFC 9110 tokens
+_TOKEN_PATTERN = r"^[A-Za-z0-9!#$%&'*+.^_`|~-]+$"
+
+
+class HashCookie(BaseModel):
+    """Cookie to hash for session affinity.
+
+    If the client has no such cookie, the gateway sets one, unless `ttlSeconds` is unset.  A
+    `ttlSeconds` of 0 makes it a session cookie.
+    """
+
+    name: str = Field(
+        min_length=1, max_length=256, pattern=_TOKEN_PATTERN,
+        description="Name of the cookie"
+    )
+    path: Optional[str] = Field(default=None, description="Path of the cookie")
+    ttlSeconds: Optional[int] = Field(
+        default=None, ge=0, le=31_536_000,
+        description="Lifetime of the cookie set by the gateway"
+    )
+
+
+class ConsistentHash(BaseModel):
+    """Consistent-hash load balancing, pinning the requests with the same key to the same endpoint.
+
+    Exactly one of `httpHeaderName`, `httpCookie` and `useSourceIp` must be set.
+    """
+
+    httpHeaderName: Optional[str] = Field(
+        default=None, min_length=1, max_length=256, pattern=_TOKEN_PATTERN,
+        description="Hash on the value of this request header"
+    )
+    httpCookie: Optional[HashCookie] = Field(
+        default=None,
+        description="Hash on the value of this cookie"
+    )
+    useSourceIp: Optional[bool] = Field(
+        default=None,
+        description="Hash on the IP address of the client"
+    )
+
+    @model_validator(mode="after")
+    def validate_single_key(self):
+        """Validate that exactly one hash key is set."""
+        keys = [self.httpHeaderName, self.httpCookie, self.useSourceIp or None]
+        if sum(key is not None for key in keys) != 1:
+            raise ValueError(
+                "exactly one of httpHeaderName, httpCookie and useSourceIp must be set"
+            )
+        return self
+
+
+class BackendTrafficPolicy(BaseModel):
+    """Hints on how the gateway should talk to the backends of a route.
+
+    Unset fields fall back to the defaults configured on the istio-ingress charm.
+    """
+
+    maxConnections: Optional[int] = Field(
+        default=None, ge=1, le=100_000,
+        description="Maximum number of connections to each backend"
+    )
+    maxRequestsPerConnection: Optional[int] = Field(
+        default=None, ge=1, le=100_000,
+        description="Maximum number of requests per connection to a backend"
+    )
+    http2MaxRequests: Optional[int] = Field(
+        default=None, ge=1, le=1_000_000,
+        description="Maximum number of concurrent requests to each backend"
+    )
+    idleTimeoutSeconds: Optional[int] = Field(
+        default=None, ge=1, le=86_400,
+        description="Time after which an idle connection to a backend is closed"
+    )
+    consecutive5xxErrors: Optional[int] = Field(
+        default=None, ge=1, le=1_000,
+        description="Number of consecutive 5xx errors after which an endpoint is ejected"
+    )
+    loadBalancer: Optional[LoadBalancerType] = Field(
+        default=None,
+        description="Load balancing algorithm across the endpoints of a backend"
+    )
+    consistentHash: Optional[ConsistentHash] = Field(
+        default=None,
+        description="Session affinity across the endpoints of a backend, instead of loadBalancer"
+    )
+
+
 # -------------------------------------------------------------------
 # Route Base Classes
 # -------------------------------------------------------------------
@@ -534,6 +753,10 @@ class _L7Route(_Route, ABC):
     """Base class for Layer 7 routes."""
 
     hostnames: Optional[List[str]] = Field(default=None, description="Hostnames to match")
+    trafficPolicy: Optional[BackendTrafficPolicy] = Field(
+        default=None,
+        description="Hints on how the gateway should talk to the backends of this route"
+    )
 
 
 # -------------------------------------------------------------------
@@ -547,6 +770,10 @@ class HTTPRoute(_L7Route):
         default=None,
         description="Filters to apply to requests matching this route"
     )
+    timeouts: Optional[HTTPRouteTimeouts] = Field(
+        default=None,
+        description="Timeouts of requests matching this route"
+    )
 
     @property
     def protocol(self) -> ProtocolType:
@@ -4,11 +4,12 @@
 # See LICENSE file for licensing details.
 
 """Istio Ingress Charm."""
+import functools
 import ipaddress
+import json
 import logging
 import re
-import time
-from typing import Any, Dict, List, Optional, Tuple, cast
+from typing import Any, Callable, Dict, Iterable, List, Optional, Set, Tuple, cast
 from urllib.parse import urlparse
 
 from canonical_service_mesh.enums import Action
@@ -65,6 +66,7 @@ from charmlibs.interfaces.gateway_metadata import GatewayMetadata, GatewayMetada
 from charmlibs.interfaces.istio_ingress_route import IstioIngressRouteProvider
 from charmlibs.interfaces.istio_request_auth import IstioRequestAuthProvider
 from charmlibs.interfaces.service_mesh import MeshType
+from charms.istio_ingress_k8s.v0.istio_ingress_route import IstioIngressRouteConfig
 from charms.oauth2_proxy_k8s.v0.forward_auth import ForwardAuthRequirer, ForwardAuthRequirerConfig
 from charms.observability_libs.v1.cert_handler import CertHandler
 from charms.prometheus_k8s.v0.prometheus_scrape import MetricsEndpointProvider
@@ -76,40 +78,49 @@ from lightkube.generic_resource import create_namespaced_resource
 from lightkube.models.autoscaling_v2 import (
     CrossVersionObjectReference,
     HorizontalPodAutoscalerSpec,
+    MetricSpec,
+    MetricTarget,
+    ResourceMetricSource,
 )
-from lightkube.models.meta_v1 import ObjectMeta
+from lightkube.models.core_v1 import ServicePort, ServiceSpec
+from lightkube.models.meta_v1 import LabelSelector, ObjectMeta
+from lightkube.models.policy_v1 import PodDisruptionBudgetSpec
 from lightkube.resources.apps_v1 import Deployment
 from lightkube.resources.autoscaling_v2 import HorizontalPodAutoscaler
-from lightkube.resources.core_v1 import Secret, Service
+from lightkube.resources.core_v1 import ConfigMap, Secret, Service
+from lightkube.resources.policy_v1 import PodDisruptionBudget
 from lightkube.types import PatchType
 from ops import BlockedStatus, CollectStatusEvent, main, tracing
-from ops.charm import CharmBase
-from ops.model import ActiveStatus, MaintenanceStatus
-from ops.pebble import ChangeError, Layer
+from ops.charm import CharmBase, PebbleCustomNoticeEvent
+from ops.framework import StoredState
+from ops.model import ActiveStatus, MaintenanceStatus, Relation, WaitingStatus
+from ops.pebble import ChangeError, Layer, NoticeType
+from pydantic import ValidationError
 
 from utils import (
     INGRESS_AUTHENTICATED_NAME,
     INGRESS_UNAUTHENTICATED_NAME,
     ISTIO_INGRESS_ROUTE_AUTHENTICATED_NAME,
     ISTIO_INGRESS_ROUTE_UNAUTHENTICATED_NAME,
+    ConcurrentReconciler,
     DisabledCertHandler,
     GatewayListener,
     GRPCRoute,
     HTTPRoute,
+    IngressSnapshot,
     RefreshCerts,
     RouteInfo,
-    clear_conflicting_routes,
-    deduplicate_grpc_routes,
-    deduplicate_http_routes,
-    deduplicate_listeners,
+    build_traffic_policy,
+    cert_inputs_digest,
+    gateway_http_filter_patch,
+    gateway_shard,
     get_relation_by_name_and_app,
-    get_unauthenticated_paths,
-    get_unauthenticated_paths_from_istio_ingress_route_configs,
-    normalize_ipa_listeners,
-    normalize_ipa_routes,
-    normalize_istio_ingress_route_grpc_routes,
-    normalize_istio_ingress_route_http_routes,
-    normalize_istio_ingress_route_listeners,
+    group_routes_by_source,
+    merge_backend_traffic_settings,
+    partition_not_paths,
+    route_group_digest,
+    split_config_list,
+    stricter_rate_limit,
 )
 
 logger = logging.getLogger(__name__)
@@ -134,16 +145,28 @@ RESOURCE_TYPES = {
     "RequestAuthentication": create_namespaced_resource(
         "security.istio.io", "v1", "RequestAuthentication", "requestauthentications"
     ),
+    "EnvoyFilter": create_namespaced_resource(
+        "networking.istio.io", "v1alpha3", "EnvoyFilter", "envoyfilters"
+    ),
 }
 
-GATEWAY_RESOURCE_TYPES = {RESOURCE_TYPES["Gateway"], Secret, HorizontalPodAutoscaler}
+GATEWAY_RESOURCE_TYPES = {
+    RESOURCE_TYPES["Gateway"],
+    Secret,
+    HorizontalPodAutoscaler,
+    PodDisruptionBudget,
+    ConfigMap,
+}
 INGRESS_RESOURCE_TYPES = {
     RESOURCE_TYPES["GRPCRoute"],
     RESOURCE_TYPES["ReferenceGrant"],
     RESOURCE_TYPES["HTTPRoute"],
 }
 
-GRPC_DESTINATION_RULE_RESOURCE_TYPES = {RESOURCE_TYPES["DestinationRule"]}
+DESTINATION_RULE_RESOURCE_TYPES = {RESOURCE_TYPES["DestinationRule"]}
+RATE_LIMIT_RESOURCE_TYPES = {RESOURCE_TYPES["EnvoyFilter"]}
+COMPRESSION_RESOURCE_TYPES = {RESOURCE_TYPES["EnvoyFilter"]}
+LISTENER_OPTIONS_RESOURCE_TYPES = {RESOURCE_TYPES["EnvoyFilter"]}
 REQUEST_AUTH_RESOURCE_TYPES = {RESOURCE_TYPES["RequestAuthentication"]}
 
 GATEWAY_SCOPE = "istio-gateway"
@@ -151,8 +174,12 @@ INGRESS_SCOPE = "istio-ingress"
 INGRESS_AUTH_POLICY_SCOPE = "istio-ingress-authorization-policy"
 EXTZ_AUTH_POLICY_SCOPE = "external-authorizer-authorization-policy"
 EXTERNAL_TRAFFIC_AUTH_POLICY_SCOPE = "external-traffic-authorization-policy"
-GRPC_DESTINATION_RULE_SCOPE = "grpc-destination-rule"
+# Kept from when only gRPC backends had DestinationRules, so that upgrades clean those up
+DESTINATION_RULE_SCOPE = "grpc-destination-rule"
 REQUEST_AUTH_SCOPE = "request-authentication"
+RATE_LIMIT_SCOPE = "istio-ingress-rate-limit"
+COMPRESSION_SCOPE = "istio-ingress-compression"
+LISTENER_OPTIONS_SCOPE = "istio-ingress-listener-options"
 DENY_AUTH_POLICY_SCOPE = "deny-without-jwt-authorization-policy"
 
 INGRESS_CONFIG_RELATION = "istio-ingress-config"
@@ -161,13 +188,81 @@ REQUEST_AUTH_RELATION = "istio-request-auth"
 UPSTREAM_INGRESS_RELATION = "upstream-ingress"
 PEERS_RELATION = "peers"
 
+# Gateway API limit on the number of rules in a single HTTPRoute
+HTTPROUTE_MAX_RULES = 16
+
+# Length of the ext-authz notPaths list above which it is split across several rules
+EXT_AUTHZ_MAX_NOT_PATHS_PER_RULE = 64
+
+# Maximum number of independent groups of Kubernetes resources reconciled at the same time
+RECONCILE_MAX_WORKERS = 5
+
+# Config options holding the default backend traffic settings (see utils.BACKEND_TRAFFIC_SETTINGS)
+BACKEND_TRAFFIC_CONFIG = {
+    "maxConnections": "backend-max-connections",
+    "maxRequestsPerConnection": "backend-max-requests-per-connection",
+    "http2MaxRequests": "backend-http2-max-requests",
+    "idleTimeoutSeconds": "backend-idle-timeout",
+    "consecutive5xxErrors": "backend-consecutive-5xx-errors",
+}
+BACKEND_LOAD_BALANCERS = ("ROUND_ROBIN", "LEAST_REQUEST", "RANDOM")
+
+# Envoy compressor library of each response compression algorithm, as (name, type URL)
+COMPRESSION_LIBRARIES = {
+    "gzip": (
+        "envoy.compression.gzip.compressor",
+        "type.googleapis.com/envoy.extensions.compression.gzip.compressor.v3.Gzip",
+    ),
+    "brotli": (
+        "envoy.compression.brotli.compressor",
+        "type.googleapis.com/envoy.extensions.compression.brotli.compressor.v3.Brotli",
+    ),
+    "zstd": (
+        "envoy.compression.zstd.compressor",
+        "type.googleapis.com/envoy.extensions.compression.zstd.compressor.v3.Zstd",
+    ),
+}
+
+# Config options setting the resources of the gateway proxies, by (kind, resource)
+GATEWAY_RESOURCES_CONFIG = {
+    ("requests", "cpu"): "gateway-cpu-request",
+    ("requests", "memory"): "gateway-memory-request",
+    ("limits", "cpu"): "gateway-cpu-limit",
+    ("limits", "memory"): "gateway-memory-limit",
+}
+# Kubernetes resource quantities, e.g. "500m", "2", "256Mi" or "1.5Gi"
+RESOURCE_QUANTITY_PATTERN = re.compile(r"^[0-9]+(\.[0-9]+)?(m|k|M|G|T|Ki|Mi|Gi|Ti)?$")
+
+# Field manager owning the HTTP/3 (UDP) ports added to the Services of the gateways, which are
+# otherwise managed by Istio
+HTTP3_FIELD_MANAGER_SUFFIX = "http3"
+
+METRICS_PROXY_CONTAINER = "metrics-proxy"
+GATEWAY_READINESS_NOTICE_KEY = "canonical.com/istio-ingress-k8s/gateway-readiness"
+# Non-blocking readiness checks run (on the retry notice, then on update-status) after the gateway
+# was found not ready, before giving up until the next event
+GATEWAY_READINESS_MAX_RETRIES = 10
+
 
 class IstioIngressCharm(CharmBase):
     """Charm the service."""
 
+    _stored = StoredState()
+
     def __init__(self, *args):
         super().__init__(*args)
 
+        self._stored.set_default(
+            # JSON record of the ingress resources deployed for each (app, relation) on the last
+            # sync, used to reconcile only what changed.  None means the deployed state is unknown.
+            ingress_route_groups=None,
+            http3_service_ports=False,
+            cert_inputs_digest=None,
+            # Number of gateway readiness retries run since the gateway was found not ready, or
+            # None if no retry is pending.
+            gateway_readiness_retries=None,
+        )
+
         # Charm tracing
         # We don't provide a CA cert because istio does TLS its own way.
         # TODO: fix when https://github.com/canonical/istio-beacon-k8s-operator/issues/33 is closed
@@ -180,6 +275,11 @@ class IstioIngressCharm(CharmBase):
         self.on.define_event("refresh_certs", RefreshCerts)
 
         self._ingress_url_ = None
+        self._gateway_addresses: Dict[str, Optional[str]] = {}
+        self._gateway_readiness_retry_scheduled = False
+        self._ingress_snapshot: Optional[IngressSnapshot] = None
+        self._reconciler: Optional[ConcurrentReconciler] = None
+        self._reconcile_result_handlers: List[Tuple[str, Callable[[Any], None]]] = []
 
         self.managed_name = f"{self.app.name}-istio"
         self._lightkube_field_manager: str = self.app.name
@@ -263,12 +363,22 @@ class IstioIngressCharm(CharmBase):
         self.framework.observe(
             self.on.metrics_proxy_pebble_ready, self._metrics_proxy_pebble_ready
         )
+        self.framework.observe(
+            self.on[METRICS_PROXY_CONTAINER].pebble_custom_notice, self._on_pebble_custom_notice
+        )
+        self.framework.observe(self.on.update_status, self._retry_gateway_readiness)
         self.framework.observe(
             self.on[INGRESS_CONFIG_RELATION].relation_changed, self._handle_ingress_config
         )
         self.framework.observe(
             self.on[INGRESS_CONFIG_RELATION].relation_broken, self._handle_ingress_config
         )
+        # A new leader cannot trust a record written by an earlier leader, nor can a new charm
+        # revision that may construct resources differently, so both start with a full reconcile.
+        self.framework.observe(self.on.leader_elected, self._reset_ingress_route_groups)
+        self.framework.observe(self.on.upgrade_charm, self._reset_ingress_route_groups)
+        self.framework.observe(self.on.leader_elected, self._reset_cert_inputs_digest)
+        self.framework.observe(self.on.upgrade_charm, self._reset_cert_inputs_digest)
         self.framework.observe(self.on.leader_elected, self._handle_ingress_config)
         self.framework.observe(self.on[PEERS_RELATION].relation_changed, self._on_peers_changed)
         self.framework.observe(self.on[PEERS_RELATION].relation_departed, self._on_peers_changed)
@@ -296,7 +406,9 @@ class IstioIngressCharm(CharmBase):
                 "External hostname is not set and no load balancer ip available.  TLS certificate generation disabled"
             )
             self._cert_handler = DisabledCertHandler()
+            self._cert_inputs_digest = None
         else:
+            self._cert_inputs_digest = cert_inputs_digest([external_hostname], external_hostname)
             self._cert_handler = CertHandler(
                 self,
                 key="istio-ingress-cert",  # TODO: how is this key used?  if we have two ingresses, do we get issues?
@@ -324,7 +436,7 @@ class IstioIngressCharm(CharmBase):
 
     def _setup_proxy_pebble_service(self):
         """Define and start the metrics broadcast proxy Pebble service."""
-        proxy_container = self.unit.get_container("metrics-proxy")
+        proxy_container = self.unit.get_container(METRICS_PROXY_CONTAINER)
         if not proxy_container.can_connect():
             return
         proxy_layer = Layer(
@@ -380,6 +492,21 @@ class IstioIngressCharm(CharmBase):
             logger=logger,
         )
 
+    def _get_ingress_auth_policy_patch_manager(self):
+        """Get KubernetesResourceManager for patching individual ingress AuthorizationPolicies.
+
+        Shares its labels with `_get_ingress_auth_policy_resource_manager`, so the policies it
+        patches are still reconciled and deleted by the PolicyResourceManager.
+        """
+        return KubernetesResourceManager(
+            labels=create_charm_default_labels(
+                self.app.name, self.model.name, scope=INGRESS_AUTH_POLICY_SCOPE
+            ),
+            resource_types={AuthorizationPolicy},  # pyright: ignore
+            lightkube_client=self.lightkube_client,
+            logger=logger,
+        )
+
     def _get_extz_auth_policy_resource_manager(self):
         return PolicyResourceManager(
             charm=self,
@@ -400,13 +527,13 @@ class IstioIngressCharm(CharmBase):
             logger=logger,
         )
 
-    def _get_grpc_destination_rule_resource_manager(self):
-        """Get KubernetesResourceManager for gRPC DestinationRules."""
+    def _get_destination_rule_resource_manager(self):
+        """Get KubernetesResourceManager for backend DestinationRules."""
         return KubernetesResourceManager(
             labels=create_charm_default_labels(
-                self.app.name, self.model.name, scope=GRPC_DESTINATION_RULE_SCOPE
+                self.app.name, self.model.name, scope=DESTINATION_RULE_SCOPE
             ),
-            resource_types=GRPC_DESTINATION_RULE_RESOURCE_TYPES,  # pyright: ignore
+            resource_types=DESTINATION_RULE_RESOURCE_TYPES,  # pyright: ignore
             lightkube_client=self.lightkube_client,
             logger=logger,
         )
@@ -433,6 +560,39 @@ class IstioIngressCharm(CharmBase):
             logger=logger,
         )
 
+    def _get_rate_limit_resource_manager(self):
+        """Get KubernetesResourceManager for the local rate limit EnvoyFilters."""
+        return KubernetesResourceManager(
+            labels=create_charm_default_labels(
+                self.app.name, self.model.name, scope=RATE_LIMIT_SCOPE
+            ),
+            resource_types=RATE_LIMIT_RESOURCE_TYPES,  # pyright: ignore
+            lightkube_client=self.lightkube_client,
+            logger=logger,
+        )
+
+    def _get_compression_resource_manager(self):
+        """Get KubernetesResourceManager for the response compression EnvoyFilters."""
+        return KubernetesResourceManager(
+            labels=create_charm_default_labels(
+                self.app.name, self.model.name, scope=COMPRESSION_SCOPE
+            ),
+            resource_types=COMPRESSION_RESOURCE_TYPES,  # pyright: ignore
+            lightkube_client=self.lightkube_client,
+            logger=logger,
+        )
+
+    def _get_listener_options_resource_manager(self):
+        """Get KubernetesResourceManager for the listener options EnvoyFilters."""
+        return KubernetesResourceManager(
+            labels=create_charm_default_labels(
+                self.app.name, self.model.name, scope=LISTENER_OPTIONS_SCOPE
+            ),
+            resource_types=LISTENER_OPTIONS_RESOURCE_TYPES,  # pyright: ignore
+            lightkube_client=self.lightkube_client,
+            logger=logger,
+        )
+
     def _on_cert_handler_cert_changed(self, _):
         """Event handler for when tls certificates have changed."""
         self._sync_all_resources()
@@ -490,6 +650,7 @@ class IstioIngressCharm(CharmBase):
         # Removing tailing ingress resources
         krm_ingress_routes = self._get_ingress_route_resource_manager()
         krm_ingress_routes.delete()
+        self._stored.ingress_route_groups = None
 
         self._remove_gateway_resources()
 
@@ -508,6 +669,23 @@ class IstioIngressCharm(CharmBase):
         prm_deny_auth = self._get_deny_auth_policy_resource_manager()
         prm_deny_auth.delete()
 
+        krm_rate_limit = self._get_rate_limit_resource_manager()
+        krm_rate_limit.delete()
+
+        krm_compression = self._get_compression_resource_manager()
+        krm_compression.delete()
+
+        krm_listener_options = self._get_listener_options_resource_manager()
+        krm_listener_options.delete()
+
+    def _reset_ingress_route_groups(self, _):
+        """Forget the deployed ingress resources so that the next sync reconciles all of them."""
+        self._stored.ingress_route_groups = None
+
+    def _reset_cert_inputs_digest(self, _):
+        """Forget the last certificate inputs so that the next sync requests a cert refresh."""
+        self._stored.cert_inputs_digest = None
+
     def _on_ingress_data_provided(self, _):
         """Handle a unit providing data requesting IPU."""
         self._sync_all_resources()
@@ -528,47 +706,98 @@ class IstioIngressCharm(CharmBase):
         kgm = self._get_gateway_resource_manager()
         kgm.delete()
 
-    def _is_deployment_ready(self) -> bool:
-        """Check if the deployment is ready after multiple attempts."""
-        timeout = int(self.config["ready-timeout"])
-        check_interval = 10
-        attempts = timeout // check_interval
+    def _check_deployment_ready(self) -> bool:
+        """Single non-blocking check if the deployments of all gateway shards are ready."""
+        return not self._unready_gateway_deployments()
+
+    def _unready_gateway_deployments(self) -> List[str]:
+        """Return the gateway shards whose deployment is missing or not ready, one read each."""
+        unready = []
+        for gateway_name in self._gateway_names:
+            try:
+                deployment = self.lightkube_client.get(
+                    Deployment, name=f"{gateway_name}-istio", namespace=self.model.name
+                )
+            except ApiError:
+                unready.append(gateway_name)
+                continue
+            if not self._is_deployment_object_ready(deployment):
+                unready.append(gateway_name)
+        return unready
 
-        for _ in range(attempts):
-            if self._check_deployment_ready():
-                return True
-            logger.warning("Deployment not ready, retrying...")
-            time.sleep(check_interval)
+    def _gateways_without_address(self) -> List[str]:
+        """Return the gateway shards whose LoadBalancer has no address yet."""
+        return [
+            gateway_name
+            for gateway_name in self._gateway_names
+            if not (
+                self._get_lb_external_address
+                if gateway_name == self.app.name
+                else self._get_gateway_address(gateway_name)
+            )
+        ]
 
-        return False
+    @staticmethod
+    def _is_deployment_object_ready(deployment: Deployment) -> bool:
+        """Return whether all replicas of the given Deployment object are ready."""
+        return bool(
+            deployment.status and deployment.status.readyReplicas == deployment.status.replicas
+        )
 
-    def _check_deployment_ready(self) -> bool:
-        """Single non-blocking check if the gateway deployment is ready."""
-        try:
-            deployment = self.lightkube_client.get(
-                Deployment, name=self.managed_name, namespace=self.model.name
-            )
-            return bool(
-                deployment.status
-                and deployment.status.readyReplicas == deployment.status.replicas
+    @property
+    def _gateway_readiness_retry_pending(self) -> bool:
+        """Return whether readiness retries are pending, rather than not needed or given up on."""
+        retries = self._stored.gateway_readiness_retries
+        return retries is not None and retries < GATEWAY_READINESS_MAX_RETRIES  # type: ignore
+
+    def _schedule_readiness_retry(self):
+        """Ask for the gateway readiness to be checked again, instead of waiting in this hook.
+
+        A Pebble custom notice on the metrics-proxy container makes Juju emit a
+        `pebble-custom-notice` event as soon as its queue allows, and update-status events retry
+        after that.  Retries only run a non-blocking check, and stop after
+        GATEWAY_READINESS_MAX_RETRIES attempts.  Scheduling while retries are already pending is a
+        no-op, so that the retry hooks do not schedule more retries.
+        """
+        self._gateway_readiness_retry_scheduled = True
+        if self._stored.gateway_readiness_retries is not None:
+            return
+        self._stored.gateway_readiness_retries = 0
+        container = self.unit.get_container(METRICS_PROXY_CONTAINER)
+        if not container.can_connect():
+            logger.info(
+                "Cannot send the gateway readiness notice: metrics-proxy container is not"
+                " reachable. Readiness will be re-evaluated on update-status."
             )
-        except ApiError:
-            return False
+            return
+        container.pebble.notify(NoticeType.CUSTOM, GATEWAY_READINESS_NOTICE_KEY)
 
-    def _is_load_balancer_ready(self) -> bool:
-        """Wait for the LoadBalancer to be created."""
-        timeout = int(self.config["ready-timeout"])
-        check_interval = 10
-        attempts = timeout // check_interval
+    def _on_pebble_custom_notice(self, event: PebbleCustomNoticeEvent):
+        """Event handler for Pebble custom notices, used to retry the gateway readiness check."""
+        if event.notice.key != GATEWAY_READINESS_NOTICE_KEY:
+            return
+        self._retry_gateway_readiness(event)
 
-        for _ in range(attempts):
-            lb_status = self._get_lb_external_address
-            if lb_status:
-                return True
+    def _retry_gateway_readiness(self, _event):
+        """Re-run the sync if a pending readiness retry finds the gateway ready.
 
-            logger.warning("Loadbalancer not ready, retrying...")
-            time.sleep(check_interval)
-        return False
+        This only reads the Deployment and Service of each gateway shard, so a gateway that never
+        becomes ready (e.g. without a LoadBalancer provider) costs two reads per shard and retry,
+        and no hook waits.
+        """
+        if not self.unit.is_leader() or not self._gateway_readiness_retry_pending:
+            return
+        retries = self._stored.gateway_readiness_retries + 1  # type: ignore
+        self._stored.gateway_readiness_retries = retries
+        if not (self._check_deployment_ready() and not self._gateways_without_address()):
+            if retries >= GATEWAY_READINESS_MAX_RETRIES:
+                logger.warning(
+                    "Gateway still not ready after %d retries; waiting for the next event to"
+                    " check again.",
+                    retries,
+                )
+            return
+        self._sync_all_resources()
 
     @property
     def _get_lb_external_address(self) -> Optional[str]:
@@ -579,7 +808,30 @@ class IstioIngressCharm(CharmBase):
         except ApiError:
             return None
 
-        if not (status := getattr(lb, "status", None)):
+        return self._get_service_lb_address(lb)
+
+    def _get_gateway_address(self, gateway_name: str) -> Optional[str]:
+        """Return the address serving a gateway shard, cached for the rest of the hook.
+
+        The primary gateway is served at `_ingress_url`.  The other shards have their own
+        LoadBalancer, whose address is returned if it has one.
+        """
+        if gateway_name == self.app.name:
+            return self._ingress_url
+        if gateway_name not in self._gateway_addresses:
+            try:
+                lb = self.lightkube_client.get(
+                    Service, name=f"{gateway_name}-istio", namespace=self.model.name
+                )
+                self._gateway_addresses[gateway_name] = self._get_service_lb_address(lb)
+            except ApiError:
+                self._gateway_addresses[gateway_name] = None
+        return self._gateway_addresses[gateway_name]
+
+    @staticmethod
+    def _get_service_lb_address(service: Service) -> Optional[str]:
+        """Return the LoadBalancer hostname or IP of the given Service object, if assigned."""
+        if not (status := getattr(service, "status", None)):
             return None
         if not (load_balancer_status := getattr(status, "loadBalancer", None)):
             return None
@@ -591,7 +843,114 @@ class IstioIngressCharm(CharmBase):
         return ingress_address.hostname or ingress_address.ip
 
     def _is_ready(self) -> bool:
-        return self._is_deployment_ready() and self._is_load_balancer_ready()
+        """Return whether the Deployment and LoadBalancer of every gateway shard are ready.
+
+        This is a single read of each object, the hook never waits for the gateway.  If it is not
+        ready, a retry is scheduled and the charm is waiting until then.
+        """
+        if self._check_deployment_ready() and not self._gateways_without_address():
+            return True
+
+        if not self._gateway_readiness_retry_pending:
+            # No retries are pending, or they were given up on: start over with this event
+            logger.info("Gateway not ready yet; scheduling a readiness retry")
+            self._stored.gateway_readiness_retries = None
+        self._schedule_readiness_retry()
+        return False
+
+    @property
+    def _gateway_sharding_error(self) -> Optional[str]:
+        """Return why the `gateway-shards` config cannot be honoured, or None if it can."""
+        shards = int(self.config["gateway-shards"])
+        if shards < 1:
+            return "gateway-shards must be at least 1"
+        if shards == 1:
+            return None
+        # Every shard has its own LoadBalancer address, which a single hostname, upstream route or
+        # certificate cannot cover.
+        if self.model.config.get("external_hostname"):
+            return "gateway-shards is not supported with external_hostname"
+        if self.model.get_relation(UPSTREAM_INGRESS_RELATION):
+            return "gateway-shards is not supported with upstream-ingress"
+        if self.model.get_relation("certificates"):
+            return "gateway-shards is not supported with TLS"
+        return None
+
+    @functools.cached_property
+    def _gateway_names(self) -> List[str]:
+        """Return the names of the gateway shards, the primary gateway first.
+
+        The primary gateway is named after the app, and the others `<app>-shard-<index>`.  Istio
+        deploys each Gateway with its own Deployment and LoadBalancer Service, `<gateway>-istio`.
+        If the `gateway-shards` config cannot be honoured, only the primary gateway is used.
+        """
+        shards = 1 if self._gateway_sharding_error else int(self.config["gateway-shards"])
+        return [self.app.name] + [f"{self.app.name}-shard-{index}" for index in range(1, shards)]
+
+    @property
+    def _backend_traffic_config_error(self) -> Optional[str]:
+        """Return why the backend traffic config cannot be honoured, or None if it can."""
+        for option in BACKEND_TRAFFIC_CONFIG.values():
+            if int(self.config[option]) < 0:
+                return f"{option} cannot be negative"
+        load_balancer = str(self.config["backend-load-balancer"])
+        if load_balancer and load_balancer not in BACKEND_LOAD_BALANCERS:
+            return f"backend-load-balancer must be one of {', '.join(BACKEND_LOAD_BALANCERS)}"
+        return None
+
+    @property
+    def _backend_traffic_defaults(self) -> Dict[str, Any]:
+        """Return the configured traffic settings of all backends, keyed as in the library."""
+        if self._backend_traffic_config_error:
+            return {}
+        defaults: Dict[str, Any] = {
+            setting: int(self.config[option])
+            for setting, option in BACKEND_TRAFFIC_CONFIG.items()
+            if int(self.config[option])
+        }
+        if load_balancer := str(self.config["backend-load-balancer"]):
+            defaults["loadBalancer"] = load_balancer
+        return defaults
+
+    def _gateway_name_for_app(self, app_name: str) -> str:
+        """Return the name of the gateway shard serving an ingressed app."""
+        return self._gateway_names[gateway_shard(app_name, len(self._gateway_names))]
+
+    def _gateway_target_refs(self) -> List[PolicyTargetReference]:
+        """Return references to all gateway shards, for the policies that apply to each of them."""
+        return [
+            PolicyTargetReference(
+                kind="Gateway",
+                group="gateway.networking.k8s.io",
+                name=gateway_name,
+            )
+            for gateway_name in self._gateway_names
+        ]
+
+    def _partition_listeners(
+        self, normalized_listeners: List[GatewayListener], routes: Iterable[HTTPRoute | GRPCRoute]
+    ) -> Dict[str, List[GatewayListener]]:
+        """Return the listeners of each gateway shard: those its routes are bound to.
+
+        A shard without routes gets all the listeners, as a Gateway needs at least one.
+        """
+        if len(self._gateway_names) == 1:
+            return {self.app.name: normalized_listeners}
+
+        used: Dict[str, Set[str]] = {gateway_name: set() for gateway_name in self._gateway_names}
+        for route in routes:
+            used[self._gateway_name_for_app(route["source_app"])].add(
+                f"{route['listener_protocol'].lower()}-{route['listener_port']}"
+            )
+        return {
+            gateway_name: [
+                listener
+                for listener in normalized_listeners
+                if f"{listener['gateway_protocol'].lower()}-{listener['port']}" in listener_names
+            ]
+            or normalized_listeners
+            for gateway_name, listener_names in used.items()
+        }
 
     def _construct_gateway_tls_secret(self):
         """Return the TLS secret resource for the gateway if TLS is configured, otherwise None."""
@@ -606,7 +965,9 @@ class IstioIngressCharm(CharmBase):
             },
         )
 
-    def _construct_gateway(self, normalized_listeners: List[GatewayListener]):
+    def _construct_gateway(
+        self, normalized_listeners: List[GatewayListener], name: Optional[str] = None
+    ):
         """Construct the Gateway resource from normalized listeners.
 
         This method constructs a Gateway from a list of normalized listeners that have already
@@ -618,6 +979,7 @@ class IstioIngressCharm(CharmBase):
 
         Args:
             normalized_listeners: List of normalized Gateway listeners
+            name: Name of the Gateway, defaults to the primary gateway (see `_gateway_names`)
 
         Returns:
             Gateway lightkube resource
@@ -648,7 +1010,7 @@ class IstioIngressCharm(CharmBase):
 
         gateway = IstioGatewayResource(
             metadata=Metadata(
-                name=self.app.name,
+                name=name or self.app.name,
                 namespace=self.model.name,
                 labels={**self.telemetry_labels},
             ),
@@ -657,19 +1019,94 @@ class IstioIngressCharm(CharmBase):
                 listeners=listeners,
             ),
         )
+        spec = gateway.spec.model_dump(exclude_none=True)
+        # Istio customizes the gateway Deployment it generates with this ConfigMap.  It is always
+        # referenced, with an empty overlay if nothing is configured, as the Gateway is merge
+        # patched and a removed reference would be left in place, pointing at a deleted ConfigMap.
+        spec["infrastructure"] = {
+            "parametersRef": {
+                "group": "",
+                "kind": "ConfigMap",
+                "name": self._gateway_parameters_name(name or self.app.name),
+            }
+        }
         gateway_resource = RESOURCE_TYPES["Gateway"]
         return gateway_resource(
             metadata=ObjectMeta.from_dict(gateway.metadata.model_dump()),
-            spec=gateway.spec.model_dump(exclude_none=True),
+            spec=spec,
         )
 
+    @staticmethod
+    def _gateway_parameters_name(gateway_name: str) -> str:
+        """Return the name of the ConfigMap customizing the Deployment of a gateway."""
+        return f"{gateway_name}-parameters"
+
+    @property
+    def _gateway_proxy_config_error(self) -> Optional[str]:
+        """Return why the gateway proxy config cannot be honoured, or None if it can."""
+        for option in GATEWAY_RESOURCES_CONFIG.values():
+            value = str(self.config[option])
+            if value and not RESOURCE_QUANTITY_PATTERN.match(value):
+                return f"{option} is not a valid resource quantity"
+        for option in (
+            "gateway-concurrency",
+            "gateway-max-connections",
+            "gateway-per-connection-buffer-limit",
+        ):
+            if int(self.config[option]) < 0:
+                return f"{option} cannot be negative"
+        return None
+
+    @property
+    def _gateway_deployment_overlay(self) -> Dict[str, Any]:
+        """Return the overlay Istio applies to the generated Deployment of each gateway.
+
+        It sets the resources of the proxy container, and the concurrency and runtime limits of
+        Envoy through the pod's ProxyConfig annotation.  It is empty if nothing is configured.
+        """
+        if self._gateway_proxy_config_error:
+            return {}
+        resources: Dict[str, Dict[str, str]] = {}
+        for (kind, resource), option in GATEWAY_RESOURCES_CONFIG.items():
+            if value := str(self.config[option]):
+                resources.setdefault(kind, {})[resource] = value
+        proxy_config: Dict[str, Any] = {}
+        if concurrency := int(self.config["gateway-concurrency"]):
+            proxy_config["concurrency"] = concurrency
+        if max_connections := int(self.config["gateway-max-connections"]):
+            proxy_config["runtimeValues"] = {
+                "overload.global_downstream_max_connections": str(max_connections)
+            }
+
+        template: Dict[str, Any] = {}
+        if proxy_config:
+            template["metadata"] = {
+                "annotations": {"proxy.istio.io/config": json.dumps(proxy_config, sort_keys=True)}
+            }
+        if resources:
+            template["spec"] = {"containers": [{"name": "istio-proxy", "resources": resources}]}
+        return {"spec": {"template": template}} if template else {}
+
+    def _construct_gateway_parameters(self, gateway_name: str) -> ConfigMap:
+        """Return the ConfigMap customizing the Deployment of a gateway."""
+        return ConfigMap(
+            metadata=ObjectMeta(
+                name=self._gateway_parameters_name(gateway_name), namespace=self.model.name
+            ),
+            data={"deployment": json.dumps(self._gateway_deployment_overlay, sort_keys=True)},
+        )
+
+    def _l4_auth_policy_name(self, target_name: str, target_namespace: str) -> str:
+        """Return the name of the AuthorizationPolicy from the ingress workload to a target."""
+        return target_name + "-" + self.app.name + "-" + target_namespace + "-l4"
+
     def _construct_auth_policy_from_ingress_to_target(
         self, target_name: str, target_namespace: str, target_ports: List[int]
     ):
         """Return an AuthorizationPolicy that allows the ingress workload to communicate with the target workload."""
         return AuthorizationPolicy(
             metadata=ObjectMeta(
-                name=target_name + "-" + self.app.name + "-" + target_namespace + "-l4",
+                name=self._l4_auth_policy_name(target_name, target_namespace),
                 namespace=target_namespace,
             ),
             spec=AuthorizationPolicySpec(
@@ -682,8 +1119,9 @@ class IstioIngressCharm(CharmBase):
                                 source=Source(
                                     principals=[
                                         get_peer_identity_for_juju_application(
-                                            self.managed_name, self.model.name
+                                            f"{gateway_name}-istio", self.model.name
                                         )
+                                        for gateway_name in self._gateway_names
                                     ]
                                 )
                             )
@@ -707,12 +1145,19 @@ class IstioIngressCharm(CharmBase):
             ]
 
         if unauthenticated_paths:
-            auth_rule = Rule(
-                to=[To(operation=Operation(notPaths=unauthenticated_paths))],
-                when=when_conditions,
-            )
+            # Long notPaths lists are split across rules scoped by path, as Envoy evaluates each
+            # list linearly on every request.
+            auth_rules = [
+                Rule(
+                    to=[To(operation=Operation(paths=paths or None, notPaths=not_paths))],
+                    when=when_conditions,
+                )
+                for paths, not_paths in partition_not_paths(
+                    unauthenticated_paths, EXT_AUTHZ_MAX_NOT_PATHS_PER_RULE
+                )
+            ]
         else:
-            auth_rule = Rule(when=when_conditions)
+            auth_rules = [Rule(when=when_conditions)]
 
         return AuthorizationPolicy(
             metadata=ObjectMeta(
@@ -720,14 +1165,8 @@ class IstioIngressCharm(CharmBase):
                 namespace=self.model.name,
             ),
             spec=AuthorizationPolicySpec(
-                rules=[auth_rule],
-                targetRefs=[
-                    PolicyTargetReference(
-                        kind="Gateway",
-                        group="gateway.networking.k8s.io",
-                        name=self.app.name,
-                    )
-                ],
+                rules=auth_rules,
+                targetRefs=self._gateway_target_refs(),
                 action=Action.custom,
                 provider=Provider(name=ext_authz_provider_name),
             ).model_dump(by_alias=True, exclude_unset=True, exclude_none=True),
@@ -750,49 +1189,96 @@ class IstioIngressCharm(CharmBase):
                         from_=[From(source=Source(ipBlocks=ip_blocks))],  # type: ignore
                     )
                 ],
-                targetRefs=[
-                    PolicyTargetReference(
-                        kind="Gateway",
-                        group="gateway.networking.k8s.io",
-                        name=self.app.name,
-                    )
-                ],
+                targetRefs=self._gateway_target_refs(),
                 action=Action.allow,
             ).model_dump(by_alias=True, exclude_unset=True, exclude_none=True),
         )
 
-    def _construct_hpa(self, unit_count: int) -> HorizontalPodAutoscaler:
+    def _construct_hpa(
+        self, unit_count: int, gateway_name: Optional[str] = None
+    ) -> HorizontalPodAutoscaler:
+        """Return the HPA of a gateway.
+
+        Without autoscaling, the replicas are pinned to the unit count.  With autoscaling, the
+        unit count is the floor, and the replicas follow the configured utilization targets up to
+        `autoscaling-max-replicas`.
+        """
+        gateway_name = gateway_name or self.app.name
+        max_replicas = unit_count
+        metrics = None
+        if autoscaling_max_replicas := self._autoscaling_max_replicas:
+            max_replicas = max(unit_count, autoscaling_max_replicas)
+            metrics = [
+                MetricSpec(
+                    type="Resource",
+                    resource=ResourceMetricSource(
+                        name=resource,
+                        target=MetricTarget(type="Utilization", averageUtilization=utilization),
+                    ),
+                )
+                for resource, utilization in (
+                    ("cpu", int(self.config["autoscaling-cpu-utilization"])),
+                    ("memory", int(self.config["autoscaling-memory-utilization"])),
+                )
+                if utilization > 0
+            ]
         return HorizontalPodAutoscaler(
-            metadata=ObjectMeta(name=self.app.name, namespace=self.model.name),
+            metadata=ObjectMeta(name=gateway_name, namespace=self.model.name),
             spec=HorizontalPodAutoscalerSpec(
                 scaleTargetRef=CrossVersionObjectReference(
                     apiVersion="apps/v1",
                     kind="Deployment",
-                    name=self.managed_name,
+                    name=f"{gateway_name}-istio",
                 ),
                 minReplicas=unit_count,
-                maxReplicas=unit_count,
+                maxReplicas=max_replicas,
+                metrics=metrics,
             ),
         )
 
-    def _is_tls_enabled(self) -> bool:
-        return self._construct_gateway_tls_secret() is not None
-
-    def _get_normalized_istio_routes(self) -> Tuple[List[HTTPRoute],List[GRPCRoute]]:
-        """Return the normalized Istio routes."""
-        is_tls_enabled = self._is_tls_enabled()
-        istio_ingress_route_configs = self._get_istio_ingress_route_configs()
-        istio_http_routes = normalize_istio_ingress_route_http_routes(
-            istio_ingress_route_configs, is_tls_enabled, self.app.name
-        )
-        istio_grpc_routes = normalize_istio_ingress_route_grpc_routes(
-            istio_ingress_route_configs, is_tls_enabled, self.app.name
+    def _construct_pdb(self, gateway_name: Optional[str] = None) -> PodDisruptionBudget:
+        """Return a PodDisruptionBudget letting only one replica of a gateway go at a time."""
+        gateway_name = gateway_name or self.app.name
+        return PodDisruptionBudget(
+            metadata=ObjectMeta(name=gateway_name, namespace=self.model.name),
+            spec=PodDisruptionBudgetSpec(
+                maxUnavailable=1,
+                selector=LabelSelector(
+                    matchLabels={"gateway.networking.k8s.io/gateway-name": gateway_name}
+                ),
+            ),
         )
-        return istio_http_routes, istio_grpc_routes
 
-    def _get_normalized_ipa_routes(self) -> List[HTTPRoute]:
-        """Return the normalized IPA routes from both sources."""
-        return normalize_ipa_routes(self._get_routes(), self._is_tls_enabled(), self.app.name)
+    @property
+    def _autoscaling_config_error(self) -> Optional[str]:
+        """Return why the autoscaling config cannot be honoured, or None if it can."""
+        max_replicas = int(self.config["autoscaling-max-replicas"])
+        cpu = int(self.config["autoscaling-cpu-utilization"])
+        memory = int(self.config["autoscaling-memory-utilization"])
+        if max_replicas < 0 or cpu < 0 or memory < 0:
+            return "autoscaling options cannot be negative"
+        if max_replicas and not (cpu or memory):
+            return "autoscaling needs a cpu or memory utilization target"
+        return None
+
+    @property
+    def _autoscaling_max_replicas(self) -> int:
+        """Return the maximum replicas of each gateway, or 0 if autoscaling is disabled."""
+        if self._autoscaling_config_error:
+            return 0
+        return int(self.config["autoscaling-max-replicas"])
+
+    def _is_tls_enabled(self) -> bool:
+        return bool(self._cert_handler.available)
+
+    def _build_ingress_snapshot(self) -> IngressSnapshot:
+        """Read and validate all ingress relation data once, for use throughout a hook."""
+        return IngressSnapshot(
+            application_route_data=self._get_routes(),
+            istio_ingress_route_configs=self._get_istio_ingress_route_configs(),
+            tls_secret_name=self._certificate_secret_name if self._is_tls_enabled() else None,
+            ingress_app_name=self.app.name,
+        )
 
     def _convert_to_jwt_rules(self, interface_jwt_rules: list) -> List[JWTRule]:
         """Convert interface JWTRule models to Istio CRD JWTRule models."""
@@ -830,13 +1316,7 @@ class IstioIngressCharm(CharmBase):
                 namespace=self.model.name,
             ),
             spec=RequestAuthenticationSpec(
-                targetRefs=[
-                    PolicyTargetReference(
-                        kind="Gateway",
-                        group="gateway.networking.k8s.io",
-                        name=self.app.name,
-                    )
-                ],
+                targetRefs=self._gateway_target_refs(),
                 jwtRules=jwt_rules,
             ).model_dump(by_alias=True, exclude_unset=True, exclude_none=True),
         )
@@ -871,13 +1351,7 @@ class IstioIngressCharm(CharmBase):
                         when=when_conditions,
                     )
                 ],
-                targetRefs=[
-                    PolicyTargetReference(
-                        kind="Gateway",
-                        group="gateway.networking.k8s.io",
-                        name=self.app.name,
-                    )
-                ],
+                targetRefs=self._gateway_target_refs(),
             ).model_dump(by_alias=True, exclude_unset=True, exclude_none=True),
         )
 
@@ -906,7 +1380,9 @@ class IstioIngressCharm(CharmBase):
             jwt_rules = self._convert_to_jwt_rules(interface_jwt_rules)
             resources.append(self._construct_request_authentication(app_name, jwt_rules))
 
-        krm.reconcile(resources)
+        self._run_reconcile_step(
+            "request-authentication", functools.partial(krm.reconcile, resources)
+        )
 
     def _sync_deny_auth_policy(self):
         """Reconcile the DENY-without-JWT authorization policy.
@@ -930,7 +1406,15 @@ class IstioIngressCharm(CharmBase):
                 self._construct_deny_without_jwt_policy(bearer_only=has_forward_auth)
             )
 
-        policy_manager.reconcile(policies=[], mesh_type=MeshType.istio, raw_policies=resources)
+        self._run_reconcile_step(
+            "deny-policy",
+            functools.partial(
+                policy_manager.reconcile,
+                policies=[],
+                mesh_type=MeshType.istio,
+                raw_policies=resources,
+            ),
+        )
 
     def _sync_all_resources(self):
         """Synchronize all resources including authentication, gateway, ingress, and certificates.
@@ -950,7 +1434,7 @@ class IstioIngressCharm(CharmBase):
         * Publish route information to ingressed applications
         * Set up the proxy service.
         * Update forward auth relation data with ingressed apps.
-        * Request certificate inspection.
+        * Request certificate inspection, if the certificate SANs or subject changed.
         """
         if not self.unit.is_leader():
             return
@@ -968,89 +1452,36 @@ class IstioIngressCharm(CharmBase):
             self._remove_gateway_resources()
             return
 
-        # Fetch raw route data from both IPA and istio-ingress-route
-        application_route_data = self._get_routes()
-        istio_ingress_route_configs = self._get_istio_ingress_route_configs()
-
-        # Normalize data to common intermediate formats
-        tls_secret_name = self._certificate_secret_name if self._is_tls_enabled() else None
-
-        # Normalize listeners from both sources
-        ipa_listeners = normalize_ipa_listeners(tls_secret_name)
-        istio_listeners = normalize_istio_ingress_route_listeners(
-            istio_ingress_route_configs, tls_secret_name
-        )
-
-        # Normalize routes from both sources
-        ipa_http_routes = self._get_normalized_ipa_routes()
-        istio_http_routes, istio_grpc_routes = self._get_normalized_istio_routes()
-
-        # Merge and deduplicate using source-agnostic functions
-        unique_listeners = deduplicate_listeners(ipa_listeners + istio_listeners)
-        valid_http_routes, http_apps_to_clear = deduplicate_http_routes(ipa_http_routes + istio_http_routes)
-        valid_grpc_routes, grpc_apps_to_clear = deduplicate_grpc_routes(istio_grpc_routes)  # ipa relation doesnt support grpc routes.
-
-        # Clear conflicts from original structures (needed for publishing back to apps)
-        all_apps_to_clear = http_apps_to_clear | grpc_apps_to_clear
-        clear_conflicting_routes(
-            application_route_data, istio_ingress_route_configs, all_apps_to_clear
-        )
-
-        # Extract unauthenticated paths (still uses original cleared structures)
-        unauthenticated_paths = get_unauthenticated_paths(application_route_data)
-        unauthenticated_paths.extend(
-            get_unauthenticated_paths_from_istio_ingress_route_configs(
-                istio_ingress_route_configs
-            )
-        )
+        # Read route and listener data from both IPA and istio-ingress-route exactly once.  The
+        # snapshot normalizes, merges and deduplicates it lazily, using source-agnostic functions,
+        # and caches the results for the rest of this hook.
+        snapshot = self._build_ingress_snapshot()
+        self._ingress_snapshot = snapshot
 
         # Synchronize external authorization configuration.
         if not self.ingress_config.is_ready() and auth_decisions_address:
             self._remove_gateway_resources()
             return
-        self._sync_ext_authz_auth_policy(auth_decisions_address, unauthenticated_paths)
-        self._sync_external_traffic_auth_policy()
-        self._sync_request_authentication()
-        self._sync_deny_auth_policy()
-
-        # Reconcile HPA and gateway resources
-
-        self._sync_gateway_resources(unique_listeners)
-        if not self._is_ready():
-            return
 
-        # Validate external hostname.
-        if not self._ingress_url:
+        if not self._reconcile_kubernetes_resources(snapshot, auth_decisions_address):
             return
 
-        # Update upstream ingress relation with current host, port, and scheme.
-        # This ensures the upstream always has fresh data about how to reach this gateway.
-        # No-op if no upstream ingress is related.
-        self.upstream_ingress.provide_ingress_requirements(
-            **self._generate_upstream_ingress_route_configuration()
-        )
-
-        # Synchronize ingress resources
-        try:
-            self._sync_ingress_resources(
-                http_routes=valid_http_routes, grpc_routes=valid_grpc_routes
-            )
-        except ApiError as e:
-            logger.error("Ingress sync failed: %s", e)
-            raise e
-
         # Publish route information to ingressed applications (IPA)
-        self._publish_routes_to_ingressed_applications(application_route_data)
+        self._publish_routes_to_ingressed_applications(snapshot.cleared_application_route_data)
 
         # Publish istio-ingress-route data (external_host + tls_enabled) to apps without conflicts
-        self._publish_istio_ingress_route_data(istio_ingress_route_configs, all_apps_to_clear)
+        self._publish_istio_ingress_route_data(
+            snapshot.cleared_istio_ingress_route_configs,
+            snapshot.apps_to_clear,
+            snapshot.tls_enabled,
+        )
 
         # Set up the proxy service.
         self._setup_proxy_pebble_service()
 
         # Update forward auth relation data with ingressed apps.
         if self.model.get_relation(FORWARD_AUTH_RELATION):
-            ingressed_apps = [app for app, _ in application_route_data.keys()]
+            ingressed_apps = [app for app, _ in snapshot.application_route_data.keys()]
             self.forward_auth.update_requirer_relation_data(
                 ForwardAuthRequirerConfig(ingress_app_names=ingressed_apps)
             )
@@ -1059,12 +1490,107 @@ class IstioIngressCharm(CharmBase):
         self._publish_gateway_metadata()
 
         # Request certificate inspection.
-        # Request a cert refresh in case configuration has changed
-        # The cert handler will only refresh if it detects a meaningful change
-        logger.info(
-            "Requesting CertHandler inspect certs to decide if our CSR has changed and we should re-request"
-        )
-        self.on.refresh_certs.emit()
+        self._refresh_certs_if_inputs_changed()
+
+        # Every gateway is ready and has an address
+        if not self._gateway_readiness_retry_scheduled:
+            self._stored.gateway_readiness_retries = None
+
+    def _refresh_certs_if_inputs_changed(self):
+        """Request a cert refresh if the SANs or subject of our CSR changed since the last request.
+
+        Most syncs come from unrelated route changes, for which the cert handling is skipped.
+        """
+        if (
+            self._cert_inputs_digest is not None
+            and self._cert_inputs_digest != self._stored.cert_inputs_digest
+        ):
+            logger.info(
+                "Requesting CertHandler inspect certs to decide if our CSR has changed and we should re-request"
+            )
+            self.on.refresh_certs.emit()
+        self._stored.cert_inputs_digest = self._cert_inputs_digest
+
+    def _reconcile_kubernetes_resources(
+        self, snapshot: IngressSnapshot, auth_decisions_address: Optional[str]
+    ) -> bool:
+        """Reconcile the gateway, its policies and the ingress resources.
+
+        Independent groups of resources are reconciled concurrently.  Their desired state is built
+        on the main thread, and only the Kubernetes calls run in the background.  The dependency
+        graph is:
+            ext-authz policy, external traffic policy, RequestAuthentications, deny policy,
+            rate limits, compression, listener options
+            Gateway/HPA -> HTTP/3 Service ports, DestinationRules, routes, L4 policies
+                (all concurrent)
+        so the whole takes about as long as the Gateway chain.  The readiness of the gateway is
+        read on the main thread while the Gateway is applied.  All steps are waited for before
+        returning, and the first failure is raised.  Results of the steps that update the charm's
+        state are then handed to their handlers, on the main thread.
+
+        Returns:
+            False if the gateway is not ready to serve routes yet, True otherwise.
+        """
+        reconciler = self._reconciler = ConcurrentReconciler(max_workers=RECONCILE_MAX_WORKERS)
+        self._reconcile_result_handlers = []
+        try:
+            with reconciler:
+                self._sync_ext_authz_auth_policy(
+                    auth_decisions_address, snapshot.unauthenticated_paths
+                )
+                self._sync_external_traffic_auth_policy()
+                self._sync_request_authentication()
+                self._sync_deny_auth_policy()
+                self._sync_rate_limit_filters(snapshot.listeners)
+                self._sync_compression_filters(snapshot.listeners)
+                self._sync_listener_options_filters(snapshot.listeners)
+
+                # Reconcile HPA and gateway resources
+                self._sync_gateway_resources(
+                    snapshot.listeners, snapshot.valid_http_routes, snapshot.valid_grpc_routes
+                )
+                if not self._is_ready():
+                    return False
+
+                # Validate external hostname.
+                if not self._ingress_url:
+                    return False
+
+                # The gateway Services exist now that the gateway is ready; the ports are only
+                # applied once the Gateway is
+                self._sync_http3_service_ports(
+                    self._partition_listeners(
+                        snapshot.listeners,
+                        [*snapshot.valid_http_routes, *snapshot.valid_grpc_routes],
+                    )
+                )
+
+                # Update upstream ingress relation with current host, port, and scheme.
+                # This ensures the upstream always has fresh data about how to reach this gateway.
+                # No-op if no upstream ingress is related.
+                self.upstream_ingress.provide_ingress_requirements(
+                    **self._generate_upstream_ingress_route_configuration(snapshot.tls_enabled)
+                )
+
+                # Synchronize ingress resources
+                try:
+                    self._reconcile_ingress_resources(
+                        http_routes=snapshot.valid_http_routes,
+                        grpc_routes=snapshot.valid_grpc_routes,
+                    )
+                except ApiError as e:
+                    logger.error("Ingress sync failed: %s", e)
+                    raise e
+        except Exception:
+            # Ingress resources may have been left half-reconciled, so reconcile all of them next
+            # time
+            self._stored.ingress_route_groups = None
+            raise
+        finally:
+            self._reconciler = None
+        for name, handler in self._reconcile_result_handlers:
+            handler(reconciler.result(name))
+        return True
 
     def _on_collect_status(self, event: CollectStatusEvent):
         """Collect unit status from sub-collectors."""
@@ -1078,6 +1604,12 @@ class IstioIngressCharm(CharmBase):
         self._collect_readiness_status(event)
         self._collect_external_hostname_status(event)
         self._collect_listener_hostname_status(event)
+        self._collect_gateway_shards_status(event)
+        self._collect_autoscaling_status(event)
+        self._collect_backend_traffic_status(event)
+        self._collect_rate_limit_status(event)
+        self._collect_compression_status(event)
+        self._collect_gateway_proxy_status(event)
         event.add_status(ActiveStatus(f"Serving at {self._ingress_url}"))
 
     def _collect_leadership_status(self, event: CollectStatusEvent):
@@ -1102,13 +1634,12 @@ class IstioIngressCharm(CharmBase):
             event.add_status(BlockedStatus("Route conflict detected. Check the logs for more information."))
 
     def _are_routes_removed(self) -> bool:
-        """Return if there are routes removed because of collision."""
-        ipa_http_routes = self._get_normalized_ipa_routes()
-        istio_http_routes, istio_grpc_routes = self._get_normalized_istio_routes()
-        _, http_apps_to_clear = deduplicate_http_routes(ipa_http_routes + istio_http_routes)
-        _, grpc_apps_to_clear = deduplicate_grpc_routes(istio_grpc_routes)
-        all_apps_to_clear = http_apps_to_clear | grpc_apps_to_clear
-        return len(all_apps_to_clear) > 0
+        """Return if there are routes removed because of collision.
+
+        Reuses the snapshot taken by `_sync_all_resources` in this hook, if there was one.
+        """
+        snapshot = self._ingress_snapshot or self._build_ingress_snapshot()
+        return len(snapshot.apps_to_clear) > 0
 
     def _collect_external_authorization_status(self, event: CollectStatusEvent):
         """Block if Ingress configuration relation missing, but valid authentication configuration are provided.
@@ -1120,21 +1651,27 @@ class IstioIngressCharm(CharmBase):
             event.add_status(BlockedStatus("Ingress configuration relation missing, yet valid authentication configuration are provided."))
 
     def _collect_readiness_status(self, event: CollectStatusEvent):
-        """Set to maintenance/blocked if gateway resources are not ready.
+        """Set to waiting/maintenance/blocked if gateway resources are not ready.
 
-        Uses non-blocking single checks to avoid blocking the charm agent.
+        Uses non-blocking single checks to avoid blocking the charm agent.  While readiness
+        retries are pending, the charm is waiting rather than blocked.
         """
         deployment_ready = self._check_deployment_ready()
-        lb_ready = bool(self._get_lb_external_address)
+        without_address = self._gateways_without_address()
+
+        if deployment_ready and not without_address:
+            return
 
-        if deployment_ready and lb_ready:
+        if self._gateway_readiness_retry_scheduled or self._gateway_readiness_retry_pending:
+            event.add_status(WaitingStatus("Waiting for gateway readiness; retry scheduled"))
             return
 
         event.add_status(MaintenanceStatus("Validating gateway readiness"))
         if not deployment_ready:
-            event.add_status(BlockedStatus("Gateway k8s deployment not ready, is istio properly installed?"))
-        if not lb_ready:
-            event.add_status(BlockedStatus("Gateway load balancer is unable to obtain an IP or hostname from the cluster."))
+            unready = ", ".join(self._unready_gateway_deployments())
+            event.add_status(BlockedStatus(f"Gateway k8s deployment not ready ({unready}), is istio properly installed?"))
+        if without_address:
+            event.add_status(BlockedStatus(f"Gateway load balancer is unable to obtain an IP or hostname from the cluster ({', '.join(without_address)})."))
 
     def _collect_external_hostname_status(self, event: CollectStatusEvent):
         """Block on invalid external hostname.
@@ -1160,6 +1697,66 @@ class IstioIngressCharm(CharmBase):
                 )
             )
 
+    def _collect_gateway_shards_status(self, event: CollectStatusEvent):
+        """Block if the gateway-shards config cannot be honoured.
+
+        (Should be called on the leader unit only.)
+        """
+        if error := self._gateway_sharding_error:
+            event.add_status(
+                BlockedStatus(f"Invalid gateway-shards config: {error}; using a single gateway.")
+            )
+
+    def _collect_autoscaling_status(self, event: CollectStatusEvent):
+        """Block if the autoscaling config cannot be honoured.
+
+        (Should be called on the leader unit only.)
+        """
+        if error := self._autoscaling_config_error:
+            event.add_status(
+                BlockedStatus(f"Invalid autoscaling config: {error}; replicas follow the units.")
+            )
+
+    def _collect_backend_traffic_status(self, event: CollectStatusEvent):
+        """Block if the backend traffic config cannot be honoured.
+
+        (Should be called on the leader unit only.)
+        """
+        if error := self._backend_traffic_config_error:
+            event.add_status(
+                BlockedStatus(f"Invalid backend traffic config: {error}; using Istio defaults.")
+            )
+
+    def _collect_rate_limit_status(self, event: CollectStatusEvent):
+        """Block if the rate limit config cannot be honoured.
+
+        (Should be called on the leader unit only.)
+        """
+        if error := self._rate_limit_config_error:
+            event.add_status(
+                BlockedStatus(f"Invalid rate limit config: {error}; not rate limiting.")
+            )
+
+    def _collect_compression_status(self, event: CollectStatusEvent):
+        """Block if the compression config cannot be honoured.
+
+        (Should be called on the leader unit only.)
+        """
+        if error := self._compression_config_error:
+            event.add_status(
+                BlockedStatus(f"Invalid compression config: {error}; not compressing.")
+            )
+
+    def _collect_gateway_proxy_status(self, event: CollectStatusEvent):
+        """Block if the gateway proxy config cannot be honoured.
+
+        (Should be called on the leader unit only.)
+        """
+        if error := self._gateway_proxy_config_error:
+            event.add_status(
+                BlockedStatus(f"Invalid gateway proxy config: {error}; using Istio defaults.")
+            )
+
     def _get_oauth_decisions_address(self) -> Optional[str]:
         """Retrieve the auth configuration decisions_address if it exists.
 
@@ -1218,10 +1815,31 @@ class IstioIngressCharm(CharmBase):
             for rel in self.model.relations.get(relation_name, []):
                 app_name = rel.app.name
                 route_key = (app_name, relation_name)
-                config = handler.get_config(rel) if rel.active else None
+                config = self._parse_istio_ingress_route_config(handler, rel) if rel.active else None
                 configs[route_key] = {"handler": handler, "config": config}
         return configs
 
+    @staticmethod
+    def _parse_istio_ingress_route_config(
+        handler: IstioIngressRouteProvider, relation: Relation
+    ) -> Optional[IstioIngressRouteConfig]:
+        """Return the config published on an istio-ingress-route relation, if any.
+
+        The config is parsed with the in-repo istio_ingress_route lib rather than with
+        `handler.get_config`, as the packaged interface library lacks the fields the lib added
+        since (route timeouts, backend traffic policies, ...) and would silently drop them.
+        """
+        if not handler.is_ready(relation):
+            return None
+        config_json = relation.data[relation.app].get("config")
+        if not config_json:
+            return None
+        try:
+            return IstioIngressRouteConfig.model_validate_json(config_json)
+        except ValidationError as e:
+            logger.error(f"Failed to parse istio-ingress-route config from {relation}: {e}")
+            return None
+
     def _get_routes_from_ingress(self, relation_name: str):
         """Retrieve all routes from the given relation, and associated relation_handlers.
 
@@ -1262,9 +1880,19 @@ class IstioIngressCharm(CharmBase):
             )
         return application_route_data
 
+    def _gateway_address_for_app(self, app_name: str) -> Optional[str]:
+        """Return the address of the gateway shard serving an app.
+
+        If the shard's LoadBalancer has no address yet, a readiness retry is scheduled.
+        """
+        address = self._get_gateway_address(self._gateway_name_for_app(app_name))
+        if address is None and not self._gateway_readiness_retry_scheduled:
+            logger.info("Gateway shard of %s has no address yet; scheduling a retry", app_name)
+            self._schedule_readiness_retry()
+        return address
+
     def _publish_routes_to_ingressed_applications(self, route_data):
         """Update the ingress relation for all routes."""
-        ingress_url = self._ingress_url_with_scheme()
         for (app_name, relation_name), this_route_data in route_data.items():
             relation_handler = this_route_data["handler"]
             routes = this_route_data["routes"]
@@ -1280,10 +1908,13 @@ class IstioIngressCharm(CharmBase):
                 relation_handler.wipe_ingress_data(rel)
                 continue
 
+            if not (address := self._gateway_address_for_app(app_name)):
+                continue
+            ingress_url = f"{self._ingressed_scheme}://{address}"
             relation_handler.publish_url(rel, ingress_url + routes[0]["prefix"])
 
     def _publish_istio_ingress_route_data(
-        self, istio_ingress_route_configs: Dict, apps_to_clear: set
+        self, istio_ingress_route_configs: Dict, apps_to_clear: set, is_tls_enabled: bool
     ):
         """Update istio-ingress-route relations with external host and TLS status.
 
@@ -1293,9 +1924,8 @@ class IstioIngressCharm(CharmBase):
         Args:
             istio_ingress_route_configs: Dict mapping (app_name, relation_name) to config data
             apps_to_clear: Set of (app_name, relation_name) tuples that have conflicts
+            is_tls_enabled: Whether TLS is enabled on the gateway
         """
-        is_tls_enabled = self._construct_gateway_tls_secret() is not None
-
         for (app_name, relation_name), config_data in istio_ingress_route_configs.items():
             relation_handler = config_data["handler"]
             app_key = (app_name, relation_name)
@@ -1307,10 +1937,10 @@ class IstioIngressCharm(CharmBase):
                 logger.debug(
                     f"Cleared istio-ingress-route data for {app_name} on {relation_name} due to route conflict"
                 )
-            else:
+            elif address := self._gateway_address_for_app(app_name):
                 # Publish ingress address for apps without conflicts
                 relation_handler.update_ingress_address(
-                    external_host=self._ingress_url,
+                    external_host=address,
                     tls_enabled=is_tls_enabled,
                 )
 
@@ -1337,6 +1967,305 @@ class IstioIngressCharm(CharmBase):
             headers_to_downstream_on_deny=DEFAULT_HEADERS_TO_DOWNSTREAM_ON_DENY,
         )
 
+    def _run_reconcile_step(
+        self,
+        name: str,
+        step: Callable[[], Any],
+        after: Iterable[str] = (),
+        on_result: Optional[Callable[[Any], None]] = None,
+    ):
+        """Run a reconcile step concurrently if within `_sync_all_resources`, otherwise right away.
+
+        Steps run in worker threads, so they must not touch the Juju model.  A step whose outcome
+        must be recorded in the charm's state returns it instead, and `on_result` is called with
+        it on the main thread once all the steps succeeded.
+        """
+        if self._reconciler is None:
+            result = step()
+            if on_result:
+                on_result(result)
+            return
+        self._reconciler.submit(name, step, after=after)
+        if on_result:
+            self._reconcile_result_handlers.append((name, on_result))
+
+    def _sync_rate_limit_filters(self, listeners: List[GatewayListener]):
+        """Reconcile the EnvoyFilters applying the local rate limits of the listeners."""
+        krm = self._get_rate_limit_resource_manager()
+        resources = self._construct_rate_limit_filters(listeners)
+        self._run_reconcile_step("rate-limits", functools.partial(krm.reconcile, resources))
+
+    @property
+    def _rate_limit_config_error(self) -> Optional[str]:
+        """Return why the rate limit config cannot be honoured, or None if it can."""
+        for option in ("rate-limit-requests-per-second", "rate-limit-burst"):
+            if int(self.config[option]) < 0:
+                return f"{option} cannot be negative"
+        return None
+
+    def _listener_rate_limit(self, listener: GatewayListener) -> Optional[Dict[str, int]]:
+        """Return the local rate limit of a listener: the stricter of the config and its own."""
+        configured = None
+        if not self._rate_limit_config_error and (
+            requests_per_second := int(self.config["rate-limit-requests-per-second"])
+        ):
+            configured = {
+                "requests_per_second": requests_per_second,
+                "burst": int(self.config["rate-limit-burst"]) or requests_per_second,
+            }
+        return stricter_rate_limit(configured, listener.get("rate_limit"))
+
+    def _construct_rate_limit_filters(self, listeners: List[GatewayListener]) -> List:
+        """Construct the EnvoyFilters applying the local rate limits of the listeners.
+
+        Each gateway gets one EnvoyFilter, inserting a token bucket local_ratelimit HTTP filter in
+        the filter chain of each rate limited listener.  The buckets are per gateway replica, and
+        requests exceeding them are answered with 429 by the gateway, before reaching any backend.
+        """
+        config_patches = []
+        for listener in sorted(listeners, key=lambda listener: listener["port"]):
+            if not (rate_limit := self._listener_rate_limit(listener)):
+                continue
+            config_patches.append(
+                gateway_http_filter_patch(
+                    listener["port"],
+                    {
+                        "name": "envoy.filters.http.local_ratelimit",
+                        "typed_config": {
+                            "@type": "type.googleapis.com/envoy.extensions.filters.http.local_ratelimit.v3.LocalRateLimit",
+                            "stat_prefix": "http_local_rate_limiter",
+                            "token_bucket": {
+                                "max_tokens": rate_limit["burst"],
+                                "tokens_per_fill": rate_limit["requests_per_second"],
+                                "fill_interval": "1s",
+                            },
+                            "filter_enabled": {
+                                "runtime_key": "local_rate_limit_enabled",
+                                "default_value": {"numerator": 100, "denominator": "HUNDRED"},
+                            },
+                            "filter_enforced": {
+                                "runtime_key": "local_rate_limit_enforced",
+                                "default_value": {"numerator": 100, "denominator": "HUNDRED"},
+                            },
+                        },
+                    },
+                )
+            )
+        return self._construct_gateway_envoy_filters("local-rate-limit", config_patches)
+
+    def _construct_gateway_envoy_filters(
+        self, name_suffix: str, config_patches: List[Dict[str, Any]]
+    ) -> List:
+        """Return an EnvoyFilter applying the config patches to each gateway, if there are any."""
+        if not config_patches:
+            return []
+        return [
+            RESOURCE_TYPES["EnvoyFilter"](
+                metadata=ObjectMeta(
+                    name=f"{gateway_name}-{name_suffix}", namespace=self.model.name
+                ),
+                spec={
+                    "workloadSelector": {
+                        "labels": {"gateway.networking.k8s.io/gateway-name": gateway_name}
+                    },
+                    "configPatches": config_patches,
+                },
+            )
+            for gateway_name in self._gateway_names
+        ]
+
+    def _sync_compression_filters(self, listeners: List[GatewayListener]):
+        """Reconcile the EnvoyFilters compressing the responses served by the listeners."""
+        krm = self._get_compression_resource_manager()
+        resources = self._construct_compression_filters(listeners)
+        self._run_reconcile_step("compression", functools.partial(krm.reconcile, resources))
+
+    @property
+    def _compression_config_error(self) -> Optional[str]:
+        """Return why the compression config cannot be honoured, or None if it can."""
+        algorithms = split_config_list(str(self.config["compression-algorithms"]))
+        if unknown := [a for a in algorithms if a not in COMPRESSION_LIBRARIES]:
+            return f"unknown compression-algorithms {', '.join(unknown)}"
+        if int(self.config["compression-min-content-length"]) < 0:
+            return "compression-min-content-length cannot be negative"
+        return None
+
+    def _listener_compression(self, listener: GatewayListener) -> Optional[Dict[str, Any]]:
+        """Return the response compression of a listener: the configured one, or else its own.
+
+        A listener's own compression can only turn compression on, so that an app cannot weaken
+        the compression the operator configured.
+        """
+        if self._compression_config_error:
+            return None
+        if not (algorithms := split_config_list(str(self.config["compression-algorithms"]))):
+            return listener.get("compression")
+        return {
+            "algorithms": algorithms,
+            "min_content_length": int(self.config["compression-min-content-length"]),
+            "content_types": split_config_list(str(self.config["compression-content-types"])),
+        }
+
+    def _construct_compression_filters(self, listeners: List[GatewayListener]) -> List:
+        """Construct the EnvoyFilters compressing the responses served by the listeners.
+
+        Each gateway gets one EnvoyFilter, inserting a compressor HTTP filter per algorithm in the
+        filter chain of each listener with compression.  Envoy picks the algorithm from the
+        client's Accept-Encoding, preferring the earlier ones on ties.
+        """
+        config_patches = []
+        for listener in sorted(listeners, key=lambda listener: listener["port"]):
+            compression = self._listener_compression(listener)
+            if not compression:
+                continue
+            common_config: Dict[str, Any] = {
+                "min_content_length": compression["min_content_length"]
+            }
+            if compression["content_types"]:
+                # Envoy compresses a set of common text types by default
+                common_config["content_type"] = compression["content_types"]
+            for algorithm in compression["algorithms"]:
+                library_name, library_type = COMPRESSION_LIBRARIES[algorithm]
+                config_patches.append(
+                    gateway_http_filter_patch(
+                        listener["port"],
+                        {
+                            "name": f"envoy.filters.http.compressor.{algorithm}",
+                            "typed_config": {
+                                "@type": "type.googleapis.com/envoy.extensions.filters.http.compressor.v3.Compressor",
+                                "response_direction_config": {"common_config": common_config},
+                                "compressor_library": {
+                                    "name": library_name,
+                                    "typed_config": {"@type": library_type},
+                                },
+                            },
+                        },
+                    )
+                )
+        return self._construct_gateway_envoy_filters("compression", config_patches)
+
+    def _sync_listener_options_filters(self, listeners: List[GatewayListener]):
+        """Reconcile the EnvoyFilters applying the connection options of the listeners."""
+        krm = self._get_listener_options_resource_manager()
+        resources = self._construct_listener_options_filters(listeners)
+        self._run_reconcile_step("listener-options", functools.partial(krm.reconcile, resources))
+
+    def _construct_listener_options_filters(self, listeners: List[GatewayListener]) -> List:
+        """Construct the EnvoyFilters applying the connection options of the listeners.
+
+        Each gateway gets one EnvoyFilter, merging the per-connection buffer limit into each
+        listener, and the HTTP/2 options into the HTTP connection manager of each listener, for
+        both h2 (negotiated with ALPN on TLS listeners) and h2c clients.
+        """
+        ports = sorted({listener["port"] for listener in listeners})
+        config_patches: List[Dict[str, Any]] = []
+        if (buffer_limit := int(self.config["gateway-per-connection-buffer-limit"])) > 0:
+            config_patches += [
+                {
+                    "applyTo": "LISTENER",
+                    "match": {"context": "GATEWAY", "listener": {"portNumber": port}},
+                    "patch": {
+                        "operation": "MERGE",
+                        "value": {"per_connection_buffer_limit_bytes": buffer_limit},
+                    },
+                }
+                for port in ports
+            ]
+        max_concurrent_streams = int(self.config["http2-max-concurrent-streams"])
+        if max_concurrent_streams <= 0:
+            return self._construct_gateway_envoy_filters("listener-options", config_patches)
+        config_patches += [
+            {
+                "applyTo": "NETWORK_FILTER",
+                "match": {
+                    "context": "GATEWAY",
+                    "listener": {
+                        "portNumber": port,
+                        "filterChain": {
+                            "filter": {"name": "envoy.filters.network.http_connection_manager"}
+                        },
+                    },
+                },
+                "patch": {
+                    "operation": "MERGE",
+                    "value": {
+                        "typed_config": {
+                            "@type": "type.googleapis.com/envoy.extensions.filters.network.http_connection_manager.v3.HttpConnectionManager",
+                            "http2_protocol_options": {
+                                "max_concurrent_streams": max_concurrent_streams
+                            },
+                        }
+                    },
+                },
+            }
+            for port in ports
+        ]
+        return self._construct_gateway_envoy_filters("listener-options", config_patches)
+
+    def _construct_http3_services(
+        self, shard_listeners: Dict[str, List[GatewayListener]]
+    ) -> List[Service]:
+        """Return the HTTP/3 ports of the Service of each gateway, as partial Services.
+
+        With the `http3` option, each HTTPS listener is also exposed over UDP for QUIC.  Without
+        it, the Services have no ports, which releases those applied before.
+        """
+        http3 = bool(self.config["http3"])
+        return [
+            Service(
+                metadata=ObjectMeta(name=f"{gateway_name}-istio", namespace=self.model.name),
+                spec=ServiceSpec(
+                    ports=[
+                        ServicePort(
+                            name=f"http3-{listener['port']}",
+                            port=listener["port"],
+                            targetPort=listener["port"],
+                            protocol="UDP",
+                        )
+                        for listener in listeners
+                        if http3 and listener["gateway_protocol"] == "HTTPS"
+                    ]
+                ),
+            )
+            for gateway_name, listeners in shard_listeners.items()
+        ]
+
+    def _sync_http3_service_ports(self, shard_listeners: Dict[str, List[GatewayListener]]):
+        """Add the HTTP/3 ports to the Services of the gateways, or remove them.
+
+        Istio manages these Services, so the ports are server-side applied by a field manager of
+        their own, leaving the ports managed by Istio alone.  A Service Istio hasn't created yet
+        is skipped rather than created without its other ports; its gateway's readiness triggers
+        a new sync once it exists.
+        """
+        services = self._construct_http3_services(shard_listeners)
+        has_http3_ports = any(service.spec and service.spec.ports for service in services)
+        if not has_http3_ports and not self._stored.http3_service_ports:
+            return
+        client = self.lightkube_client
+        field_manager = f"{self.app.name}-{HTTP3_FIELD_MANAGER_SUFFIX}"
+
+        def _apply():
+            for service in services:
+                name = cast(str, service.metadata.name)  # pyright: ignore
+                try:
+                    client.get(Service, name=name, namespace=self.model.name)
+                except ApiError as e:
+                    if e.status.code != 404:
+                        raise
+                    logger.info("Service %s does not exist yet, not applying HTTP/3 ports", name)
+                    continue
+                client.apply(service, field_manager=field_manager, force=True)
+            return has_http3_ports
+
+        def _remember_ports(applied: bool):
+            # Only remember the ports once applied, so that a failed apply is retried
+            self._stored.http3_service_ports = applied
+
+        self._run_reconcile_step(
+            "http3-service-ports", _apply, after=("gateway",), on_result=_remember_ports
+        )
+
     def _sync_ext_authz_auth_policy(
         self, auth_decisions_address: Optional[str], unauthenticated_paths: List[str]
     ):
@@ -1348,7 +2277,15 @@ class IstioIngressCharm(CharmBase):
             provider_name = self.ingress_config.get_ext_authz_provider_name()
             resources.append(self._construct_ext_authz_policy(provider_name, unauthenticated_paths=unauthenticated_paths))  # type: ignore
 
-        policy_manager.reconcile(policies=[], mesh_type=MeshType.istio, raw_policies=resources)
+        self._run_reconcile_step(
+            "ext-authz-policy",
+            functools.partial(
+                policy_manager.reconcile,
+                policies=[],
+                mesh_type=MeshType.istio,
+                raw_policies=resources,
+            ),
+        )
 
     def _sync_external_traffic_auth_policy(self):
         """Reconcile the AuthorizationPolicy that allows external traffic to the gateway."""
@@ -1356,13 +2293,31 @@ class IstioIngressCharm(CharmBase):
         cidrs_config = cast(str, self.config["external-traffic-policy-cidrs"])
         ip_blocks = [cidr.strip() for cidr in cidrs_config.split(",") if cidr.strip()]
         resources = [self._construct_external_traffic_auth_policy(ip_blocks)]
-        policy_manager.reconcile(policies=[], mesh_type=MeshType.istio, raw_policies=resources)
+        self._run_reconcile_step(
+            "external-traffic-policy",
+            functools.partial(
+                policy_manager.reconcile,
+                policies=[],
+                mesh_type=MeshType.istio,
+                raw_policies=resources,
+            ),
+        )
 
-    def _sync_gateway_resources(self, normalized_listeners: List[GatewayListener]):
+    def _sync_gateway_resources(
+        self,
+        normalized_listeners: List[GatewayListener],
+        http_routes: Iterable[HTTPRoute] = (),
+        grpc_routes: Iterable[GRPCRoute] = (),
+    ):
         """Synchronize Gateway resources using normalized listeners.
 
+        With gateway sharding, a Gateway and HPA are reconciled for each shard, each Gateway
+        only having the listeners its routes are bound to.
+
         Args:
             normalized_listeners: List of normalized Gateway listeners (already merged and deduplicated)
+            http_routes: Normalized HTTP routes, used to partition the listeners across shards
+            grpc_routes: Normalized gRPC routes, used to partition the listeners across shards
         """
         unit_count = self.model.app.planned_units()
         krm = self._get_gateway_resource_manager()
@@ -1377,20 +2332,122 @@ class IstioIngressCharm(CharmBase):
             if secret := self._construct_gateway_tls_secret():
                 resources_list.append(secret)
 
-            resources_list.append(self._construct_gateway(normalized_listeners))
-            resources_list.append(self._construct_hpa(unit_count))
+            shard_listeners = self._partition_listeners(
+                normalized_listeners, [*http_routes, *grpc_routes]
+            )
+            for gateway_name, listeners in shard_listeners.items():
+                resources_list.append(self._construct_gateway(listeners, gateway_name))
+                resources_list.append(self._construct_hpa(unit_count, gateway_name))
+                if self._autoscaling_max_replicas:
+                    resources_list.append(self._construct_pdb(gateway_name))
+                resources_list.append(self._construct_gateway_parameters(gateway_name))
 
         # Use PatchType.MERGE for Gateway resources to remove any stale fields in the resource with the same name.
         # This ensures:
         # 1. Stale listeners are removed when protocols change (e.g., http-8080 -> https-8080)
         # 2. Omitted fields like hostname are properly removed from the resource
         # Without MERGE, Server-Side Apply accumulates stale listeners and preserves omitted fields.
-        krm.reconcile(resources_list, patch_type=PatchType.MERGE)
+        self._run_reconcile_step(
+            "gateway",
+            functools.partial(krm.reconcile, resources_list, patch_type=PatchType.MERGE),
+        )
+
+    @property
+    def _http_route_packing_enabled(self) -> bool:
+        """Whether HTTP routes are packed into as few HTTPRoute objects as possible."""
+        return bool(self.config["pack-http-routes"])
+
+    def _http_route_pack_key(self, route: HTTPRoute) -> Tuple[str, str, str]:
+        """Return the (namespace, gateway, listener) an HTTP route is packed by."""
+        listener_name = f"{route['listener_protocol'].lower()}-{route['listener_port']}"
+        return route["namespace"], self._gateway_name_for_app(route["source_app"]), listener_name
+
+    def _pack_http_routes(
+        self, http_routes: List[HTTPRoute]
+    ) -> Dict[Tuple[str, str], List[HTTPRoute]]:
+        """Pack HTTP routes sharing a (namespace, gateway, listener) into HTTPRoute objects.
+
+        Routes are sorted by name and split into objects of at most HTTPROUTE_MAX_RULES rules,
+        named `{gateway}-httproute-{listener}-{index}`.  The packing only depends on the set of
+        routes, so the same routes always produce the same objects, and adding or removing a
+        route only changes the objects of its own (namespace, gateway, listener).
+
+        Args:
+            http_routes: List of normalized, deduplicated HTTP routes
+
+        Returns:
+            Dict mapping (namespace, object name) to the routes packed into that object
+        """
+        by_listener: Dict[Tuple[str, str, str], List[HTTPRoute]] = {}
+        for route in http_routes:
+            by_listener.setdefault(self._http_route_pack_key(route), []).append(route)
+
+        packs: Dict[Tuple[str, str], List[HTTPRoute]] = {}
+        for (namespace, gateway_name, listener_name), routes in sorted(by_listener.items()):
+            routes = sorted(routes, key=lambda r: r["name"])
+            for index in range(0, len(routes), HTTPROUTE_MAX_RULES):
+                name = f"{gateway_name}-httproute-{listener_name}-{index // HTTPROUTE_MAX_RULES}"
+                packs[(namespace, name)] = routes[index : index + HTTPROUTE_MAX_RULES]
+        return packs
+
+    def _construct_httproute(self, name: str, namespace: str, routes: List[HTTPRoute]):
+        """Construct a single HTTPRoute K8s resource with one rule per normalized route.
+
+        Args:
+            name: Name of the HTTPRoute
+            namespace: Namespace of the HTTPRoute
+            routes: Normalized routes, all on the same gateway shard and listener
+
+        Returns:
+            HTTPRoute lightkube resource
+        """
+        # Derive listener name from Gateway protocol and port
+        listener_name = f"{routes[0]['listener_protocol'].lower()}-{routes[0]['listener_port']}"
+
+        # Construct HTTPRoute resource from normalized data
+        http_route_resource = HTTPRouteResource(
+            metadata=Metadata(
+                name=name,
+                namespace=namespace,
+            ),
+            spec=HTTPRouteResourceSpec(
+                parentRefs=[
+                    ParentRef(
+                        name=self._gateway_name_for_app(routes[0]["source_app"]),
+                        namespace=self.model.name,
+                        sectionName=listener_name,
+                    )
+                ],
+                rules=[
+                    HTTPRouteRule(
+                        matches=route["matches"],  # Already charm HTTPRouteMatch models
+                        backendRefs=route["backend_refs"],  # Already charm BackendRef models
+                        filters=route["filters"] if route["filters"] else None,
+                    )
+                    for route in routes
+                ],
+            ),
+        )
+
+        # HTTPRouteRule has no timeouts field, so add them to the dumped rules
+        spec = http_route_resource.spec.model_dump(exclude_none=True)
+        for rule, route in zip(spec["rules"], routes):
+            if timeouts := route.get("timeouts"):
+                rule["timeouts"] = timeouts
+
+        # Convert to lightkube resource
+        httproute_lk_resource = RESOURCE_TYPES["HTTPRoute"]
+        return httproute_lk_resource(
+            metadata=ObjectMeta.from_dict(http_route_resource.metadata.model_dump()),
+            spec=spec,
+        )
 
     def _construct_httproutes(self, http_routes: List[HTTPRoute]) -> List:
         """Construct HTTPRoute K8s resources from normalized HTTP routes.
 
         This method is fully source-agnostic - normalized data already contains charm models.
+        By default, each route gets its own HTTPRoute.  With the `pack-http-routes` config
+        option, routes are packed into as few HTTPRoutes as possible (see `_pack_http_routes`).
 
         Args:
             http_routes: List of normalized, deduplicated HTTP routes with charm models
@@ -1398,46 +2455,15 @@ class IstioIngressCharm(CharmBase):
         Returns:
             List of HTTPRoute lightkube resources
         """
-        httproutes = []
-
-        for route in http_routes:
-            # Derive listener name from Gateway protocol and port
-            listener_name = f"{route['listener_protocol'].lower()}-{route['listener_port']}"
-
-            # Construct HTTPRoute resource from normalized data
-            http_route_resource = HTTPRouteResource(
-                metadata=Metadata(
-                    name=route["name"],
-                    namespace=route["namespace"],
-                ),
-                spec=HTTPRouteResourceSpec(
-                    parentRefs=[
-                        ParentRef(
-                            name=self.app.name,
-                            namespace=self.model.name,
-                            sectionName=listener_name,
-                        )
-                    ],
-                    rules=[
-                        HTTPRouteRule(
-                            matches=route["matches"],  # Already charm HTTPRouteMatch models
-                            backendRefs=route["backend_refs"],  # Already charm BackendRef models
-                            filters=route["filters"] if route["filters"] else None,
-                        )
-                    ],
-                ),
-            )
-
-            # Convert to lightkube resource
-            httproute_lk_resource = RESOURCE_TYPES["HTTPRoute"]
-            httproutes.append(
-                httproute_lk_resource(
-                    metadata=ObjectMeta.from_dict(http_route_resource.metadata.model_dump()),
-                    spec=http_route_resource.spec.model_dump(exclude_none=True),
-                )
-            )
-
-        return httproutes
+        if self._http_route_packing_enabled:
+            return [
+                self._construct_httproute(name, namespace, routes)
+                for (namespace, name), routes in self._pack_http_routes(http_routes).items()
+            ]
+        return [
+            self._construct_httproute(route["name"], route["namespace"], [route])
+            for route in http_routes
+        ]
 
     def _construct_grpcroutes(self, grpc_routes: List[GRPCRoute]) -> List:
         """Construct GRPCRoute K8s resources from normalized gRPC routes.
@@ -1465,7 +2491,7 @@ class IstioIngressCharm(CharmBase):
                 spec=GRPCRouteResourceSpec(
                     parentRefs=[
                         ParentRef(
-                            name=self.app.name,
+                            name=self._gateway_name_for_app(route["source_app"]),
                             namespace=self.model.name,
                             sectionName=listener_name,
                         )
@@ -1492,7 +2518,10 @@ class IstioIngressCharm(CharmBase):
         return grpcroutes
 
     def _construct_auth_policies(
-        self, http_routes: List[HTTPRoute], grpc_routes: List[GRPCRoute]
+        self,
+        http_routes: List[HTTPRoute],
+        grpc_routes: List[GRPCRoute],
+        backends: Optional[Set[Tuple[str, str]]] = None,
     ) -> List:
         """Construct L4 authorization policies from normalized routes.
 
@@ -1502,6 +2531,7 @@ class IstioIngressCharm(CharmBase):
         Args:
             http_routes: List of normalized HTTP routes
             grpc_routes: List of normalized gRPC routes
+            backends: If set, only construct the policies for these (service, namespace) backends
 
         Returns:
             List of AuthorizationPolicy lightkube resources
@@ -1512,12 +2542,14 @@ class IstioIngressCharm(CharmBase):
         for route in http_routes:
             for backend_ref in route["backend_refs"]:
                 key = (backend_ref.name, backend_ref.namespace)
-                backend_ports.setdefault(key, set()).add(backend_ref.port)
+                if backends is None or key in backends:
+                    backend_ports.setdefault(key, set()).add(backend_ref.port)
 
         for route in grpc_routes:
             for backend_ref in route["backend_refs"]:
                 key = (backend_ref.name, backend_ref.namespace)
-                backend_ports.setdefault(key, set()).add(backend_ref.port)
+                if backends is None or key in backends:
+                    backend_ports.setdefault(key, set()).add(backend_ref.port)
 
         return [
             self._construct_auth_policy_from_ingress_to_target(
@@ -1528,52 +2560,71 @@ class IstioIngressCharm(CharmBase):
             for (name, namespace), ports in backend_ports.items()
         ]
 
-    def _construct_grpc_destination_rules(self, grpc_routes: List[GRPCRoute]) -> List:
-        """Construct DestinationRules for gRPC backends.
+    def _destination_rule_ids(self, service: str, namespace: str) -> List[Tuple[str, str]]:
+        """Return the (name, namespace) of every DestinationRule a backend service may have."""
+        return [
+            # Name: {servicename}-grpc-dest-rule-{ingresscharmname}, in the backend's namespace
+            (f"{service}-grpc-dest-rule-{self.app.name}", namespace),
+            # Name: {servicename}-{namespace}-dest-rule-{ingresscharmname}, in the gateway's
+            (f"{service}-{namespace}-dest-rule-{self.app.name}", self.model.name),
+        ]
 
-        Creates one DestinationRule per unique (service, namespace) backend
-        with useClientProtocol=true to preserve gRPC protocol through gateway.
+    def _construct_destination_rules(
+        self,
+        http_routes: List[HTTPRoute],
+        grpc_routes: List[GRPCRoute],
+        backends: Optional[Set[Tuple[str, str]]] = None,
+    ) -> List:
+        """Construct DestinationRules for the ingressed backends.
+
+        Creates one DestinationRule per unique (service, namespace) gRPC backend, in the
+        backend's namespace, with useClientProtocol=true to preserve gRPC protocol through
+        gateway.  Backends with traffic settings, from the charm config or the routes to them,
+        also get a DestinationRule in the gateway's namespace, exported to that namespace only so
+        that the settings apply to the gateway's traffic and not to other clients of the backend.
+        Istio prefers the rule in the client's namespace, so that one also keeps the client's
+        protocol for gRPC backends.
 
         Args:
+            http_routes: List of normalized HTTP routes
             grpc_routes: List of normalized gRPC routes
+            backends: If set, only construct the rules for these (service, namespace) backends
 
         Returns:
             List of DestinationRule lightkube resources
         """
         destination_rules = []
-        seen_backends = set()
+        backend_settings = merge_backend_traffic_settings(
+            http_routes, grpc_routes, self._backend_traffic_defaults
+        )
 
-        for route in grpc_routes:
-            for backend_ref in route["backend_refs"]:
-                # One DR per unique (service, namespace) - not per port
-                backend_key = (backend_ref.name, backend_ref.namespace)
-                if backend_key not in seen_backends:
-                    seen_backends.add(backend_key)
-
-                    # Build FQDN host
-                    host = f"{backend_ref.name}.{backend_ref.namespace}.svc.cluster.local"
-
-                    # Name: {servicename}-grpc-dest-rule-{ingresscharmname}
-                    dr_name = f"{backend_ref.name}-grpc-dest-rule-{self.app.name}"
-
-                    # Create DestinationRule resource in backend's namespace
-                    dr_resource = RESOURCE_TYPES["DestinationRule"](
-                        metadata=ObjectMeta(
-                            name=dr_name,
-                            namespace=backend_ref.namespace,  # Backend's namespace (same as routes)
-                        ),
+        for (service, namespace), (settings, is_grpc) in sorted(backend_settings.items()):
+            # One DR per unique (service, namespace) - not per port
+            if backends is not None and (service, namespace) not in backends:
+                continue
+
+            host = f"{service}.{namespace}.svc.cluster.local"
+            (grpc_name, grpc_namespace), (name, gateway_namespace) = self._destination_rule_ids(
+                service, namespace
+            )
+            if is_grpc:
+                destination_rules.append(
+                    RESOURCE_TYPES["DestinationRule"](
+                        metadata=ObjectMeta(name=grpc_name, namespace=grpc_namespace),
+                        spec={"host": host, "trafficPolicy": build_traffic_policy({}, True)},
+                    )
+                )
+            if settings:
+                destination_rules.append(
+                    RESOURCE_TYPES["DestinationRule"](
+                        metadata=ObjectMeta(name=name, namespace=gateway_namespace),
                         spec={
                             "host": host,
-                            "trafficPolicy": {
-                                "connectionPool": {
-                                    "http": {
-                                        "useClientProtocol": True
-                                    }
-                                }
-                            }
-                        }
+                            "exportTo": ["."],
+                            "trafficPolicy": build_traffic_policy(settings, is_grpc),
+                        },
                     )
-                    destination_rules.append(dr_resource)
+                )
 
         return destination_rules
 
@@ -1602,18 +2653,261 @@ class IstioIngressCharm(CharmBase):
         # The charm has no control neither over the port name (auto generated by Juju) nor over the appProtocol (Juju controls the service so we cant reliably patch this).
         # Hence the only workaround is to create a DestinationRule that instructs the gateway to usee the same protocol as the client request.
         # This makes sure, when client makes a gRPC request, gateway will automatically use the right http/2 protocol.
-        grpc_drs = self._construct_grpc_destination_rules(grpc_routes)
-        grpc_dr_manager = self._get_grpc_destination_rule_resource_manager()
-        grpc_dr_manager.reconcile(grpc_drs)
+        # Backends with connection pool, outlier detection or load balancing settings get a second
+        # rule in the gateway's namespace, see _construct_destination_rules.
+        destination_rules = self._construct_destination_rules(http_routes, grpc_routes)
+        dr_manager = self._get_destination_rule_resource_manager()
 
-        # Reconcile all resources
+        # Reconcile all resources; the three groups are independent of each other
         # The ingress route resource manager handles both HTTPRoute and GRPCRoute
         route_krm = self._get_ingress_route_resource_manager()
         all_routes = httproutes + grpcroutes
-        route_krm.reconcile(all_routes)
-
         kam = self._get_ingress_auth_policy_resource_manager()
-        kam.reconcile(policies=[], mesh_type=MeshType.istio, raw_policies=auth_policies)
+
+        # Routes can only be attached to the Gateway once it's been applied
+        self._run_reconcile_step(
+            "destination-rules",
+            functools.partial(dr_manager.reconcile, destination_rules),
+            after=("gateway",),
+        )
+        self._run_reconcile_step(
+            "ingress-routes",
+            functools.partial(route_krm.reconcile, all_routes),
+            after=("gateway",),
+        )
+        self._run_reconcile_step(
+            "ingress-auth-policies",
+            functools.partial(
+                kam.reconcile, policies=[], mesh_type=MeshType.istio, raw_policies=auth_policies
+            ),
+            after=("gateway",),
+        )
+
+    def _build_route_group_record(
+        self,
+        http_routes: List[HTTPRoute],
+        grpc_routes: List[GRPCRoute],
+        httproute_names: Dict[int, str],
+    ) -> Dict[str, Any]:
+        """Return what to remember about the resources deployed for one (app, relation).
+
+        The record holds the digest of the app's normalized routes, the (kind, namespace, name)
+        of each route resource, the (namespace, gateway, listener) of its HTTP routes, and the
+        (service, namespace) backends behind the per-backend AuthorizationPolicies and
+        DestinationRules.
+
+        Args:
+            http_routes: The group's normalized HTTP routes
+            grpc_routes: The group's normalized gRPC routes
+            httproute_names: Name of the HTTPRoute object of each HTTP route, by id, if packed
+        """
+        route_ids = {
+            ("HTTPRoute", r["namespace"], httproute_names.get(id(r), r["name"]))
+            for r in http_routes
+        }
+        route_ids |= {("GRPCRoute", r["namespace"], r["name"]) for r in grpc_routes}
+        listeners = {self._http_route_pack_key(r) for r in http_routes}
+        backends = {
+            (b.name, b.namespace) for r in [*http_routes, *grpc_routes] for b in r["backend_refs"]
+        }
+        dr_backends = merge_backend_traffic_settings(
+            http_routes, grpc_routes, self._backend_traffic_defaults
+        )
+        return {
+            "digest": route_group_digest(http_routes, grpc_routes),
+            "routes": sorted(map(list, route_ids)),
+            "http_listeners": sorted(map(list, listeners)),
+            "backends": sorted(map(list, backends)),
+            "dr_backends": sorted(map(list, dr_backends)),
+        }
+
+    def _reconcile_ingress_resources(
+        self, http_routes: List[HTTPRoute], grpc_routes: List[GRPCRoute]
+    ):
+        """Reconcile the ingress resources of only those apps whose routes changed since last sync.
+
+        Routes are grouped by the (app, relation) that requested them, and each group's digest is
+        compared with the one recorded on the previous sync.  Only the route resources of changed
+        groups are built and patched, along with the AuthorizationPolicies and DestinationRules of
+        the backends they touch.  Conflict fallout needs no special handling: an app whose routes
+        were cleared by deduplication simply has a different (or no) group.
+
+        If there is no record of the previous sync, e.g. on the first sync of a new leader, or if
+        HTTP route packing, the number of gateway shards or the default backend traffic settings
+        changed since, all resources are reconciled with `_sync_ingress_resources`.
+
+        Args:
+            http_routes: List of normalized, deduplicated HTTP routes
+            grpc_routes: List of normalized, deduplicated gRPC routes
+        """
+        packing = self._http_route_packing_enabled
+        httproute_names = (
+            {
+                id(route): name
+                for (_, name), routes in self._pack_http_routes(http_routes).items()
+                for route in routes
+            }
+            if packing
+            else {}
+        )
+        records = {
+            f"{app}:{relation}": self._build_route_group_record(
+                group_http, group_grpc, httproute_names
+            )
+            for (app, relation), (group_http, group_grpc) in group_routes_by_source(
+                http_routes, grpc_routes
+            ).items()
+        }
+        layout = {
+            "pack_http_routes": packing,
+            "gateway_shards": len(self._gateway_names),
+            "backend_traffic": self._backend_traffic_defaults,
+        }
+        new_state = json.dumps({**layout, "groups": records})
+
+        stored_state = self._stored.ingress_route_groups
+        if stored_state is None or any(
+            json.loads(stored_state).get(key) != value for key, value in layout.items()
+        ):
+            logger.debug("No usable record of deployed ingress resources; reconciling all of them")
+            self._sync_ingress_resources(http_routes=http_routes, grpc_routes=grpc_routes)
+            self._stored.ingress_route_groups = new_state
+            return
+
+        previous: Dict[str, Dict[str, Any]] = json.loads(stored_state)["groups"]
+        changed = {
+            key
+            for key in records.keys() | previous.keys()
+            if records.get(key, {}).get("digest") != previous.get(key, {}).get("digest")
+        }
+        if not changed:
+            logger.debug("Ingress routes unchanged; skipping ingress resource reconciliation")
+            return
+
+        logger.debug("Reconciling ingress resources for %d changed apps", len(changed))
+        try:
+            self._sync_changed_ingress_resources(
+                http_routes, grpc_routes, changed, previous, records
+            )
+        except Exception:
+            # The deployed state is now unknown, so fall back to a full reconcile next time
+            self._stored.ingress_route_groups = None
+            raise
+        self._stored.ingress_route_groups = new_state
+
+    def _sync_changed_ingress_resources(
+        self,
+        http_routes: List[HTTPRoute],
+        grpc_routes: List[GRPCRoute],
+        changed: Set[str],
+        previous: Dict[str, Dict[str, Any]],
+        records: Dict[str, Dict[str, Any]],
+    ):
+        """Patch and delete the ingress resources affected by the changed route groups.
+
+        Args:
+            http_routes: List of all normalized, deduplicated HTTP routes
+            grpc_routes: List of all normalized, deduplicated gRPC routes
+            changed: Keys of the route groups whose digest changed
+            previous: Route group records from the previous sync
+            records: Route group records for the current routes
+        """
+        if not self.unit.is_leader():
+            raise RuntimeError("Ingress can only be provided on the leader unit.")
+
+        def _collect(source: Dict[str, Dict[str, Any]], field: str, keys) -> set:
+            return {tuple(item) for key in keys for item in source.get(key, {}).get(field, [])}
+
+        desired_route_ids = _collect(records, "routes", records)
+        previous_route_ids = _collect(previous, "routes", previous)
+        desired_backends = _collect(records, "backends", records)
+        desired_dr_backends = _collect(records, "dr_backends", records)
+        affected_backends = _collect(previous, "backends", changed) | _collect(
+            records, "backends", changed
+        )
+        affected_dr_backends = _collect(previous, "dr_backends", changed) | _collect(
+            records, "dr_backends", changed
+        )
+
+        # Delete what was deployed and is no longer wanted.  For routes this is computed over all
+        # groups, since packed HTTPRoutes are shared by the apps of a (namespace, gateway,
+        # listener).
+        stale = [
+            (RESOURCE_TYPES[kind], name, namespace)
+            for kind, namespace, name in previous_route_ids - desired_route_ids
+        ]
+        stale += [
+            (AuthorizationPolicy, self._l4_auth_policy_name(name, namespace), namespace)
+            for name, namespace in affected_backends - desired_backends
+        ]
+        client = self.lightkube_client
+
+        def _delete_stale():
+            for resource_type, name, namespace in stale:
+                try:
+                    client.delete(resource_type, name=name, namespace=namespace)
+                except ApiError as e:
+                    if e.status.code != 404:
+                        raise
+
+        # Patch the changed groups' routes, and the per-backend resources they touch.  The latter
+        # aggregate routes from every group, so they are built from all routes.
+        destination_rules = self._construct_destination_rules(
+            http_routes, grpc_routes, backends=affected_dr_backends & desired_dr_backends
+        )
+        # A backend that is still ingressed may have lost its gRPC routes or its settings, so
+        # delete each of its possible rules that is no longer built
+        built_rules = {(dr.metadata.name, dr.metadata.namespace) for dr in destination_rules}
+        stale += [
+            (RESOURCE_TYPES["DestinationRule"], name, namespace)
+            for service, backend_namespace in sorted(affected_dr_backends)
+            for name, namespace in self._destination_rule_ids(service, backend_namespace)
+            if (name, namespace) not in built_rules
+        ]
+
+        if self._http_route_packing_enabled:
+            # Rebuild every packed HTTPRoute of the (namespace, gateway, listener)s the changed
+            # groups use
+            affected_listeners = _collect(previous, "http_listeners", changed) | _collect(
+                records, "http_listeners", changed
+            )
+            changed_http_routes = [
+                r for r in http_routes if self._http_route_pack_key(r) in affected_listeners
+            ]
+        else:
+            changed_http_routes = [
+                r for r in http_routes if f"{r['source_app']}:{r['source_relation']}" in changed
+            ]
+        changed_grpc_routes = [
+            r for r in grpc_routes if f"{r['source_app']}:{r['source_relation']}" in changed
+        ]
+        routes = self._construct_httproutes(changed_http_routes) + self._construct_grpcroutes(
+            changed_grpc_routes
+        )
+        auth_policies = self._construct_auth_policies(
+            http_routes, grpc_routes, backends=affected_backends & desired_backends
+        )
+
+        # The deleted and patched resources are disjoint, so all of these can run concurrently
+        # once the Gateway the routes attach to has been applied
+        self._run_reconcile_step("stale-ingress-resources", _delete_stale, after=("gateway",))
+        self._run_reconcile_step(
+            "destination-rules",
+            functools.partial(
+                self._get_destination_rule_resource_manager().patch, destination_rules
+            ),
+            after=("gateway",),
+        )
+        self._run_reconcile_step(
+            "ingress-routes",
+            functools.partial(self._get_ingress_route_resource_manager().patch, routes),
+            after=("gateway",),
+        )
+        self._run_reconcile_step(
+            "ingress-auth-policies",
+            functools.partial(self._get_ingress_auth_policy_patch_manager().patch, auth_policies),
+            after=("gateway",),
+        )
 
     def _ingress_url_with_scheme(self) -> str:
         """Return the url to the ingress managed by this charm, including scheme.
@@ -1713,15 +3007,17 @@ class IstioIngressCharm(CharmBase):
         """
         if self.upstream_ingress.is_ready():
             return str(urlparse(self.upstream_ingress.url).scheme)
-        return "https" if self._construct_gateway_tls_secret() is not None else "http"
+        return "https" if self._is_tls_enabled() else "http"
 
-    def _generate_upstream_ingress_route_configuration(self) -> Dict[str, Any]:
+    def _generate_upstream_ingress_route_configuration(self, is_tls: bool) -> Dict[str, Any]:
         """Return the scheme, host, port, and ip needed for the upstream ingress relation.
 
         This tells the upstream ingress provider what address, port, and scheme to use
         to route traffic to this istio-ingress gateway.
+
+        Args:
+            is_tls: Whether TLS is enabled on the gateway
         """
-        is_tls = self._construct_gateway_tls_secret() is not None
         return {
             "scheme": "https" if is_tls else "http",
             "host": self._local_gateway_address,
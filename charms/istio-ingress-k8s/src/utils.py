@@ -8,9 +8,27 @@
 This module contains normalization, deduplication, and helper functions used by the charm.
 Functions here are source-agnostic and work on normalized data structures.
 """
+import hashlib
+import json
 import logging
+import threading
 from collections import defaultdict
-from typing import Dict, List, Optional, Set, Tuple, TypedDict
+from concurrent.futures import Future, ThreadPoolExecutor, wait
+from functools import cached_property
+from os.path import commonprefix
+from typing import (
+    Any,
+    Callable,
+    Dict,
+    Hashable,
+    Iterable,
+    Iterator,
+    List,
+    Optional,
+    Set,
+    Tuple,
+    TypedDict,
+)
 
 from canonical_service_mesh.models import (
     BackendRef,
@@ -29,6 +47,7 @@ from charmlibs.interfaces.istio_ingress_route import (
     to_gateway_protocol,
 )
 from ops import EventBase
+from typing_extensions import NotRequired
 
 HTTPRouteFilter = URLRewriteFilter | RequestRedirectFilter
 GRPCRouteFilter = RequestRedirectFilter
@@ -84,6 +103,10 @@ class GatewayListener(TypedDict):
     gateway_protocol: str
     tls_secret_name: Optional[str]
     source_app: str
+    # Local rate limit ("requests_per_second" and "burst"), if requested
+    rate_limit: NotRequired[Optional[Dict[str, int]]]
+    # Response compression ("algorithms", "min_content_length" and "content_types"), if requested
+    compression: NotRequired[Optional[Dict[str, Any]]]
 
 
 class HTTPRoute(TypedDict):
@@ -101,6 +124,10 @@ class HTTPRoute(TypedDict):
     matches: List[HTTPRouteMatch]
     backend_refs: List[BackendRef]
     filters: List[HTTPRouteFilter]
+    # Gateway API HTTPRouteTimeouts ("request"/"backendRequest" durations), if requested
+    timeouts: NotRequired[Optional[Dict[str, str]]]
+    # Backend traffic settings (see BACKEND_TRAFFIC_SETTINGS) requested for the route's backends
+    traffic_policy: NotRequired[Optional[Dict[str, Any]]]
 
 
 class GRPCRoute(TypedDict):
@@ -118,6 +145,8 @@ class GRPCRoute(TypedDict):
     matches: List[GRPCRouteMatch]
     backend_refs: List[BackendRef]
     filters: List[GRPCRouteFilter]
+    # Backend traffic settings (see BACKEND_TRAFFIC_SETTINGS) requested for the route's backends
+    traffic_policy: NotRequired[Optional[Dict[str, Any]]]
 
 
 # ============================================================================
@@ -181,12 +210,34 @@ def normalize_istio_ingress_route_listeners(
                 listener.protocol, tls_enabled=tls_secret_name is not None
             )
 
+            # The rate limit is validated and bounded by the library
+            rate_limit = (
+                {
+                    "requests_per_second": listener.rateLimit.requestsPerSecond,
+                    "burst": listener.rateLimit.burst or listener.rateLimit.requestsPerSecond,
+                }
+                if listener.rateLimit
+                else None
+            )
+            # An empty list of algorithms requests no compression, rather than disabling it
+            compression = (
+                {
+                    "algorithms": [algorithm.value for algorithm in listener.compression.algorithms],
+                    "min_content_length": listener.compression.minContentLength,
+                    "content_types": listener.compression.contentTypes or [],
+                }
+                if listener.compression and listener.compression.algorithms
+                else None
+            )
+
             listeners.append(
                 GatewayListener(
                     port=listener.port,
                     gateway_protocol=gateway_protocol,
                     tls_secret_name=tls_secret_name if gateway_protocol == "HTTPS" else None,
                     source_app=app_name,
+                    rate_limit=rate_limit,
+                    compression=compression,
                 )
             )
 
@@ -395,6 +446,12 @@ def normalize_istio_ingress_route_http_routes(
             # Library filters are directly compatible - no conversion needed!
             filters = list(http_route.filters) if http_route.filters else []
 
+            # Timeouts are validated and bounded by the library
+            timeouts = (
+                http_route.timeouts.model_dump(exclude_none=True) if http_route.timeouts else None
+            )
+            traffic_policy = _route_traffic_policy(http_route)
+
             # Derive route name
             # Format: {app_name}-{http_route.name}-httproute-{section_name}-{ingress_app_name}
             # Example: myapp-api-route-httproute-http-8080-istio-ingress-k8s
@@ -412,6 +469,8 @@ def normalize_istio_ingress_route_http_routes(
                     matches=matches,
                     backend_refs=backend_refs,
                     filters=filters,
+                    timeouts=timeouts,
+                    traffic_policy=traffic_policy,
                 )
             )
 
@@ -493,21 +552,327 @@ def normalize_istio_ingress_route_grpc_routes(
                     matches=matches,
                     backend_refs=backend_refs,
                     filters=filters,
+                    traffic_policy=_route_traffic_policy(grpc_route),
                 )
             )
 
     return routes
 
 
+def _route_traffic_policy(lib_route: Any) -> Optional[Dict[str, Any]]:
+    """Return the backend traffic settings requested by a library route, if any.
+
+    The settings are validated and bounded by the library.
+    """
+    if not lib_route.trafficPolicy:
+        return None
+    return lib_route.trafficPolicy.model_dump(mode="json", exclude_none=True) or None
+
+
+# ============================================================================
+# Route Index
+# ============================================================================
+class RouteIndexEntry(TypedDict):
+    """A path registered in a RouteIndex."""
+
+    path: str
+    prefix: bool
+    owner: Optional[Tuple[str, str]]
+    route: Any
+
+
+class _RouteIndexNode:
+    """A single path segment in a RouteIndex trie."""
+
+    __slots__ = ("children", "entries")
+
+    def __init__(self):
+        self.children: Dict[str, _RouteIndexNode] = {}
+        self.entries: List[RouteIndexEntry] = []
+
+
+class RouteIndex:
+    """Prefix trie of route paths, with one trie per listener.
+
+    Paths are split into "/"-separated segments, matching the Gateway API PathPrefix semantics
+    where `/api` matches `/api` and `/api/v1` but not `/apiv1`, and where a trailing slash is not
+    significant.  For exact paths it is: `/api/` is registered below `/api`, as the prefix `/api`
+    matches it.  Empty segments are kept, so `//Method` (a gRPC method without a service) is not
+    confused with `/Method`.  Inserting or looking up a path is O(path length), independently of
+    the number of routes in the index.
+
+    A path ending in `/*` (as used for gRPC services and ext-authz notPaths) is registered as a
+    prefix on its parent: `/UserService/*` is the prefix `/UserService`.
+
+    Each registered path has an owner, the (app_name, relation_name) that requested it, which is
+    used to tell conflicts (the same match requested by several owners) and overlaps (a path under
+    a prefix requested by a different owner) from an app's own routes.  An exact path and a prefix
+    on the same path are different matches, so they don't conflict.
+    """
+
+    def __init__(self):
+        self._roots: Dict[Hashable, _RouteIndexNode] = {}
+
+    @staticmethod
+    def _split(path: str, prefix: bool = False) -> Tuple[List[str], bool]:
+        """Return the segments of a path, and whether it ends in a `/*` wildcard.
+
+        The trailing slash of a prefix is dropped, while that of an exact path is kept as an
+        empty last segment.
+        """
+        segments = path.split("/")
+        if segments[0] == "":
+            segments = segments[1:]
+        wildcard = bool(segments) and segments[-1] == "*"
+        if wildcard:
+            segments, prefix = segments[:-1], True
+        if prefix and segments and segments[-1] == "":
+            segments = segments[:-1]
+        return segments, wildcard
+
+    def insert(
+        self,
+        listener: Hashable,
+        path: str,
+        owner: Optional[Tuple[str, str]] = None,
+        route: Any = None,
+        prefix: bool = False,
+    ) -> None:
+        """Register a path on a listener.
+
+        Args:
+            listener: Key of the listener the path is served on, e.g. (port, protocol)
+            path: Path to register
+            owner: The (app_name, relation_name) requesting the path
+            route: Arbitrary payload, returned with the entry, e.g. the normalized route
+            prefix: Whether the path matches everything below it (always True for `/*` paths)
+        """
+        segments, wildcard = self._split(path, prefix)
+        node = self._roots.setdefault(listener, _RouteIndexNode())
+        for segment in segments:
+            node = node.children.setdefault(segment, _RouteIndexNode())
+        node.entries.append(
+            RouteIndexEntry(path=path, prefix=prefix or wildcard, owner=owner, route=route)
+        )
+
+    def _walk(
+        self, listener: Hashable, path: str, prefix: bool = False
+    ) -> Tuple[List[_RouteIndexNode], Optional[_RouteIndexNode]]:
+        """Return the existing nodes strictly above `path`, and the node of `path` if it exists."""
+        node = self._roots.get(listener)
+        ancestors: List[_RouteIndexNode] = []
+        for segment in self._split(path, prefix)[0]:
+            if node is None:
+                break
+            ancestors.append(node)
+            node = node.children.get(segment)
+        return ancestors, node
+
+    def lookup(self, listener: Hashable, path: str, prefix: bool = False) -> List[RouteIndexEntry]:
+        """Return the entries registered at the node of `path` on a listener."""
+        _, node = self._walk(listener, path, prefix)
+        return list(node.entries) if node else []
+
+    def shadowing(
+        self, listener: Hashable, path: str, prefix: bool = False
+    ) -> List[RouteIndexEntry]:
+        """Return the prefix entries strictly above `path`, i.e. those matching it, longest last."""
+        ancestors, _ = self._walk(listener, path, prefix)
+        return [entry for node in ancestors for entry in node.entries if entry["prefix"]]
+
+    def shadowed_by(self, listener: Hashable, path: str) -> List[RouteIndexEntry]:
+        """Return the entries strictly below `path`, i.e. those a prefix at `path` would match."""
+        _, node = self._walk(listener, path, prefix=True)
+        if node is None:
+            return []
+        below: List[RouteIndexEntry] = []
+        stack = list(node.children.values())
+        while stack:
+            node = stack.pop()
+            below.extend(node.entries)
+            stack.extend(node.children.values())
+        return below
+
+    def conflicts(self) -> Iterator[Tuple[Hashable, List[RouteIndexEntry]]]:
+        """Yield (listener, entries) for each match requested by more than one owner.
+
+        Prefixes on a node are the same match whatever their trailing slash, while exact paths
+        must be identical.
+        """
+        for listener, root in self._roots.items():
+            stack = [root]
+            while stack:
+                node = stack.pop()
+                matches: Dict[Optional[str], List[RouteIndexEntry]] = {}
+                for entry in node.entries:
+                    match = None if entry["prefix"] else entry["path"]
+                    matches.setdefault(match, []).append(entry)
+                for entries in matches.values():
+                    if len({entry["owner"] for entry in entries}) > 1:
+                        yield listener, entries
+                stack.extend(node.children.values())
+
+    def overlaps(self) -> Iterator[Tuple[Hashable, RouteIndexEntry, RouteIndexEntry]]:
+        """Yield (listener, prefix_entry, entry) for each entry under another owner's prefix."""
+        for listener, root in self._roots.items():
+            stack: List[Tuple[_RouteIndexNode, List[RouteIndexEntry]]] = [(root, [])]
+            while stack:
+                node, prefixes = stack.pop()
+                for entry in node.entries:
+                    for prefix_entry in prefixes:
+                        if prefix_entry["owner"] != entry["owner"]:
+                            yield listener, prefix_entry, entry
+                below = prefixes + [entry for entry in node.entries if entry["prefix"]]
+                stack.extend((child, below) for child in node.children.values())
+
+
+def _find_conflicting_routes(index: RouteIndex, kind: str) -> Set[int]:
+    """Log the conflicts and overlaps in a RouteIndex, and return the ids of conflicting routes.
+
+    Args:
+        index: RouteIndex keyed by (listener_port, listener_protocol), with routes as payload
+        kind: Route kind, for logging ("Route" or "gRPC route")
+    """
+    conflicting_routes: Set[int] = set()
+    for (listener_port, listener_protocol), entries in index.conflicts():  # type: ignore
+        unique_apps = {entry["owner"] for entry in entries if entry["owner"]}
+        logger.error(
+            f"{kind} conflict detected: Multiple applications requesting "
+            f"{listener_protocol}:{listener_port}{entries[0]['path']}. "
+            f"Conflicting apps: {', '.join(f'{app}/{rel}' for app, rel in unique_apps)}. "
+            f"No route will be created for this path."
+        )
+        conflicting_routes.update(id(entry["route"]) for entry in entries)
+
+    for (listener_port, listener_protocol), prefix_entry, entry in index.overlaps():  # type: ignore
+        logger.debug(
+            f"{kind} overlap on {listener_protocol}:{listener_port}: {entry['path']} requested by "
+            f"{'/'.join(entry['owner'] or ())} is under {prefix_entry['path']} requested by "
+            f"{'/'.join(prefix_entry['owner'] or ())}; the longest prefix wins."
+        )
+
+    return conflicting_routes
+
+
+def minimize_not_paths(paths: List[str]) -> List[str]:
+    """Return the minimal, sorted list of ext-authz notPaths that matches the same requests as `paths`.
+
+    Duplicates are dropped, as are paths already matched by a `<prefix>/*` wildcard above them.
+    The remaining paths are sorted, so the rendered policy does not change with relation order.
+
+    For example, ["/c", "/c/*", "/a/b", "/a/b/*", "/a", "/a/*"] becomes ["/a", "/a/*", "/c", "/c/*"].
+
+    Args:
+        paths: notPaths, exact paths or `<prefix>/*` wildcards
+
+    Returns:
+        The minimal list of notPaths
+    """
+    unique_paths = set(paths)
+    index = RouteIndex()
+    for path in unique_paths:
+        index.insert(None, path)
+    return sorted(path for path in unique_paths if not index.shadowing(None, path))
+
+
+def partition_not_paths(
+    not_paths: List[str], max_paths_per_rule: int
+) -> List[Tuple[List[str], List[str]]]:
+    """Split a long notPaths list into several (paths, notPaths) operations matching the same requests.
+
+    The rules of an AuthorizationPolicy are ORed, so a notPaths list cannot simply be cut in pieces:
+    a request exempted by one piece would still match all the others.  Instead, paths sharing a
+    character prefix are grouped, and each group gets an operation scoped to that prefix with an
+    Istio prefix match (`<prefix>*`), whose notPaths only hold the paths of the group.  The prefixes
+    are chosen so that no path outside a group starts with its prefix, and groups are made as large
+    as possible, up to `max_paths_per_rule` notPaths.  Small groups share an operation.  A catch-all
+    operation matches the requests outside every group.  Groups of one or two paths (e.g. a single
+    `/<segment>` and `/<segment>/*` pair) are not worth an operation, and only appear in the
+    catch-all.
+
+    The prefixes do not need to end at a "/": the paths of the apps ingressed over IPA,
+    `/<model>-<app>` and `/<model>-<app>/*`, are for instance grouped on `/<model>-<first letters of
+    the app>`.
+
+    The list is only split if it is longer than `max_paths_per_rule`, and if splitting shortens the
+    longest list Envoy evaluates per request.  Otherwise a single catch-all operation is returned.
+
+    For example, with a maximum of 4, ["/a", "/a/*", "/svc/A", "/svc/B", "/svc/C", "/svc/D", "/svc/E"]
+    becomes [([], ["/a", "/a/*", "/svc/*"]), (["/svc/*"], ["/svc/A", "/svc/B", ...])].
+
+    Args:
+        not_paths: Minimal, sorted notPaths, as returned by minimize_not_paths
+        max_paths_per_rule: Length of notPaths above which the list is split
+
+    Returns:
+        A list of (paths, notPaths), the catch-all first.  Empty paths match every request.
+    """
+    unsplit = [([], not_paths)]
+    if len(not_paths) <= max_paths_per_rule:
+        return unsplit
+    # Suffix and presence matches cannot be scoped to a prefix
+    if any(not path.startswith("/") or "*" in path[:-1] for path in not_paths):
+        return unsplit
+
+    catch_all: List[str] = []
+    operations: List[Tuple[List[str], List[str]]] = []
+    for scope, paths in _not_path_groups(not_paths, max_paths_per_rule):
+        catch_all.extend(scope)
+        if scope == paths:
+            continue
+        if operations and len(operations[-1][1]) + len(paths) <= max_paths_per_rule:
+            operations[-1][0].extend(scope)
+            operations[-1][1].extend(paths)
+        else:
+            operations.append((list(scope), list(paths)))
+
+    split = [([], catch_all)] + operations
+    if max(len(operation[1]) for operation in split) >= len(not_paths):
+        return unsplit
+    return split
+
+
+def _not_path_groups(not_paths: List[str], max_paths: int) -> List[Tuple[List[str], List[str]]]:
+    """Return the (scope, notPaths) groups of sorted, prefix-matched notPaths.
+
+    The scope of a group matches all the requests its notPaths do, and none that the notPaths of
+    the other groups do.  Groups are split on the next character after their common prefix until
+    they hold at most `max_paths` notPaths, or cannot be split further.
+    """
+    # Literal part of each path: "/a/*" matches the requests starting with "/a/"
+    literals = [path[:-1] if path.endswith("*") else path for path in not_paths]
+    prefix = commonprefix(literals)
+    if len(not_paths) <= 2:
+        return [(not_paths, not_paths)]
+    if len(not_paths) <= max_paths or f"{prefix}*" in not_paths:
+        return [([f"{prefix}*"], not_paths)]
+
+    groups: List[Tuple[List[str], List[str]]] = []
+    children: Dict[str, List[str]] = defaultdict(list)
+    for path, literal in zip(not_paths, literals):
+        if literal == prefix:
+            # An exact path equal to the prefix, which no longer prefix can scope
+            groups.append(([path], [path]))
+        else:
+            children[literal[len(prefix)]].append(path)
+    for paths in children.values():
+        groups.extend(_not_path_groups(paths, max_paths))
+    return groups
+
+
 # ============================================================================
 # Generic Processing Functions (work on normalized data)
 # ============================================================================
 def deduplicate_listeners(all_listeners: List[GatewayListener]) -> List[GatewayListener]:
     """Merge listeners by deduplicating on (port, gateway_protocol).
 
-    Keeps the first occurrence of each unique (port, protocol) combination.
+    Keeps the first occurrence of each unique (port, protocol) combination, with the strictest
+    rate limit requested for it, and the compression requested for it that sorts first.
     This handles cases where both IPA and istio-ingress-route request the same port.
 
+    The rate limit and compression requested by an app only govern the routes of that app, so
+    they are dropped from a listener shared by several apps, including the IPA listeners.
+
     For example, given input:
         [
             _GatewayListener(port=80, gateway_protocol="HTTP", source_app="ipa", ...),
@@ -530,15 +895,51 @@ def deduplicate_listeners(all_listeners: List[GatewayListener]) -> List[GatewayL
         List of unique listeners (first occurrence wins for each unique port/protocol pair)
     """
     seen: Dict[Tuple[int, str], GatewayListener] = {}
+    source_apps: Dict[Tuple[int, str], Set[str]] = defaultdict(set)
 
     for listener in all_listeners:
         key = (listener["port"], listener["gateway_protocol"])
+        source_apps[key].add(listener["source_app"])
         if key not in seen:
             seen[key] = listener
+            continue
+        if listener.get("rate_limit"):
+            rate_limit = stricter_rate_limit(seen[key].get("rate_limit"), listener.get("rate_limit"))
+            seen[key] = GatewayListener(**{**seen[key], "rate_limit": rate_limit})
+        if requested := listener.get("compression"):
+            # Pick the same compression whatever the order of the relations
+            compressions = [c for c in (seen[key].get("compression"), requested) if c]
+            compression = min(compressions, key=lambda c: json.dumps(c, sort_keys=True))
+            seen[key] = GatewayListener(**{**seen[key], "compression": compression})
+
+    for key, apps in source_apps.items():
+        if len(apps) < 2:
+            continue
+        for hint, description in (("rate_limit", "rate limit"), ("compression", "compression")):
+            if seen[key].get(hint):
+                logger.warning(
+                    "Ignoring the %s requested for the %s listener on port %d, as it is shared"
+                    " by %s",
+                    description,
+                    key[1],
+                    key[0],
+                    ", ".join(sorted(apps)),
+                )
+                seen[key] = GatewayListener(**{**seen[key], hint: None})
 
     return list(seen.values())
 
 
+def stricter_rate_limit(
+    first: Optional[Dict[str, int]], second: Optional[Dict[str, int]]
+) -> Optional[Dict[str, int]]:
+    """Return the stricter of two rate limits: the lowest rate, then the smallest burst."""
+    limits = [limit for limit in (first, second) if limit]
+    if not limits:
+        return None
+    return min(limits, key=lambda limit: (limit["requests_per_second"], limit["burst"]))
+
+
 def deduplicate_http_routes(
     all_http_routes: List[HTTPRoute],
 ) -> Tuple[List[HTTPRoute], Set[Tuple[str, str]]]:
@@ -550,7 +951,11 @@ def deduplicate_http_routes(
     What constitutes a conflict:
     - Two or more routes from DIFFERENT apps requesting the same path on the same listener
     - Listener is identified by (port, protocol) combination
-    - Path must match exactly
+    - Path and match type must be the same: a trailing slash is not significant for prefixes, but
+      Exact `/api` and Exact `/api/` are different matches, as are Exact and PathPrefix `/api`
+
+    Overlapping prefixes (e.g. App A: /api, App B: /api/v1) are not conflicts, since the longest
+    prefix wins; they are logged at debug level.
 
     Non-conflict examples:
     - App A: path="/api" on HTTP:80
@@ -601,37 +1006,30 @@ def deduplicate_http_routes(
         - apps_to_clear: Set of (app_name, relation_name) tuples that have conflicts
         - has_conflicts: True if any conflicts were detected (caller should set BlockedStatus)
     """
-    # Group routes by (listener_port, listener_protocol, path)
+    # Index routes by (listener_port, listener_protocol), then path
     # Extract path from first match in matches list
-    route_groups: Dict[Tuple[int, str, str], List[HTTPRoute]] = defaultdict(list)
+    index = RouteIndex()
 
     for route in all_http_routes:
         # Extract path from first HTTPRouteMatch
-        path = route["matches"][0].path.value if route["matches"] else "/"
-        key = (route["listener_port"], route["listener_protocol"], path)
-        route_groups[key].append(route)
-
-    valid_routes: List[HTTPRoute] = []
-    apps_to_clear: Set[Tuple[str, str]] = set()
-
-    for key, routes in route_groups.items():
-        # Get unique apps requesting this route
-        unique_apps = {(r["source_app"], r["source_relation"]) for r in routes}
-
-        if len(unique_apps) > 1:
-            # Conflict detected - multiple apps want the same route
-            listener_port, listener_protocol, path = key
-            logger.error(
-                f"Route conflict detected: Multiple applications requesting "
-                f"{listener_protocol}:{listener_port}{path}. "
-                f"Conflicting apps: {', '.join(f'{app}/{rel}' for app, rel in unique_apps)}. "
-                f"No route will be created for this path."
-            )
-            # Mark all conflicting apps for clearing
-            apps_to_clear.update(unique_apps)
-        else:
-            # No conflict - keep all routes (may be multiple from same app)
-            valid_routes.extend(routes)
+        path_match = route["matches"][0].path if route["matches"] else None
+        index.insert(
+            (route["listener_port"], route["listener_protocol"]),
+            path_match.value if path_match else "/",
+            owner=(route["source_app"], route["source_relation"]),
+            route=route,
+            prefix=path_match is None or path_match.type == "PathPrefix",
+        )
+
+    conflicting_routes = _find_conflicting_routes(index, "Route")
+
+    # Keep all non-conflicting routes (may be multiple from same app), in their original order
+    valid_routes = [route for route in all_http_routes if id(route) not in conflicting_routes]
+    apps_to_clear = {
+        (route["source_app"], route["source_relation"])
+        for route in all_http_routes
+        if id(route) in conflicting_routes
+    }
 
     return valid_routes, apps_to_clear
 
@@ -695,12 +1093,12 @@ def deduplicate_grpc_routes(
         - apps_to_clear: Set of (app_name, relation_name) tuples that have conflicts
         - has_conflicts: True if any conflicts were detected (caller should set BlockedStatus)
     """
-    # Group routes by (listener_port, listener_protocol, grpc_path)
+    # Index routes by (listener_port, listener_protocol), then grpc_path
     # Extract grpc_path from first match in matches list
-    route_groups: Dict[Tuple[int, str, str], List[GRPCRoute]] = defaultdict(list)
+    index = RouteIndex()
 
     for route in all_grpc_routes:
-        # Extract gRPC path from first GRPCRouteMatch
+        # Extract gRPC path from first GRPCRouteMatch; /service/* is a prefix on the service
         if route["matches"] and route["matches"][0].method:
             method_match = route["matches"][0].method
             service = method_match.service or ""
@@ -709,30 +1107,22 @@ def deduplicate_grpc_routes(
         else:
             grpc_path = "/*"
 
-        key = (route["listener_port"], route["listener_protocol"], grpc_path)
-        route_groups[key].append(route)
+        index.insert(
+            (route["listener_port"], route["listener_protocol"]),
+            grpc_path,
+            owner=(route["source_app"], route["source_relation"]),
+            route=route,
+        )
 
-    valid_routes: List[GRPCRoute] = []
-    apps_to_clear: Set[Tuple[str, str]] = set()
+    conflicting_routes = _find_conflicting_routes(index, "gRPC route")
 
-    for key, routes in route_groups.items():
-        # Get unique apps requesting this route
-        unique_apps = {(r["source_app"], r["source_relation"]) for r in routes}
-
-        if len(unique_apps) > 1:
-            # Conflict detected - multiple apps want the same route
-            listener_port, listener_protocol, grpc_path = key
-            logger.error(
-                f"gRPC route conflict detected: Multiple applications requesting "
-                f"{listener_protocol}:{listener_port}{grpc_path}. "
-                f"Conflicting apps: {', '.join(f'{app}/{rel}' for app, rel in unique_apps)}. "
-                f"No route will be created for this path."
-            )
-            # Mark all conflicting apps for clearing
-            apps_to_clear.update(unique_apps)
-        else:
-            # No conflict - keep all routes (may be multiple from same app)
-            valid_routes.extend(routes)
+    # Keep all non-conflicting routes (may be multiple from same app), in their original order
+    valid_routes = [route for route in all_grpc_routes if id(route) not in conflicting_routes]
+    apps_to_clear = {
+        (route["source_app"], route["source_relation"])
+        for route in all_grpc_routes
+        if id(route) in conflicting_routes
+    }
 
     return valid_routes, apps_to_clear
 
@@ -803,6 +1193,462 @@ def clear_conflicting_routes(
                 )
 
 
+def group_routes_by_source(
+    http_routes: List[HTTPRoute], grpc_routes: List[GRPCRoute]
+) -> Dict[Tuple[str, str], Tuple[List[HTTPRoute], List[GRPCRoute]]]:
+    """Group normalized routes by the (app_name, relation_name) that requested them.
+
+    Args:
+        http_routes: List of normalized HTTP routes
+        grpc_routes: List of normalized gRPC routes
+
+    Returns:
+        Dict mapping (app_name, relation_name) to that app's (http_routes, grpc_routes)
+    """
+    groups: Dict[Tuple[str, str], Tuple[List[HTTPRoute], List[GRPCRoute]]] = defaultdict(
+        lambda: ([], [])
+    )
+    for http_route in http_routes:
+        groups[(http_route["source_app"], http_route["source_relation"])][0].append(http_route)
+    for grpc_route in grpc_routes:
+        groups[(grpc_route["source_app"], grpc_route["source_relation"])][1].append(grpc_route)
+    return dict(groups)
+
+
+def _serialize_route(route: HTTPRoute | GRPCRoute) -> Dict:
+    """Return a JSON-serializable form of a normalized route."""
+    return {
+        "name": route["name"],
+        "listener_port": route["listener_port"],
+        "listener_protocol": route["listener_protocol"],
+        "namespace": route["namespace"],
+        "matches": [match.model_dump(mode="json") for match in route["matches"]],
+        "backend_refs": [backend.model_dump(mode="json") for backend in route["backend_refs"]],
+        "filters": [route_filter.model_dump(mode="json") for route_filter in route["filters"]],
+        "timeouts": route.get("timeouts"),
+        "traffic_policy": route.get("traffic_policy"),
+    }
+
+
+def route_group_digest(http_routes: List[HTTPRoute], grpc_routes: List[GRPCRoute]) -> str:
+    """Return a stable digest of a group of normalized routes.
+
+    Two groups have the same digest if and only if they would produce the same K8s resources, so
+    the digest can be compared across hooks to tell whether an app's routes need reconciling.
+
+    Args:
+        http_routes: Normalized HTTP routes of a single (app_name, relation_name)
+        grpc_routes: Normalized gRPC routes of a single (app_name, relation_name)
+
+    Returns:
+        Hex-encoded SHA-256 digest of the routes
+    """
+    payload = {
+        kind: sorted(json.dumps(_serialize_route(route), sort_keys=True) for route in routes)
+        for kind, routes in (("http_routes", http_routes), ("grpc_routes", grpc_routes))
+    }
+    return hashlib.sha256(json.dumps(payload, sort_keys=True).encode()).hexdigest()
+
+
+# ============================================================================
+# Backend Traffic Policy
+# ============================================================================
+# Flat backend traffic settings, named as in the istio-ingress-route library's
+# BackendTrafficPolicy, and their path in a DestinationRule trafficPolicy
+BACKEND_TRAFFIC_SETTINGS: Dict[str, Tuple[str, ...]] = {
+    "maxConnections": ("connectionPool", "tcp", "maxConnections"),
+    "maxRequestsPerConnection": ("connectionPool", "http", "maxRequestsPerConnection"),
+    "http2MaxRequests": ("connectionPool", "http", "http2MaxRequests"),
+    "idleTimeoutSeconds": ("connectionPool", "http", "idleTimeout"),
+    "consecutive5xxErrors": ("outlierDetection", "consecutive5xxErrors"),
+    "loadBalancer": ("loadBalancer", "simple"),
+    "consistentHash": ("loadBalancer", "consistentHash"),
+}
+
+
+def merge_backend_traffic_settings(
+    http_routes: Iterable[HTTPRoute],
+    grpc_routes: Iterable[GRPCRoute],
+    defaults: Dict[str, Any],
+) -> Dict[Tuple[str, str], Tuple[Dict[str, Any], bool]]:
+    """Return the traffic settings of every backend that needs a DestinationRule.
+
+    A backend's settings are the defaults, overridden by the settings requested by the routes to
+    it.  If routes request different values for a setting, the route with the smallest name wins,
+    so that the result doesn't depend on the order of the routes.  gRPC backends always need a
+    DestinationRule, as the gateway must keep the client's protocol when talking to them; HTTP
+    backends only need one if they have any settings.
+
+    Args:
+        http_routes: Normalized HTTP routes
+        grpc_routes: Normalized gRPC routes
+        defaults: Settings applying to all backends
+
+    Returns:
+        Dict mapping (service, namespace) to the backend's settings and whether it serves gRPC
+    """
+    requested: Dict[Tuple[str, str], Dict[str, Any]] = {}
+    grpc_backends: Set[Tuple[str, str]] = set()
+    routes: List[HTTPRoute | GRPCRoute] = [*http_routes, *grpc_routes]
+    for route in sorted(routes, key=lambda r: r["name"]):
+        for backend_ref in route["backend_refs"]:
+            key = (backend_ref.name, backend_ref.namespace)
+            settings = requested.setdefault(key, {})
+            for name, value in (route.get("traffic_policy") or {}).items():
+                settings.setdefault(name, value)
+    for route in grpc_routes:
+        grpc_backends.update((b.name, b.namespace) for b in route["backend_refs"])
+
+    backends = {}
+    for key, settings in requested.items():
+        merged = {**defaults, **settings}
+        if merged or key in grpc_backends:
+            backends[key] = (merged, key in grpc_backends)
+    return backends
+
+
+def build_traffic_policy(settings: Dict[str, Any], use_client_protocol: bool) -> Dict[str, Any]:
+    """Return the DestinationRule trafficPolicy for a backend's flat traffic settings.
+
+    Args:
+        settings: Backend traffic settings, keyed as in BACKEND_TRAFFIC_SETTINGS
+        use_client_protocol: Whether the gateway should use the client's HTTP version
+
+    Returns:
+        DestinationRule trafficPolicy
+    """
+    traffic_policy: Dict[str, Any] = {}
+    if use_client_protocol:
+        traffic_policy["connectionPool"] = {"http": {"useClientProtocol": True}}
+    for name in sorted(settings):
+        if name == "loadBalancer" and "consistentHash" in settings:
+            # A load balancer is either simple or consistent-hash, and affinity was asked for
+            continue
+        *path, field = BACKEND_TRAFFIC_SETTINGS[name]
+        value = settings[name]
+        if name == "idleTimeoutSeconds":
+            value = f"{value}s"
+        elif name == "consistentHash":
+            # Keep the one hash key that is set, with the cookie TTL as a duration
+            value = {key: key_value for key, key_value in value.items() if key_value}
+            if "httpCookie" in value:
+                cookie = dict(value["httpCookie"])
+                if (ttl_seconds := cookie.pop("ttlSeconds", None)) is not None:
+                    cookie["ttl"] = f"{ttl_seconds}s"
+                value = {"httpCookie": cookie}
+        section = traffic_policy
+        for key in path:
+            section = section.setdefault(key, {})
+        section[field] = value
+    return traffic_policy
+
+
+# ============================================================================
+# Envoy Filters
+# ============================================================================
+def gateway_http_filter_patch(port: int, http_filter: Dict[str, Any]) -> Dict[str, Any]:
+    """Return an EnvoyFilter config patch inserting an HTTP filter before a gateway's router.
+
+    Args:
+        port: Port of the gateway listener whose filter chain to patch
+        http_filter: Envoy HTTP filter to insert, with its name and typed_config
+
+    Returns:
+        EnvoyFilter config patch
+    """
+    return {
+        "applyTo": "HTTP_FILTER",
+        "match": {
+            "context": "GATEWAY",
+            "listener": {
+                "portNumber": port,
+                "filterChain": {
+                    "filter": {
+                        "name": "envoy.filters.network.http_connection_manager",
+                        "subFilter": {"name": "envoy.filters.http.router"},
+                    }
+                },
+            },
+        },
+        "patch": {"operation": "INSERT_BEFORE", "value": http_filter},
+    }
+
+
+# ============================================================================
+# Gateway Sharding
+# ============================================================================
+def jump_consistent_hash(key: int, buckets: int) -> int:
+    """Return the bucket in [0, buckets) of a 64-bit key, using jump consistent hashing.
+
+    When the number of buckets grows from n to n+1, only 1/(n+1) of the keys move, all of them
+    to the new bucket.  See Lamping and Veach, "A Fast, Minimal Memory, Consistent Hash Algorithm".
+    """
+    if buckets < 1:
+        raise ValueError(f"Cannot hash into {buckets} buckets")
+    bucket, candidate = -1, 0
+    while candidate < buckets:
+        bucket = candidate
+        key = (key * 2862933555777941757 + 1) & 0xFFFFFFFFFFFFFFFF
+        candidate = int((bucket + 1) * (float(1 << 31) / float((key >> 33) + 1)))
+    return bucket
+
+
+def gateway_shard(app_name: str, shards: int) -> int:
+    """Return the index of the gateway shard serving an ingressed app.
+
+    The shard only depends on the app name and the number of shards, so it is stable across
+    hooks and units, and all the routes of an app (from any relation) land on the same shard.
+    """
+    if shards == 1:
+        return 0
+    key = int.from_bytes(hashlib.sha256(app_name.encode()).digest()[:8], "big")
+    return jump_consistent_hash(key, shards)
+
+
+# ============================================================================
+# Concurrent Reconciliation
+# ============================================================================
+class ConcurrentReconciler:
+    """Run independent reconcile steps concurrently, honouring the dependencies between them.
+
+    Steps are callables that only talk to Kubernetes.  Anything that touches the Juju model must
+    be done by the caller, on the main thread, before submitting a step.
+
+    Use it as a context manager: on exit it waits for every submitted step, then re-raises the
+    first failure in submission order.  A step whose dependency failed is not run.
+
+    For example:
+        with ConcurrentReconciler(max_workers=4) as reconciler:
+            reconciler.submit("gateway", reconcile_gateway)
+            reconciler.submit("policies", reconcile_policies)
+            reconciler.submit("routes", reconcile_routes, after=["gateway"])
+    """
+
+    def __init__(self, max_workers: int):
+        self._executor = ThreadPoolExecutor(
+            max_workers=max_workers, thread_name_prefix="reconcile"
+        )
+        self._lock = threading.Lock()
+        self._steps: Dict[str, Future] = {}
+
+    def __enter__(self) -> "ConcurrentReconciler":
+        """Return the reconciler, to submit steps to."""
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback) -> None:
+        """Wait for all steps, then raise the first failure unless already raising."""
+        wait(list(self._steps.values()))
+        self._executor.shutdown()
+        if exc_type is not None:
+            return
+        for step in self._steps.values():
+            if error := step.exception():
+                raise error
+
+    def submit(self, name: str, step: Callable[[], Any], after: Iterable[str] = ()) -> None:
+        """Schedule a step to run once all the steps it depends on have succeeded.
+
+        Args:
+            name: Unique name of the step, used in `after` and `result`
+            step: Callable doing the Kubernetes calls of the step
+            after: Names of the already submitted steps this step depends on
+        """
+        if name in self._steps:
+            raise ValueError(f"Reconcile step {name} was already submitted")
+        dependencies = {dependency: self._steps[dependency] for dependency in after}
+        outcome: Future = Future()
+        self._steps[name] = outcome
+
+        if not dependencies:
+            self._start(name, step, outcome, dependencies)
+            return
+
+        remaining = [len(dependencies)]
+
+        def _on_dependency_done(_: Future):
+            with self._lock:
+                remaining[0] -= 1
+                ready = remaining[0] == 0
+            if ready:
+                self._start(name, step, outcome, dependencies)
+
+        for dependency_outcome in dependencies.values():
+            dependency_outcome.add_done_callback(_on_dependency_done)
+
+    def _start(
+        self, name: str, step: Callable[[], Any], outcome: Future, dependencies: Dict[str, Future]
+    ) -> None:
+        """Run a step whose dependencies are done, or skip it if any of them failed."""
+        for dependency, dependency_outcome in dependencies.items():
+            if dependency_outcome.exception() is not None:
+                outcome.set_exception(
+                    RuntimeError(f"Skipped {name}: reconcile step {dependency} failed")
+                )
+                return
+
+        def _forward(future: Future):
+            if (error := future.exception()) is not None:
+                outcome.set_exception(error)
+            else:
+                outcome.set_result(future.result())
+
+        self._executor.submit(step).add_done_callback(_forward)
+
+    def result(self, name: str) -> Any:
+        """Wait for a step and return its result, raising its exception if it failed."""
+        return self._steps[name].result()
+
+
+# ============================================================================
+# Snapshot
+# ============================================================================
+class IngressSnapshot:
+    """Read-only, per-hook view of the ingress relation data and everything derived from it.
+
+    Relation databags are read and validated once, when the snapshot is built.  The normalized
+    listeners and routes, the deduplication result and the unauthenticated paths are computed
+    lazily and cached, so the reconcile pipeline can ask for them as often as it likes without
+    re-reading or re-parsing relation data.
+
+    The raw data passed in is never modified: conflict clearing is applied to copies, exposed
+    through `cleared_application_route_data` and `cleared_istio_ingress_route_configs`.
+    """
+
+    def __init__(
+        self,
+        application_route_data: Dict,
+        istio_ingress_route_configs: Dict,
+        tls_secret_name: Optional[str],
+        ingress_app_name: str,
+    ):
+        """Build a snapshot.
+
+        Args:
+            application_route_data: IPA route data, as returned by the charm's `_get_routes()`
+            istio_ingress_route_configs: istio-ingress-route configs, as returned by the charm's
+                `_get_istio_ingress_route_configs()`
+            tls_secret_name: Name of the TLS secret if TLS is enabled, otherwise None
+            ingress_app_name: Name of the ingress charm app (used in route naming)
+        """
+        self._application_route_data = dict(application_route_data)
+        self._istio_ingress_route_configs = dict(istio_ingress_route_configs)
+        self._tls_secret_name = tls_secret_name
+        self._ingress_app_name = ingress_app_name
+
+    @property
+    def application_route_data(self) -> Dict:
+        """IPA route data as read from the relations, before conflict clearing."""
+        return self._application_route_data
+
+    @property
+    def istio_ingress_route_configs(self) -> Dict:
+        """istio-ingress-route configs as read from the relations, before conflict clearing."""
+        return self._istio_ingress_route_configs
+
+    @property
+    def tls_secret_name(self) -> Optional[str]:
+        """Name of the TLS secret used by HTTPS listeners, or None if TLS is disabled."""
+        return self._tls_secret_name
+
+    @property
+    def tls_enabled(self) -> bool:
+        """Whether TLS is enabled on the gateway."""
+        return self._tls_secret_name is not None
+
+    @cached_property
+    def listeners(self) -> List[GatewayListener]:
+        """Deduplicated Gateway listeners from all sources."""
+        ipa_listeners = normalize_ipa_listeners(self._tls_secret_name)
+        istio_listeners = normalize_istio_ingress_route_listeners(
+            self._istio_ingress_route_configs, self._tls_secret_name
+        )
+        return deduplicate_listeners(ipa_listeners + istio_listeners)
+
+    @cached_property
+    def ipa_http_routes(self) -> List[HTTPRoute]:
+        """Normalized HTTP routes from the IPA relations."""
+        return normalize_ipa_routes(
+            self._application_route_data, self.tls_enabled, self._ingress_app_name
+        )
+
+    @cached_property
+    def istio_http_routes(self) -> List[HTTPRoute]:
+        """Normalized HTTP routes from the istio-ingress-route relations."""
+        return normalize_istio_ingress_route_http_routes(
+            self._istio_ingress_route_configs, self.tls_enabled, self._ingress_app_name
+        )
+
+    @cached_property
+    def istio_grpc_routes(self) -> List[GRPCRoute]:
+        """Normalized gRPC routes from the istio-ingress-route relations."""
+        return normalize_istio_ingress_route_grpc_routes(
+            self._istio_ingress_route_configs, self.tls_enabled, self._ingress_app_name
+        )
+
+    @cached_property
+    def _deduplicated_http_routes(self) -> Tuple[List[HTTPRoute], Set[Tuple[str, str]]]:
+        return deduplicate_http_routes(self.ipa_http_routes + self.istio_http_routes)
+
+    @cached_property
+    def _deduplicated_grpc_routes(self) -> Tuple[List[GRPCRoute], Set[Tuple[str, str]]]:
+        # The IPA relation doesn't support gRPC routes.
+        return deduplicate_grpc_routes(self.istio_grpc_routes)
+
+    @property
+    def valid_http_routes(self) -> List[HTTPRoute]:
+        """HTTP routes from all sources that survived deduplication."""
+        return self._deduplicated_http_routes[0]
+
+    @property
+    def valid_grpc_routes(self) -> List[GRPCRoute]:
+        """Valid gRPC routes from all sources, i.e. those that survived deduplication."""
+        return self._deduplicated_grpc_routes[0]
+
+    @cached_property
+    def apps_to_clear(self) -> Set[Tuple[str, str]]:
+        """The (app_name, relation_name) pairs whose routes were dropped because of a conflict."""
+        return self._deduplicated_http_routes[1] | self._deduplicated_grpc_routes[1]
+
+    @cached_property
+    def _cleared_route_data(self) -> Tuple[Dict, Dict]:
+        application_route_data = {
+            key: {**route_data, "routes": list(route_data["routes"])}
+            for key, route_data in self._application_route_data.items()
+        }
+        istio_ingress_route_configs = {
+            key: {
+                **config_data,
+                "config": config_data["config"].model_copy() if config_data["config"] else None,
+            }
+            for key, config_data in self._istio_ingress_route_configs.items()
+        }
+        clear_conflicting_routes(
+            application_route_data, istio_ingress_route_configs, self.apps_to_clear
+        )
+        return application_route_data, istio_ingress_route_configs
+
+    @property
+    def cleared_application_route_data(self) -> Dict:
+        """IPA route data with the routes of conflicting apps cleared."""
+        return self._cleared_route_data[0]
+
+    @property
+    def cleared_istio_ingress_route_configs(self) -> Dict:
+        """istio-ingress-route configs with the routes of conflicting apps cleared."""
+        return self._cleared_route_data[1]
+
+    @cached_property
+    def unauthenticated_paths(self) -> List[str]:
+        """Minimal notPaths for the unauthenticated relations, excluding those of conflicting apps."""
+        unauthenticated_paths = get_unauthenticated_paths(self.cleared_application_route_data)
+        unauthenticated_paths.extend(
+            get_unauthenticated_paths_from_istio_ingress_route_configs(
+                self.cleared_istio_ingress_route_configs
+            )
+        )
+        return minimize_not_paths(unauthenticated_paths)
+
+
 # ============================================================================
 # Helper Functions
 # ============================================================================
@@ -894,3 +1740,15 @@ def get_relation_by_name_and_app(relations, remote_app_name):
     raise KeyError(f"Could not find relation with remote_app_name={remote_app_name}")
 
 
+def split_config_list(value: str) -> List[str]:
+    """Return the items of a comma-separated config option."""
+    return [item.strip() for item in value.split(",") if item.strip()]
+
+
+def cert_inputs_digest(sans: List[str], cert_subject: str) -> str:
+    """Return a digest of the certificate-relevant inputs of a CSR.
+
+    The CSR only needs inspecting again when this digest changes.
+    """
+    lines = [f"subject={cert_subject}", *sorted(f"san={san}" for san in sans)]
+    return hashlib.sha256("\n".join(lines).encode()).hexdigest()
@@ -0,0 +1,482 @@
+#!/usr/bin/env python3
+# Copyright 2024 Canonical Ltd.
+# See LICENSE file for licensing details.
+
+"""Scale benchmark for IstioIngressCharm._sync_all_resources.
+
+Generates N `ingress` (IPA) and M `istio-ingress-route` relations with a mix of HTTP, gRPC and
+unauthenticated routes, optionally with TLS, and runs the charm against an in-memory fake of the
+Kubernetes API.  For every scenario two hooks are measured:
+    * full: a `config-changed` on a fresh unit, reconciling everything from scratch.
+    * incremental: a `relation-changed` after a single IPA app changed its port.
+
+For each hook it reports the time spent in every stage of the pipeline (read, normalize, dedupe,
+construct, reconcile), the number of Kubernetes API calls by verb and kind, and the number of
+resources left in the fake cluster.  Stage times are cumulative across reconcile worker threads,
+so they can add up to more than the wall time of the hook.
+
+The output is JSON, so that results can be stored and compared between commits.  Run it with
+`tox -e benchmark -- --sizes 10 100 1000 --output results.json`, or from the charm root:
+    PYTHONPATH=lib:src python -m tests.benchmark.bench_sync_all_resources --sizes 10 100 1000
+"""
+
+import argparse
+import dataclasses
+import json
+import platform
+import sys
+import threading
+import time
+from collections import Counter
+from contextlib import ExitStack
+from typing import Dict, Iterable, List, Optional, Tuple
+from unittest.mock import PropertyMock, patch
+
+import httpx
+import scenario
+from canonical_service_mesh.k8s.resource_manager import (
+    KubernetesResourceManager,
+    PolicyResourceManager,
+)
+from charmlibs.interfaces.istio_ingress_route import (
+    BackendRef,
+    GRPCMethodMatch,
+    GRPCRoute,
+    GRPCRouteMatch,
+    HTTPPathMatch,
+    HTTPRoute,
+    HTTPRouteMatch,
+    IstioIngressRouteConfig,
+    Listener,
+    ProtocolType,
+)
+from lightkube.core.exceptions import ApiError
+
+import charm
+import utils
+from charm import IstioIngressCharm
+from tests.helpers import generate_certificates_relation
+
+DEFAULT_SIZES = (10, 100, 1000)
+BENCHMARK_HOSTNAME = "example.com"
+
+# Functions and methods timed for each stage of the pipeline.  Calls nested within a stage (eg:
+# PolicyResourceManager.reconcile calling KubernetesResourceManager.reconcile) are only counted
+# once, by the outermost call.
+STAGES: Dict[str, List[Tuple[object, str]]] = {
+    "read": [(IstioIngressCharm, "_build_ingress_snapshot")],
+    "normalize": [
+        (utils, "normalize_ipa_listeners"),
+        (utils, "normalize_ipa_routes"),
+        (utils, "normalize_istio_ingress_route_listeners"),
+        (utils, "normalize_istio_ingress_route_http_routes"),
+        (utils, "normalize_istio_ingress_route_grpc_routes"),
+    ],
+    "dedupe": [
+        (utils, "deduplicate_listeners"),
+        (utils, "deduplicate_http_routes"),
+        (utils, "deduplicate_grpc_routes"),
+        (utils, "clear_conflicting_routes"),
+    ],
+    "construct": [
+        (IstioIngressCharm, "_construct_gateway"),
+        (IstioIngressCharm, "_construct_hpa"),
+        (IstioIngressCharm, "_construct_httproutes"),
+        (IstioIngressCharm, "_construct_grpcroutes"),
+        (IstioIngressCharm, "_construct_auth_policies"),
+        (IstioIngressCharm, "_construct_destination_rules"),
+        (IstioIngressCharm, "_construct_ext_authz_policy"),
+        (IstioIngressCharm, "_construct_external_traffic_auth_policy"),
+        (IstioIngressCharm, "_construct_request_authentication"),
+        (IstioIngressCharm, "_construct_deny_without_jwt_policy"),
+    ],
+    "reconcile": [
+        (KubernetesResourceManager, "reconcile"),
+        (KubernetesResourceManager, "patch"),
+        (KubernetesResourceManager, "delete"),
+        (PolicyResourceManager, "reconcile"),
+        (PolicyResourceManager, "delete"),
+    ],
+}
+
+
+# ============================================================================
+# Fake Kubernetes API
+# ============================================================================
+def _not_found(name: str) -> ApiError:
+    response = httpx.Response(
+        404,
+        json={
+            "apiVersion": "v1",
+            "kind": "Status",
+            "code": 404,
+            "reason": "NotFound",
+            "message": f"{name} not found",
+        },
+    )
+    return ApiError(response=response)
+
+
+class FakeLightkubeClient:
+    """In-memory stand-in for lightkube.Client, counting every API call it receives.
+
+    Objects are stored by (resource class, namespace, name).  Only the calls made by the charm and
+    the resource managers are implemented.  An optional latency is added to every call, outside of
+    the store lock, to approximate the round trip to a real API server.
+    """
+
+    def __init__(self, latency: float = 0.0):
+        self.latency = latency
+        self.calls: Counter = Counter()
+        self._objects: Dict[Tuple[type, Optional[str], str], object] = {}
+        self._lock = threading.Lock()
+
+    def _record(self, verb: str, res: type):
+        with self._lock:
+            self.calls[(verb, res.__name__)] += 1
+        if self.latency:
+            time.sleep(self.latency)
+
+    def get(self, res, name, namespace=None, **_):
+        """Return a stored object, or raise a 404."""
+        self._record("get", res)
+        with self._lock:
+            try:
+                return self._objects[(res, namespace, name)]
+            except KeyError:
+                raise _not_found(name) from None
+
+    def list(self, res, namespace=None, labels=None, **_):
+        """Return the stored objects of a kind matching all the given labels."""
+        self._record("list", res)
+        labels = labels or {}
+        with self._lock:
+            return [
+                obj
+                for (obj_res, obj_namespace, _name), obj in self._objects.items()
+                if obj_res is res
+                and namespace in ("*", None, obj_namespace)
+                and labels.items() <= ((obj.metadata.labels or {}).items())  # type: ignore
+            ]
+
+    def patch(self, res, name, obj, namespace=None, **_):
+        """Store an object, as a server-side apply would."""
+        self._record("patch", res)
+        with self._lock:
+            self._objects[(res, namespace, name)] = obj
+        return obj
+
+    def apply(self, obj, namespace=None, **_):
+        """Store an object."""
+        self._record("apply", type(obj))
+        with self._lock:
+            self._objects[(type(obj), namespace, obj.metadata.name)] = obj
+        return obj
+
+    def delete(self, res, name, namespace=None, **_):
+        """Remove a stored object, or raise a 404."""
+        self._record("delete", res)
+        with self._lock:
+            if self._objects.pop((res, namespace, name), None) is None:
+                raise _not_found(name)
+
+    def reset_calls(self):
+        """Forget the calls counted so far, keeping the stored objects."""
+        self.calls.clear()
+
+    def api_calls(self) -> Dict:
+        """Return the API calls counted since the last reset, in total, by verb and by kind."""
+        by_verb, by_kind = Counter(), Counter()
+        for (verb, kind), count in self.calls.items():
+            by_verb[verb] += count
+            by_kind[kind] += count
+        return {
+            "total": sum(self.calls.values()),
+            "by_verb": dict(sorted(by_verb.items())),
+            "by_kind": dict(sorted(by_kind.items())),
+        }
+
+    def resources(self) -> Dict[str, int]:
+        """Return the number of stored objects by kind."""
+        with self._lock:
+            return dict(sorted(Counter(res.__name__ for res, _, _ in self._objects).items()))
+
+
+# ============================================================================
+# Stage timing
+# ============================================================================
+class StageTimer:
+    """Time the stages of the pipeline by wrapping the functions listed in STAGES."""
+
+    def __init__(self, stages: Dict[str, List[Tuple[object, str]]]):
+        self._stages = stages
+        self._local = threading.local()
+        self._lock = threading.Lock()
+        self.seconds: Counter = Counter()
+        self.calls: Counter = Counter()
+
+    def _wrap(self, stage: str, func):
+        timer = self
+
+        def _timed(*args, **kwargs):
+            active = timer._local.__dict__.setdefault("active", set())
+            if stage in active:
+                return func(*args, **kwargs)
+            active.add(stage)
+            start = time.perf_counter()
+            try:
+                return func(*args, **kwargs)
+            finally:
+                elapsed = time.perf_counter() - start
+                active.discard(stage)
+                with timer._lock:
+                    timer.seconds[stage] += elapsed
+                    timer.calls[stage] += 1
+
+        return _timed
+
+    def install(self, stack: ExitStack):
+        """Patch every timed function for the lifetime of the given stack."""
+        for stage, targets in self._stages.items():
+            for owner, attribute in targets:
+                original = getattr(owner, attribute)
+                stack.enter_context(patch.object(owner, attribute, self._wrap(stage, original)))
+                # Functions imported into the charm module are looked up there
+                if owner is utils and getattr(charm, attribute, None) is original:
+                    stack.enter_context(
+                        patch.object(charm, attribute, self._wrap(stage, original))
+                    )
+
+    def reset(self):
+        """Forget the timings collected so far."""
+        self.seconds.clear()
+        self.calls.clear()
+
+    def report(self) -> Dict:
+        """Return the seconds spent and number of calls made in every stage."""
+        return {
+            stage: {"seconds": round(self.seconds[stage], 6), "calls": self.calls[stage]}
+            for stage in self._stages
+        }
+
+
+# ============================================================================
+# Relations
+# ============================================================================
+def ipa_relation(index: int, port: int = 8080) -> scenario.Relation:
+    """Return an IPA relation.  Every fourth one is on the unauthenticated endpoint."""
+    name = f"ipa-app{index}"
+    endpoint = "ingress-unauthenticated" if index % 4 == 3 else "ingress"
+    return scenario.Relation(
+        endpoint=endpoint,
+        interface="ingress",
+        remote_app_name=name,
+        remote_app_data={
+            "name": json.dumps(name),
+            "model": json.dumps(f"model{index % 10}"),
+            "port": json.dumps(port),
+            "strip-prefix": json.dumps(index % 2 == 0),
+        },
+        remote_units_data={
+            0: {"host": json.dumps(f"{name}.example.com"), "ip": json.dumps("10.1.0.1")},
+        },
+    )
+
+
+def istio_ingress_route_config(index: int) -> IstioIngressRouteConfig:
+    """Return an istio-ingress-route config with HTTP routes, gRPC routes, or both."""
+    name = f"iir-app{index}"
+    http_listener = Listener(port=80, protocol=ProtocolType.HTTP)
+    grpc_listener = Listener(port=9090, protocol=ProtocolType.GRPC)
+    kind = index % 3  # 0: HTTP only, 1: gRPC only, 2: both
+    listeners, http_routes, grpc_routes = [], [], []
+    if kind in (0, 2):
+        listeners.append(http_listener)
+        http_routes = [
+            HTTPRoute(
+                name=f"{name}-{path}",
+                listener=http_listener,
+                backends=[BackendRef(service=name, port=8080)],
+                matches=[HTTPRouteMatch(path=HTTPPathMatch(value=f"/{name}/{path}"))],
+            )
+            for path in ("api", "ui")
+        ]
+    if kind in (1, 2):
+        listeners.append(grpc_listener)
+        grpc_routes = [
+            GRPCRoute(
+                name=f"{name}-grpc",
+                listener=grpc_listener,
+                backends=[BackendRef(service=name, port=9000)],
+                matches=[
+                    GRPCRouteMatch(method=GRPCMethodMatch(service=f"bench.App{index}Service"))
+                ],
+            )
+        ]
+    return IstioIngressRouteConfig(
+        model=f"model{index % 10}",
+        listeners=listeners,
+        http_routes=http_routes,
+        grpc_routes=grpc_routes,
+    )
+
+
+def istio_ingress_route_relation(index: int) -> scenario.Relation:
+    """Return an istio-ingress-route relation.  Every third one is unauthenticated."""
+    endpoint = (
+        "istio-ingress-route-unauthenticated" if index % 3 == 2 else "istio-ingress-route"
+    )
+    return scenario.Relation(
+        endpoint=endpoint,
+        interface="istio_ingress_route",
+        remote_app_name=f"iir-app{index}",
+        remote_app_data={"config": istio_ingress_route_config(index).model_dump_json()},
+    )
+
+
+# ============================================================================
+# Benchmark
+# ============================================================================
+def _run_hook(context, event, state, client: FakeLightkubeClient, timer: StageTimer):
+    client.reset_calls()
+    timer.reset()
+    start = time.perf_counter()
+    state_out = context.run(event, state)
+    hook_seconds = time.perf_counter() - start
+    return state_out, {
+        "hook_seconds": round(hook_seconds, 6),
+        "stages": timer.report(),
+        "api_calls": client.api_calls(),
+        "resources": client.resources(),
+    }
+
+
+def run_scenario(
+    ipa_relations: int, istio_ingress_route_relations: int, tls: bool, api_latency: float = 0.0
+) -> List[Dict]:
+    """Benchmark a full and an incremental reconcile with the given number of relations."""
+    client = FakeLightkubeClient(latency=api_latency)
+    timer = StageTimer(STAGES)
+    context = scenario.Context(charm_type=IstioIngressCharm)
+
+    relations = [ipa_relation(i) for i in range(ipa_relations)]
+    relations += [istio_ingress_route_relation(i) for i in range(istio_ingress_route_relations)]
+    if tls:
+        relations.append(generate_certificates_relation(subject=BENCHMARK_HOSTNAME)["relation"])
+    state = scenario.State(
+        relations=relations,
+        leader=True,
+        # The certificates are only requested, and TLS enabled, for a known gateway address
+        config={"external_hostname": BENCHMARK_HOSTNAME},
+        containers=[scenario.Container("metrics-proxy", can_connect=True)],
+    )
+
+    results = []
+    with ExitStack() as stack:
+        stack.enter_context(
+            patch.object(
+                IstioIngressCharm, "lightkube_client", new_callable=PropertyMock, return_value=client
+            )
+        )
+        stack.enter_context(
+            patch.object(
+                IstioIngressCharm,
+                "_ingress_url",
+                new_callable=PropertyMock,
+                return_value=BENCHMARK_HOSTNAME,
+            )
+        )
+        stack.enter_context(patch.object(IstioIngressCharm, "_is_ready", return_value=True))
+        stack.enter_context(
+            patch.object(IstioIngressCharm, "_check_deployment_ready", return_value=True)
+        )
+        timer.install(stack)
+
+        state_out, full = _run_hook(context, context.on.config_changed(), state, client, timer)
+        results.append({"hook": "full", **full})
+
+        if ipa_relations:
+            changed = dataclasses.replace(ipa_relation(0, port=8081), id=relations[0].id)
+            state_in = dataclasses.replace(
+                state_out,
+                relations=[changed, *(r for r in state_out.relations if r.id != changed.id)],
+            )
+            _, incremental = _run_hook(
+                context, context.on.relation_changed(changed), state_in, client, timer
+            )
+            results.append({"hook": "incremental", **incremental})
+
+    return [
+        {
+            "ipa_relations": ipa_relations,
+            "istio_ingress_route_relations": istio_ingress_route_relations,
+            "tls": tls,
+            **result,
+        }
+        for result in results
+    ]
+
+
+def run_benchmark(
+    sizes: Iterable[int] = DEFAULT_SIZES,
+    istio_ingress_route_ratio: float = 0.5,
+    tls_modes: Iterable[bool] = (False, True),
+    api_latency: float = 0.0,
+) -> Dict:
+    """Run every scenario and return the results, ready to be dumped as JSON.
+
+    Args:
+        sizes: Numbers of IPA relations (N) to benchmark
+        istio_ingress_route_ratio: Number of istio-ingress-route relations (M) per IPA relation
+        tls_modes: Whether to run each size without TLS, with TLS, or both
+        api_latency: Seconds added to every Kubernetes API call
+    """
+    results = []
+    for size in sizes:
+        for tls in tls_modes:
+            results.extend(
+                run_scenario(size, int(size * istio_ingress_route_ratio), tls, api_latency)
+            )
+    return {
+        "benchmark": "istio-ingress-k8s.sync_all_resources",
+        "python": platform.python_version(),
+        "api_latency_seconds": api_latency,
+        "results": results,
+    }
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    """Run the benchmark from the command line."""
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--sizes", type=int, nargs="+", default=list(DEFAULT_SIZES))
+    parser.add_argument(
+        "--istio-ingress-route-ratio",
+        type=float,
+        default=0.5,
+        help="istio-ingress-route relations per IPA relation",
+    )
+    parser.add_argument("--tls", choices=("off", "on", "both"), default="both")
+    parser.add_argument(
+        "--api-latency-ms", type=float, default=0.0, help="latency added to every API call"
+    )
+    parser.add_argument("--output", help="write the results to this file instead of stdout")
+    args = parser.parse_args(argv)
+
+    tls_modes = {"off": (False,), "on": (True,), "both": (False, True)}[args.tls]
+    report = run_benchmark(
+        sizes=args.sizes,
+        istio_ingress_route_ratio=args.istio_ingress_route_ratio,
+        tls_modes=tls_modes,
+        api_latency=args.api_latency_ms / 1000,
+    )
+    output = json.dumps(report, indent=2)
+    if args.output:
+        with open(args.output, "w") as f:
+            f.write(output + "\n")
+    else:
+        print(output)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,67 @@
+# Copyright 2024 Canonical Ltd.
+# See LICENSE file for licensing details.
+
+"""Helpers shared by the unit tests and the benchmarks."""
+
+import json
+
+import scenario
+from charms.tls_certificates_interface.v3.tls_certificates import (
+    generate_ca,
+    generate_certificate,
+    generate_csr,
+    generate_private_key,
+)
+
+
+def generate_certificates_relation(subject="example.com"):
+    requirer_private_key = generate_private_key()
+
+    csr = generate_csr(
+        private_key=requirer_private_key,
+        subject=subject,
+    )
+    provider_private_key = generate_private_key()
+    provider_ca_certificate = generate_ca(
+        private_key=provider_private_key,
+        subject=subject,
+    )
+    certificate = generate_certificate(
+        ca_key=provider_private_key,
+        csr=csr,
+        ca=provider_ca_certificate,
+    )
+
+    to_return = {
+        "csr_string": csr.decode(),
+        "provider_ca_certificate_string": provider_ca_certificate.decode(),
+        "certificate_string": certificate.decode(),
+    }
+
+    to_return["relation"] = scenario.Relation(
+        endpoint="certificates",
+        interface="tls-certificates",
+        remote_app_name="certificate-requirer",
+        local_unit_data={
+            "certificate_signing_requests": json.dumps(
+                [
+                    {
+                        "certificate_signing_request": to_return["csr_string"],
+                        "ca": False,
+                    }
+                ]
+            )
+        },
+        remote_app_data={
+            "certificates": json.dumps(
+                [
+                    {
+                        "certificate": to_return["certificate_string"],
+                        "certificate_signing_request": to_return["csr_string"],
+                        "ca": to_return["provider_ca_certificate_string"],
+                    }
+                ]
+            ),
+        },
+    )
+    return to_return
@@ -211,3 +211,25 @@ def test_construct_external_traffic_auth_policy(
         # Has a single rule with correct ipBlocks
         assert len(auth_policy["spec"]["rules"]) == 1
         assert auth_policy["spec"]["rules"][0]["from"][0]["source"]["ipBlocks"] == ip_blocks
+
+
+def test_construct_ext_authz_policy_splits_long_not_paths(istio_ingress_charm, istio_ingress_context):
+    """Test that a long notPaths list is split across rules scoped by path."""
+    unauthenticated_paths = [f"/svc.Public/Method{i}" for i in range(100)] + ["/app", "/app/*"]
+    with patch.object(IstioIngressCharm, "_is_ready"), istio_ingress_context(
+        istio_ingress_context.on.update_status(),
+        state=scenario.State(leader=True),
+    ) as manager:
+        charm: IstioIngressCharm = manager.charm
+        auth_policy = charm._construct_ext_authz_policy(
+            ext_authz_provider_name="external_authorizer",
+            unauthenticated_paths=sorted(unauthenticated_paths),
+        )
+
+    operations = [rule["to"][0]["operation"] for rule in auth_policy["spec"]["rules"]]
+    assert len(operations) > 1
+    assert not operations[0].get("paths")
+    assert all(len(operation["notPaths"]) <= 64 for operation in operations)
+    assert set(unauthenticated_paths) <= {
+        path for operation in operations for path in operation["notPaths"]
+    }
@@ -0,0 +1,42 @@
+# Copyright 2024 Canonical Ltd.
+# See LICENSE file for licensing details.
+
+"""Smoke test for the scale benchmark harness, so that it keeps working as the charm evolves."""
+
+import json
+
+from tests.benchmark.bench_sync_all_resources import STAGES, run_benchmark
+
+
+def test_benchmark_reports_stages_and_api_calls():
+    """Test that the benchmark runs both hooks and reports every stage and the API calls."""
+    report = run_benchmark(sizes=[4], istio_ingress_route_ratio=0.5, tls_modes=(False,))
+
+    # The report is machine-readable
+    assert json.loads(json.dumps(report)) == report
+
+    full, incremental = report["results"]
+    assert (full["hook"], incremental["hook"]) == ("full", "incremental")
+    for result in (full, incremental):
+        assert result["ipa_relations"] == 4
+        assert result["istio_ingress_route_relations"] == 2
+        assert set(result["stages"]) == set(STAGES)
+
+    # Every IPA app and HTTP istio-ingress-route gets a route, every stage ran on the full sync
+    assert full["resources"]["HTTPRoute"] == 4 + 2
+    assert all(stage["calls"] > 0 for stage in full["stages"].values())
+    # Changing a single app does not reconcile every route again
+    assert 0 < incremental["api_calls"]["total"] < full["api_calls"]["total"]
+    assert incremental["resources"] == full["resources"]
+
+
+def test_benchmark_tls_mode_enables_tls():
+    """Test that the TLS runs go through the TLS path, with a certificate Secret and redirects."""
+    report = run_benchmark(sizes=[4], istio_ingress_route_ratio=0.5, tls_modes=(False, True))
+
+    full, tls_full = (r for r in report["results"] if r["hook"] == "full")
+    assert (full["tls"], tls_full["tls"]) == (False, True)
+    assert "Secret" not in full["resources"]
+    assert tls_full["resources"]["Secret"] == 1
+    # Each IPA app also gets an HTTP to HTTPS redirect route
+    assert tls_full["resources"]["HTTPRoute"] == full["resources"]["HTTPRoute"] + 4
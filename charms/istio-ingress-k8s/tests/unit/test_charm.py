@@ -140,3 +140,32 @@ def test_external_hostname_config_cached(harness: Harness[IstioIngressCharm]):
         harness.set_leader(True)
         harness.update_config({"external_hostname": "new.com"})
         assert charm._ingress_url == expected_external_host
+
+
+def test_refresh_certs_only_on_cert_inputs_change(harness: Harness[IstioIngressCharm]):
+    """Test that a cert refresh is only requested when the SANs or subject of the CSR change."""
+    harness.begin()
+    charm = harness.charm
+    charm._cert_inputs_digest = "digest-1"
+
+    with patch.object(charm, "on") as mock_on:
+        mock_emit = mock_on.refresh_certs.emit
+        charm._refresh_certs_if_inputs_changed()
+        charm._refresh_certs_if_inputs_changed()
+        assert mock_emit.call_count == 1
+
+        charm._cert_inputs_digest = "digest-2"
+        charm._refresh_certs_if_inputs_changed()
+        assert mock_emit.call_count == 2
+
+        # Without an address, cert handling is disabled and there is nothing to refresh
+        charm._cert_inputs_digest = None
+        charm._refresh_certs_if_inputs_changed()
+        assert mock_emit.call_count == 2
+
+        # Once reset (e.g. on upgrade), the CSR is inspected again even if nothing changed
+        charm._cert_inputs_digest = "digest-2"
+        charm._refresh_certs_if_inputs_changed()
+        charm._reset_cert_inputs_digest(None)
+        charm._refresh_certs_if_inputs_changed()
+        assert mock_emit.call_count == 4
@@ -1,24 +1,29 @@
 # Copyright 2024 Canonical Ltd.
 # See LICENSE file for licensing details.
 import json
+import threading
 from typing import Optional
 from unittest.mock import MagicMock, PropertyMock, patch
 
+import httpx
 import pytest
 import scenario
-from charms.tls_certificates_interface.v3.tls_certificates import (
-    generate_ca,
-    generate_certificate,
-    generate_csr,
-    generate_private_key,
-)
+from lightkube import ApiError
 from lightkube.models.meta_v1 import ObjectMeta
+from lightkube.resources.apps_v1 import Deployment
 from lightkube.resources.autoscaling_v2 import HorizontalPodAutoscaler
-from lightkube.resources.core_v1 import Secret
-from ops import ActiveStatus, BlockedStatus
-
-from charm import IstioIngressCharm
-from utils import GatewayListener
+from lightkube.resources.core_v1 import ConfigMap, Secret
+from lightkube.resources.policy_v1 import PodDisruptionBudget
+from ops import ActiveStatus, BlockedStatus, WaitingStatus
+
+from charm import (
+    GATEWAY_READINESS_MAX_RETRIES,
+    GATEWAY_READINESS_NOTICE_KEY,
+    RESOURCE_TYPES,
+    IstioIngressCharm,
+)
+from tests.helpers import generate_certificates_relation
+from utils import ConcurrentReconciler, GatewayListener, gateway_shard
 
 
 def create_test_listeners(
@@ -350,7 +355,460 @@ def test_sync_gateway_resources_with_tls(
         normalized_listeners = create_test_listeners()
         charm._sync_gateway_resources(normalized_listeners)
         # Assert that the Gateway resource has been created with the normalized listeners
-        mocked_construct_gateway.assert_called_once_with(normalized_listeners)
+        mocked_construct_gateway.assert_called_once_with(normalized_listeners, charm.app.name)
+
+
+def test_sync_gateway_resources_sharded(istio_ingress_charm, istio_ingress_context):
+    """Test that with gateway-shards, each shard gets a Gateway and HPA with its routes' listeners."""
+    mock_krm = MagicMock()
+    routes = [
+        {"source_app": f"app{i}", "listener_protocol": "HTTP", "listener_port": 80 + i}
+        for i in range(6)
+    ]
+    listeners = create_test_listeners(ports=tuple(80 + i for i in range(6)), protocols=("HTTP",))
+
+    with istio_ingress_context(
+        istio_ingress_context.on.update_status(),
+        state=scenario.State(leader=True, config={"gateway-shards": 3}, planned_units=2),
+    ) as manager:
+        charm = manager.charm
+        charm._get_gateway_resource_manager = MagicMock(return_value=mock_krm)
+        charm._sync_gateway_resources(listeners, http_routes=routes)
+        app_name = charm.app.name
+
+    resources = mock_krm.reconcile.call_args[0][0]
+    gateways = {
+        r.metadata.name: r for r in resources if isinstance(r, RESOURCE_TYPES["Gateway"])
+    }
+    hpas = {r.metadata.name: r for r in resources if isinstance(r, HorizontalPodAutoscaler)}
+    shard_names = [app_name, f"{app_name}-shard-1", f"{app_name}-shard-2"]
+    assert list(gateways) == list(hpas) == shard_names
+
+    for i, route in enumerate(routes):
+        gateway = gateways[shard_names[gateway_shard(route["source_app"], 3)]]
+        assert f"http-{80 + i}" in [listener["name"] for listener in gateway.spec["listeners"]]
+    # Each listener is only on the shard of its route
+    assert sum(len(gateway.spec["listeners"]) for gateway in gateways.values()) == len(routes)
+    for name, hpa in hpas.items():
+        assert hpa.spec.scaleTargetRef.name == f"{name}-istio"
+        assert hpa.spec.minReplicas == hpa.spec.maxReplicas == 2
+
+
+def test_gateway_shards_unsupported_with_external_hostname(
+    istio_ingress_charm, istio_ingress_context
+):
+    """Test that gateway sharding falls back to a single gateway, and blocks, when unsupported."""
+    with istio_ingress_context(
+        istio_ingress_context.on.update_status(),
+        state=scenario.State(
+            leader=True, config={"gateway-shards": 2, "external_hostname": "foo.example.com"}
+        ),
+    ) as manager:
+        charm = manager.charm
+        assert charm._gateway_names == [charm.app.name]
+        assert [ref.name for ref in charm._gateway_target_refs()] == [charm.app.name]
+
+        event = MagicMock()
+        charm._collect_gateway_shards_status(event)
+        status = event.add_status.call_args[0][0]
+        assert isinstance(status, BlockedStatus)
+        assert "gateway-shards" in status.message
+
+
+def test_readiness_checks_every_gateway_shard(istio_ingress_charm, istio_ingress_context):
+    """Test that the readiness of every gateway shard is checked, and the unready ones reported."""
+
+    def _get(resource, name, namespace):
+        gateway_name = name.removesuffix("-istio")
+        obj = MagicMock()
+        if resource is Deployment:
+            obj.status.replicas = 2
+            obj.status.readyReplicas = 1 if gateway_name.endswith("-shard-2") else 2
+        else:
+            address = MagicMock(hostname=None, ip="10.1.1.1")
+            obj.status.loadBalancer.ingress = [
+                None if gateway_name.endswith("-shard-1") else address
+            ]
+        return obj
+
+    mock_client = MagicMock()
+    mock_client.get.side_effect = _get
+
+    with patch.object(
+        IstioIngressCharm, "lightkube_client", new_callable=PropertyMock, return_value=mock_client
+    ), istio_ingress_context(
+        istio_ingress_context.on.update_status(),
+        state=scenario.State(leader=True, config={"gateway-shards": 3}),
+    ) as manager:
+        charm = manager.charm
+        assert charm._unready_gateway_deployments() == [f"{charm.app.name}-shard-2"]
+        assert charm._gateways_without_address() == [f"{charm.app.name}-shard-1"]
+
+        event = MagicMock()
+        with patch.object(IstioIngressCharm, "_check_deployment_ready", return_value=False):
+            charm._collect_readiness_status(event)
+        messages = [call.args[0].message for call in event.add_status.call_args_list]
+        assert any(f"({charm.app.name}-shard-2)" in message for message in messages)
+        assert any(f"({charm.app.name}-shard-1)" in message for message in messages)
+
+
+def test_construct_rate_limit_filters(istio_ingress_charm, istio_ingress_context):
+    """Test that each gateway gets an EnvoyFilter rate limiting its listeners."""
+    listeners = create_test_listeners(ports=(80, 8080), source_apps=("app1", "app2"))
+    listeners[1]["rate_limit"] = {"requests_per_second": 5, "burst": 10}
+
+    with istio_ingress_context(
+        istio_ingress_context.on.update_status(),
+        state=scenario.State(
+            leader=True,
+            config={"gateway-shards": 2, "rate-limit-requests-per-second": 100},
+        ),
+    ) as manager:
+        charm = manager.charm
+        filters = charm._construct_rate_limit_filters(listeners)
+
+    assert [f.metadata.name for f in filters] == [
+        "istio-ingress-k8s-local-rate-limit",
+        "istio-ingress-k8s-shard-1-local-rate-limit",
+    ]
+    assert filters[1].spec["workloadSelector"]["labels"] == {
+        "gateway.networking.k8s.io/gateway-name": "istio-ingress-k8s-shard-1"
+    }
+    buckets = {
+        patch["match"]["listener"]["portNumber"]: patch["patch"]["value"]["typed_config"][
+            "token_bucket"
+        ]
+        for patch in filters[0].spec["configPatches"]
+    }
+    assert buckets == {
+        80: {"max_tokens": 100, "tokens_per_fill": 100, "fill_interval": "1s"},
+        8080: {"max_tokens": 10, "tokens_per_fill": 5, "fill_interval": "1s"},
+    }
+
+
+def test_construct_rate_limit_filters_disabled(istio_ingress_charm, istio_ingress_context):
+    """Test that no EnvoyFilter is built without rate limits, and that invalid config blocks."""
+    with istio_ingress_context(
+        istio_ingress_context.on.update_status(),
+        state=scenario.State(leader=True, config={"rate-limit-requests-per-second": -1}),
+    ) as manager:
+        charm = manager.charm
+        assert charm._construct_rate_limit_filters(create_test_listeners()) == []
+
+        event = MagicMock()
+        charm._collect_rate_limit_status(event)
+        status = event.add_status.call_args[0][0]
+        assert isinstance(status, BlockedStatus)
+        assert "rate-limit-requests-per-second" in status.message
+
+
+def test_construct_compression_filters(istio_ingress_charm, istio_ingress_context):
+    """Test that listeners compress with their own algorithms when none are configured."""
+    listeners = create_test_listeners(ports=(80, 8080, 9090), source_apps=("a", "b", "c"))
+    listeners[1]["compression"] = {
+        "algorithms": ["gzip"],
+        "min_content_length": 0,
+        "content_types": ["application/json"],
+    }
+
+    with istio_ingress_context(
+        istio_ingress_context.on.update_status(),
+        state=scenario.State(leader=True),
+    ) as manager:
+        charm = manager.charm
+        (envoy_filter,) = charm._construct_compression_filters(listeners)
+
+    assert envoy_filter.metadata.name == "istio-ingress-k8s-compression"
+    filters = [
+        (
+            patch["match"]["listener"]["portNumber"],
+            patch["patch"]["value"]["name"],
+            patch["patch"]["value"]["typed_config"]["response_direction_config"]["common_config"],
+        )
+        for patch in envoy_filter.spec["configPatches"]
+    ]
+    assert filters == [
+        (
+            8080,
+            "envoy.filters.http.compressor.gzip",
+            {"min_content_length": 0, "content_type": ["application/json"]},
+        ),
+    ]
+
+
+def test_construct_compression_filters_config_wins(istio_ingress_charm, istio_ingress_context):
+    """Test that the configured compression applies to every listener, over their own."""
+    listeners = create_test_listeners(ports=(80, 8080), source_apps=("a", "b"))
+    listeners[1]["compression"] = {
+        "algorithms": ["zstd"],
+        "min_content_length": 0,
+        "content_types": [],
+    }
+
+    with istio_ingress_context(
+        istio_ingress_context.on.update_status(),
+        state=scenario.State(leader=True, config={"compression-algorithms": "brotli, gzip"}),
+    ) as manager:
+        charm = manager.charm
+        (envoy_filter,) = charm._construct_compression_filters(listeners)
+
+    filters = [
+        (
+            patch["match"]["listener"]["portNumber"],
+            patch["patch"]["value"]["name"],
+            patch["patch"]["value"]["typed_config"]["response_direction_config"]["common_config"],
+        )
+        for patch in envoy_filter.spec["configPatches"]
+    ]
+    assert filters == [
+        (port, f"envoy.filters.http.compressor.{algorithm}", {"min_content_length": 1024})
+        for port in (80, 8080)
+        for algorithm in ("brotli", "gzip")
+    ]
+
+
+def test_compression_invalid_config(istio_ingress_charm, istio_ingress_context):
+    """Test that unknown compression algorithms disable compression, and block."""
+    with istio_ingress_context(
+        istio_ingress_context.on.update_status(),
+        state=scenario.State(leader=True, config={"compression-algorithms": "gzip,lzma"}),
+    ) as manager:
+        charm = manager.charm
+        assert charm._construct_compression_filters(create_test_listeners()) == []
+
+        event = MagicMock()
+        charm._collect_compression_status(event)
+        status = event.add_status.call_args[0][0]
+        assert isinstance(status, BlockedStatus)
+        assert "lzma" in status.message
+
+
+def test_construct_listener_options_filters(istio_ingress_charm, istio_ingress_context):
+    """Test that the connection options are merged into every listener and its connection manager."""
+    listeners = create_test_listeners(ports=(443, 80), protocols=("HTTPS", "HTTP"))
+
+    with istio_ingress_context(
+        istio_ingress_context.on.update_status(),
+        state=scenario.State(
+            leader=True,
+            config={
+                "http2-max-concurrent-streams": 250,
+                "gateway-per-connection-buffer-limit": 32768,
+            },
+        ),
+    ) as manager:
+        (envoy_filter,) = manager.charm._construct_listener_options_filters(listeners)
+
+    patches = envoy_filter.spec["configPatches"]
+    assert [(patch["applyTo"], patch["match"]["listener"]["portNumber"]) for patch in patches] == [
+        ("LISTENER", 80),
+        ("LISTENER", 443),
+        ("NETWORK_FILTER", 80),
+        ("NETWORK_FILTER", 443),
+    ]
+    assert patches[0]["patch"]["value"] == {"per_connection_buffer_limit_bytes": 32768}
+    assert patches[2]["patch"]["value"]["typed_config"]["http2_protocol_options"] == {
+        "max_concurrent_streams": 250
+    }
+
+
+@pytest.mark.parametrize("http3", [True, False])
+def test_sync_http3_service_ports(istio_ingress_charm, istio_ingress_context, http3):
+    """Test that HTTPS listeners get UDP ports with http3, which are released once it's unset."""
+    listeners = create_test_listeners(
+        ports=(80, 443), protocols=("HTTP", "HTTPS"), tls_secret_names=(None, "tls")
+    )
+    mock_client = MagicMock()
+
+    with patch.object(
+        IstioIngressCharm, "lightkube_client", new_callable=PropertyMock, return_value=mock_client
+    ), istio_ingress_context(
+        istio_ingress_context.on.update_status(),
+        state=scenario.State(leader=True, config={"http3": http3}),
+    ) as manager:
+        charm = manager.charm
+        charm._stored.http3_service_ports = not http3
+        charm._sync_http3_service_ports({charm.app.name: listeners})
+        assert charm._stored.http3_service_ports == http3
+
+        # Nothing to release a second time
+        if not http3:
+            charm._sync_http3_service_ports({charm.app.name: listeners})
+
+    (service,) = [call.args[0] for call in mock_client.apply.call_args_list]
+    assert service.metadata.name == "istio-ingress-k8s-istio"
+    assert mock_client.apply.call_args.kwargs["field_manager"] == "istio-ingress-k8s-http3"
+    expected_ports = [("http3-443", 443, "UDP")] if http3 else []
+    assert [(p.name, p.port, p.protocol) for p in service.spec.ports] == expected_ports
+
+
+def _api_error(code: int) -> ApiError:
+    request = httpx.Request("GET", "http://localhost")
+    response = httpx.Response(code, json={"message": "x", "code": code}, request=request)
+    return ApiError(request=request, response=response)
+
+
+def test_sync_http3_service_ports_skips_missing_service(
+    istio_ingress_charm, istio_ingress_context
+):
+    """Test that no Service is created with only the HTTP/3 ports before Istio creates it."""
+    listeners = create_test_listeners(ports=(443,), protocols=("HTTPS",), tls_secret_names=("tls",))
+    mock_client = MagicMock()
+    mock_client.get.side_effect = _api_error(404)
+
+    with patch.object(
+        IstioIngressCharm, "lightkube_client", new_callable=PropertyMock, return_value=mock_client
+    ), istio_ingress_context(
+        istio_ingress_context.on.update_status(),
+        state=scenario.State(leader=True, config={"http3": True}),
+    ) as manager:
+        charm = manager.charm
+        charm._sync_http3_service_ports({charm.app.name: listeners})
+
+    mock_client.apply.assert_not_called()
+
+
+def test_sync_http3_service_ports_failed_apply_is_retried(
+    istio_ingress_charm, istio_ingress_context
+):
+    """Test that the released ports are only remembered once the apply succeeded."""
+    listeners = create_test_listeners(ports=(443,), protocols=("HTTPS",), tls_secret_names=("tls",))
+    mock_client = MagicMock()
+    mock_client.apply.side_effect = _api_error(500)
+
+    with patch.object(
+        IstioIngressCharm, "lightkube_client", new_callable=PropertyMock, return_value=mock_client
+    ), istio_ingress_context(
+        istio_ingress_context.on.update_status(),
+        state=scenario.State(leader=True, config={"http3": False}),
+    ) as manager:
+        charm = manager.charm
+        charm._stored.http3_service_ports = True
+        with pytest.raises(ApiError):
+            charm._sync_http3_service_ports({charm.app.name: listeners})
+        assert charm._stored.http3_service_ports
+
+
+def test_sync_http3_service_ports_concurrently(istio_ingress_charm, istio_ingress_context):
+    """Test that the ports are applied after the Gateway, and remembered on the main thread."""
+    listeners = create_test_listeners(ports=(443,), protocols=("HTTPS",), tls_secret_names=("tls",))
+    mock_client = MagicMock()
+    gateway_applied = threading.Event()
+
+    with patch.object(
+        IstioIngressCharm, "lightkube_client", new_callable=PropertyMock, return_value=mock_client
+    ), istio_ingress_context(
+        istio_ingress_context.on.update_status(),
+        state=scenario.State(leader=True, config={"http3": True}),
+    ) as manager:
+        charm = manager.charm
+        charm._stored.http3_service_ports = False
+        with ConcurrentReconciler(max_workers=2) as reconciler:
+            charm._reconciler = reconciler
+            reconciler.submit("gateway", lambda: gateway_applied.wait(timeout=5))
+            charm._sync_http3_service_ports({charm.app.name: listeners})
+            mock_client.apply.assert_not_called()
+            gateway_applied.set()
+        charm._reconciler = None
+
+        mock_client.apply.assert_called_once()
+        # Left to the main thread, once every step succeeded
+        assert not charm._stored.http3_service_ports
+        ((name, handler),) = charm._reconcile_result_handlers
+        handler(reconciler.result(name))
+        assert charm._stored.http3_service_ports
+
+
+def test_sync_gateway_resources_proxy_tuning(istio_ingress_charm, istio_ingress_context):
+    """Test that the proxy tuning is rendered in a ConfigMap referenced by the Gateway."""
+    config = {
+        "gateway-cpu-request": "500m",
+        "gateway-cpu-limit": "2",
+        "gateway-memory-limit": "1Gi",
+        "gateway-concurrency": 2,
+        "gateway-max-connections": 10000,
+    }
+    with istio_ingress_context(
+        istio_ingress_context.on.update_status(),
+        state=scenario.State(leader=True, planned_units=1, config=config),
+    ) as manager:
+        charm = manager.charm
+        mock_krm = MagicMock()
+        charm._get_gateway_resource_manager = lambda: mock_krm
+        charm._sync_gateway_resources(create_test_listeners())
+
+    resources = mock_krm.reconcile.call_args.args[0]
+    (gateway,) = [r for r in resources if isinstance(r, RESOURCE_TYPES["Gateway"])]
+    (config_map,) = [r for r in resources if isinstance(r, ConfigMap)]
+    assert config_map.metadata.name == "istio-ingress-k8s-parameters"
+    assert gateway.spec["infrastructure"]["parametersRef"] == {
+        "group": "",
+        "kind": "ConfigMap",
+        "name": "istio-ingress-k8s-parameters",
+    }
+
+    template = json.loads(config_map.data["deployment"])["spec"]["template"]
+    assert json.loads(template["metadata"]["annotations"]["proxy.istio.io/config"]) == {
+        "concurrency": 2,
+        "runtimeValues": {"overload.global_downstream_max_connections": "10000"},
+    }
+    assert template["spec"]["containers"] == [
+        {
+            "name": "istio-proxy",
+            "resources": {"requests": {"cpu": "500m"}, "limits": {"cpu": "2", "memory": "1Gi"}},
+        }
+    ]
+
+
+def test_gateway_proxy_invalid_config(istio_ingress_charm, istio_ingress_context):
+    """Test that an invalid proxy config leaves the Istio defaults, and blocks."""
+    with istio_ingress_context(
+        istio_ingress_context.on.update_status(),
+        state=scenario.State(
+            leader=True, config={"gateway-cpu-limit": "2 cores", "gateway-concurrency": 2}
+        ),
+    ) as manager:
+        charm = manager.charm
+        config_map = charm._construct_gateway_parameters(charm.app.name)
+        assert json.loads(config_map.data["deployment"]) == {}
+
+        event = MagicMock()
+        charm._collect_gateway_proxy_status(event)
+        status = event.add_status.call_args[0][0]
+        assert isinstance(status, BlockedStatus)
+        assert "gateway-cpu-limit" in status.message
+
+
+def test_gateway_negative_buffer_limit_blocks(istio_ingress_charm, istio_ingress_context):
+    """Test that a negative per-connection buffer limit blocks."""
+    with istio_ingress_context(
+        istio_ingress_context.on.update_status(),
+        state=scenario.State(leader=True, config={"gateway-per-connection-buffer-limit": -1}),
+    ) as manager:
+        charm = manager.charm
+        event = MagicMock()
+        charm._collect_gateway_proxy_status(event)
+        status = event.add_status.call_args[0][0]
+        assert isinstance(status, BlockedStatus)
+        assert "gateway-per-connection-buffer-limit" in status.message
+
+
+def test_sync_gateway_resources_without_proxy_tuning(istio_ingress_charm, istio_ingress_context):
+    """Test that the Gateway keeps referencing an empty ConfigMap once the tuning is unset."""
+    with istio_ingress_context(
+        istio_ingress_context.on.update_status(),
+        state=scenario.State(leader=True, planned_units=1),
+    ) as manager:
+        charm = manager.charm
+        mock_krm = MagicMock()
+        charm._get_gateway_resource_manager = lambda: mock_krm
+        charm._sync_gateway_resources(create_test_listeners())
+
+    resources = mock_krm.reconcile.call_args.args[0]
+    (gateway,) = [r for r in resources if isinstance(r, RESOURCE_TYPES["Gateway"])]
+    (config_map,) = [r for r in resources if isinstance(r, ConfigMap)]
+    assert gateway.spec["infrastructure"]["parametersRef"]["name"] == config_map.metadata.name
+    assert json.loads(config_map.data["deployment"]) == {}
 
 
 def test_construct_gateway_tls_secret_with_certificates(
@@ -383,59 +841,6 @@ def test_construct_gateway_tls_secret_without_certificates(
         assert secret is None
 
 
-def generate_certificates_relation(subject="example.com"):
-    requirer_private_key = generate_private_key()
-
-    csr = generate_csr(
-        private_key=requirer_private_key,
-        subject=subject,
-    )
-    provider_private_key = generate_private_key()
-    provider_ca_certificate = generate_ca(
-        private_key=provider_private_key,
-        subject=subject,
-    )
-    certificate = generate_certificate(
-        ca_key=provider_private_key,
-        csr=csr,
-        ca=provider_ca_certificate,
-    )
-
-    to_return = {
-        "csr_string": csr.decode(),
-        "provider_ca_certificate_string": provider_ca_certificate.decode(),
-        "certificate_string": certificate.decode(),
-    }
-
-    to_return["relation"] = scenario.Relation(
-        endpoint="certificates",
-        interface="tls-certificates",
-        remote_app_name="certificate-requirer",
-        local_unit_data={
-            "certificate_signing_requests": json.dumps(
-                [
-                    {
-                        "certificate_signing_request": to_return["csr_string"],
-                        "ca": False,
-                    }
-                ]
-            )
-        },
-        remote_app_data={
-            "certificates": json.dumps(
-                [
-                    {
-                        "certificate": to_return["certificate_string"],
-                        "certificate_signing_request": to_return["csr_string"],
-                        "ca": to_return["provider_ca_certificate_string"],
-                    }
-                ]
-            ),
-        },
-    )
-    return to_return
-
-
 def _validate_gateway_listener(
     gateway,
     listener_name: str,
@@ -510,8 +915,8 @@ def test_sync_all_triggers_hpa_reconcile(
     mock_manager.reconcile.assert_called_once()
     resources = mock_manager.reconcile.call_args.args[0]
 
-    # we expect exactly two resources: the Gateway and the HPA
-    assert len(resources) == 2
+    # we expect exactly three resources: the Gateway, its parameters ConfigMap and the HPA
+    assert len(resources) == 3
 
     # filter out only the HPA object
     hpas = [r for r in resources if isinstance(r, HorizontalPodAutoscaler)]
@@ -525,6 +930,71 @@ def test_sync_all_triggers_hpa_reconcile(
     assert result.unit_status.message.startswith("Serving at")
 
 
+@pytest.mark.parametrize("max_replicas, expected_max", [(10, 10), (2, 3)])
+@patch.object(IstioIngressCharm, "_is_ready", return_value=True)
+@patch.object(IstioIngressCharm, "_setup_proxy_pebble_service")
+@patch.object(IstioIngressCharm, "_get_gateway_resource_manager")
+def test_sync_all_autoscaling(
+    mock_get_gateway_manager,
+    mock_setup_proxy,
+    mock_is_ready,
+    istio_ingress_charm,
+    istio_ingress_context,
+    max_replicas,
+    expected_max,
+):
+    """Assert that autoscaling bounds the HPA by the units and the config, and adds a PDB."""
+    mock_manager = mock_get_gateway_manager.return_value
+    state = scenario.State(
+        leader=True,
+        planned_units=3,
+        config={
+            "autoscaling-max-replicas": max_replicas,
+            "autoscaling-memory-utilization": 70,
+        },
+    )
+
+    istio_ingress_context.run(istio_ingress_context.on.config_changed(), state)
+
+    resources = mock_manager.reconcile.call_args.args[0]
+    (hpa,) = [r for r in resources if isinstance(r, HorizontalPodAutoscaler)]
+    assert hpa.spec.minReplicas == 3
+    assert hpa.spec.maxReplicas == expected_max
+    assert {
+        (metric.resource.name, metric.resource.target.averageUtilization)
+        for metric in hpa.spec.metrics
+    } == {("cpu", 80), ("memory", 70)}
+
+    (pdb,) = [r for r in resources if isinstance(r, PodDisruptionBudget)]
+    assert pdb.metadata.name == "istio-ingress-k8s"
+    assert pdb.spec.maxUnavailable == 1
+    assert pdb.spec.selector.matchLabels == {
+        "gateway.networking.k8s.io/gateway-name": "istio-ingress-k8s"
+    }
+
+
+def test_autoscaling_invalid_config(istio_ingress_charm, istio_ingress_context):
+    """Test that an invalid autoscaling config pins the replicas to the units, and blocks."""
+    with istio_ingress_context(
+        istio_ingress_context.on.update_status(),
+        state=scenario.State(
+            leader=True,
+            planned_units=2,
+            config={"autoscaling-max-replicas": 5, "autoscaling-cpu-utilization": 0},
+        ),
+    ) as manager:
+        charm = manager.charm
+        hpa = charm._construct_hpa(2)
+        assert hpa.spec.maxReplicas == 2
+        assert hpa.spec.metrics is None
+
+        event = MagicMock()
+        charm._collect_autoscaling_status(event)
+        status = event.add_status.call_args[0][0]
+        assert isinstance(status, BlockedStatus)
+        assert "autoscaling" in status.message
+
+
 @pytest.mark.parametrize(
     "planned_units, call_count",
     [
@@ -551,3 +1021,130 @@ def test_on_remove_deletes_hpa_only_when_last_unit(
 
     manager = mock_get_gateway_manager.return_value
     assert manager.delete.call_count == call_count
+
+
+@patch("charm.IstioIngressCharm._get_lb_external_address", new_callable=PropertyMock)
+def test_is_ready_steady_state(mock_get_lb_external_address, istio_ingress_context):
+    """Assert that an already-ready gateway is detected without scheduling a retry."""
+    mock_get_lb_external_address.return_value = "10.1.1.1"
+    with istio_ingress_context(
+        istio_ingress_context.on.update_status(),
+        state=scenario.State(leader=True),
+    ) as manager:
+        charm = manager.charm
+        assert charm._is_ready()
+        assert not charm._gateway_readiness_retry_scheduled
+
+
+@patch("charm.IstioIngressCharm._get_lb_external_address", new_callable=PropertyMock)
+@patch("charm.IstioIngressCharm._check_deployment_ready", return_value=False)
+def test_is_ready_schedules_retry(
+    _mock_check_deployment_ready, mock_get_lb_external_address, istio_ingress_context
+):
+    """Assert that a gateway not ready schedules a Pebble notice and sets a waiting status."""
+    mock_get_lb_external_address.return_value = None
+    container = scenario.Container("metrics-proxy", can_connect=True)
+    with istio_ingress_context(
+        istio_ingress_context.on.update_status(),
+        state=scenario.State(
+            leader=True, config={"external_hostname": "foo.bar"}, containers=[container]
+        ),
+    ) as manager:
+        charm = manager.charm
+        pebble_client = type(charm.unit.get_container("metrics-proxy").pebble)
+        with patch.object(pebble_client, "notify") as mock_notify:
+            assert not charm._is_ready()
+
+        assert charm._gateway_readiness_retry_scheduled
+        mock_notify.assert_called_once()
+        assert mock_notify.call_args.args[1] == GATEWAY_READINESS_NOTICE_KEY
+        state_out = manager.run()
+
+    assert isinstance(state_out.unit_status, WaitingStatus)
+
+
+def _readiness_retries_state(retries):
+    """Return the charm's stored state with the given number of gateway readiness retries."""
+    return scenario.StoredState(
+        owner_path="IstioIngressCharm", content={"gateway_readiness_retries": retries}
+    )
+
+
+@patch("charm.IstioIngressCharm._get_lb_external_address", new_callable=PropertyMock)
+@patch("charm.IstioIngressCharm._check_deployment_ready", return_value=True)
+@patch.object(IstioIngressCharm, "_sync_all_resources")
+def test_readiness_notice_triggers_sync(
+    mock_sync, _mock_check_deployment_ready, mock_get_lb_external_address, istio_ingress_context
+):
+    """Assert that the readiness retry notice re-runs the reconciliation once the gateway is ready."""
+    mock_get_lb_external_address.return_value = "10.1.1.1"
+    notice = scenario.Notice(key=GATEWAY_READINESS_NOTICE_KEY)
+    container = scenario.Container("metrics-proxy", can_connect=True, notices=[notice])
+    state = scenario.State(
+        leader=True, containers=[container], stored_states=[_readiness_retries_state(0)]
+    )
+
+    istio_ingress_context.run(istio_ingress_context.on.pebble_custom_notice(container, notice), state)
+
+    mock_sync.assert_called_once()
+
+
+@pytest.mark.parametrize(
+    "retries, expected_retries",
+    [(0, 1), (GATEWAY_READINESS_MAX_RETRIES - 1, GATEWAY_READINESS_MAX_RETRIES)],
+)
+@patch("charm.IstioIngressCharm._get_lb_external_address", new_callable=PropertyMock)
+@patch("charm.IstioIngressCharm._check_deployment_ready", return_value=True)
+@patch.object(IstioIngressCharm, "_sync_all_resources")
+def test_readiness_retry_does_not_sync(
+    mock_sync,
+    _mock_check_deployment_ready,
+    mock_get_lb_external_address,
+    retries,
+    expected_retries,
+    istio_ingress_context,
+):
+    """Assert that a retry on a gateway without a LoadBalancer address does not sync."""
+    mock_get_lb_external_address.return_value = None
+    state = scenario.State(
+        leader=True,
+        config={"external_hostname": "foo.bar"},
+        stored_states=[_readiness_retries_state(retries)],
+    )
+
+    state_out = istio_ingress_context.run(istio_ingress_context.on.update_status(), state)
+
+    mock_sync.assert_not_called()
+    stored = state_out.get_stored_state("_stored", owner_path="IstioIngressCharm")
+    assert stored.content["gateway_readiness_retries"] == expected_retries
+    # Once the retries are given up on, the charm is blocked until the next event
+    if expected_retries == GATEWAY_READINESS_MAX_RETRIES:
+        assert isinstance(state_out.unit_status, BlockedStatus)
+    else:
+        assert isinstance(state_out.unit_status, WaitingStatus)
+
+
+@pytest.mark.parametrize(
+    "retries, expected_retries", [(3, 3), (GATEWAY_READINESS_MAX_RETRIES, 0)]
+)
+@patch("charm.IstioIngressCharm._get_lb_external_address", new_callable=PropertyMock)
+@patch("charm.IstioIngressCharm._check_deployment_ready", return_value=False)
+def test_is_ready_keeps_pending_retries(
+    _mock_check_deployment_ready,
+    mock_get_lb_external_address,
+    retries,
+    expected_retries,
+    istio_ingress_context,
+):
+    """Assert that pending readiness retries carry on, while given up ones start over."""
+    mock_get_lb_external_address.return_value = None
+    state = scenario.State(
+        leader=True,
+        containers=[scenario.Container("metrics-proxy", can_connect=False)],
+        stored_states=[_readiness_retries_state(retries)],
+    )
+    with istio_ingress_context(istio_ingress_context.on.update_status(), state=state) as manager:
+        charm = manager.charm
+        assert not charm._is_ready()
+        assert charm._gateway_readiness_retry_scheduled
+        assert charm._stored.gateway_readiness_retries == expected_retries
@@ -16,10 +16,12 @@ from charmlibs.interfaces.istio_ingress_route import (
     RequestRedirectFilter,
     RequestRedirectSpec,
 )
+from charms.istio_ingress_k8s.v0 import istio_ingress_route as local_lib
+from lightkube import Client
 from ops import ActiveStatus, BlockedStatus
 
 from charm import IstioIngressCharm
-from tests.unit.test_gateway import generate_certificates_relation
+from tests.helpers import generate_certificates_relation
 from utils import HTTPRoute, RouteInfo, get_unauthenticated_paths
 
 
@@ -493,6 +495,351 @@ def test_sync_ingress_resources_with_tls(
                 raise AssertionError("Unexpected section name")
 
 
+def test_reconcile_ingress_resources_only_touches_changed_apps(
+    istio_ingress_charm, istio_ingress_context
+):
+    """Test that after a first full reconcile, only the resources of changed apps are reconciled."""
+    mock_route_krm = MagicMock()
+    mock_auth_prm = MagicMock()
+    mock_auth_krm = MagicMock()
+    routes = [
+        RouteInfo(
+            service_name=f"remote-app{i}",
+            namespace="remote-model",
+            port=1234,
+            strip_prefix=False,
+            prefix=f"/path{i}",
+        )
+        for i in range(3)
+    ]
+
+    with patch.object(IstioIngressCharm, "_is_ready"), patch.object(
+        Client, "delete"
+    ) as mock_delete, istio_ingress_context(
+        istio_ingress_context.on.update_status(),
+        state=scenario.State(leader=True),
+    ) as manager:
+        charm: IstioIngressCharm = manager.charm
+        charm._get_ingress_route_resource_manager = MagicMock(return_value=mock_route_krm)
+        charm._get_ingress_auth_policy_resource_manager = MagicMock(return_value=mock_auth_prm)
+        charm._get_ingress_auth_policy_patch_manager = MagicMock(return_value=mock_auth_krm)
+
+        # First sync: nothing is recorded yet, so everything is reconciled
+        charm._reconcile_ingress_resources(
+            http_routes=create_test_http_routes(routes), grpc_routes=[]
+        )
+        mock_route_krm.reconcile.assert_called_once()
+        mock_auth_prm.reconcile.assert_called_once()
+        assert len(json.loads(charm._stored.ingress_route_groups)["groups"]) == 3
+
+        # Same routes again: no Kubernetes calls at all
+        mock_route_krm.reset_mock()
+        mock_auth_prm.reset_mock()
+        charm._reconcile_ingress_resources(
+            http_routes=create_test_http_routes(routes), grpc_routes=[]
+        )
+        mock_route_krm.reconcile.assert_not_called()
+        mock_route_krm.patch.assert_not_called()
+        mock_auth_krm.patch.assert_not_called()
+        mock_delete.assert_not_called()
+
+        # remote-app1 changes its prefix and remote-app2 goes away
+        changed_routes = [routes[0], RouteInfo(**{**routes[1], "prefix": "/new-path1"})]
+        charm._reconcile_ingress_resources(
+            http_routes=create_test_http_routes(changed_routes), grpc_routes=[]
+        )
+        mock_route_krm.reconcile.assert_not_called()
+        patched_routes = mock_route_krm.patch.call_args[0][0]
+        assert [r.metadata.name for r in patched_routes] == ["remote-app1"]
+        assert patched_routes[0].spec["rules"][0]["matches"][0]["path"]["value"] == "/new-path1"
+        patched_policies = mock_auth_krm.patch.call_args[0][0]
+        assert [p.metadata.name for p in patched_policies] == [
+            charm._l4_auth_policy_name("remote-app1", "remote-model")
+        ]
+        deleted = {call.kwargs["name"] for call in mock_delete.call_args_list}
+        assert deleted == {
+            "remote-app2",
+            charm._l4_auth_policy_name("remote-app2", "remote-model"),
+        }
+        assert len(json.loads(charm._stored.ingress_route_groups)["groups"]) == 2
+
+
+def test_reconcile_ingress_resources_deletes_unused_destination_rules(
+    istio_ingress_charm, istio_ingress_context
+):
+    """Test that a backend that loses its traffic settings loses its DestinationRule."""
+    mock_dr_krm = MagicMock()
+    routes = [
+        RouteInfo(
+            service_name="remote-app",
+            namespace="remote-model",
+            port=1234,
+            strip_prefix=False,
+            prefix="/path",
+        )
+    ]
+    http_routes = create_test_http_routes(routes)
+    http_routes[0]["traffic_policy"] = {"maxConnections": 10}
+
+    with patch.object(IstioIngressCharm, "_is_ready"), patch.object(
+        Client, "delete"
+    ) as mock_delete, istio_ingress_context(
+        istio_ingress_context.on.update_status(),
+        state=scenario.State(leader=True),
+    ) as manager:
+        charm: IstioIngressCharm = manager.charm
+        charm._get_destination_rule_resource_manager = MagicMock(return_value=mock_dr_krm)
+        charm._get_ingress_route_resource_manager = MagicMock()
+        charm._get_ingress_auth_policy_resource_manager = MagicMock()
+        charm._get_ingress_auth_policy_patch_manager = MagicMock()
+
+        charm._reconcile_ingress_resources(http_routes=http_routes, grpc_routes=[])
+        (destination_rule,) = mock_dr_krm.reconcile.call_args[0][0]
+
+        charm._reconcile_ingress_resources(
+            http_routes=create_test_http_routes(routes), grpc_routes=[]
+        )
+
+    mock_dr_krm.patch.assert_called_once_with([])
+    deleted = {
+        (call.kwargs["name"], call.kwargs["namespace"]) for call in mock_delete.call_args_list
+    }
+    assert (destination_rule.metadata.name, destination_rule.metadata.namespace) in deleted
+
+
+def test_construct_httproutes_packed(istio_ingress_charm, istio_ingress_context):
+    """Test that with pack-http-routes, routes are packed per (namespace, listener) into <=16 rules."""
+    routes = [
+        RouteInfo(
+            service_name=f"remote-app{i:02}",
+            namespace="remote-model" if i < 20 else "other-model",
+            port=1234,
+            strip_prefix=False,
+            prefix=f"/path{i:02}",
+        )
+        for i in range(22)
+    ]
+
+    with istio_ingress_context(
+        istio_ingress_context.on.update_status(),
+        state=scenario.State(leader=True, config={"pack-http-routes": True}),
+    ) as manager:
+        charm: IstioIngressCharm = manager.charm
+        http_routes = create_test_http_routes(routes)
+
+        httproutes = charm._construct_httproutes(http_routes)
+        # The same routes, in any order, give the same objects
+        assert [r.to_dict() for r in charm._construct_httproutes(http_routes[::-1])] == [
+            r.to_dict() for r in httproutes
+        ]
+
+    app = charm.app.name
+    assert [(r.metadata.namespace, r.metadata.name, len(r.spec["rules"])) for r in httproutes] == [
+        ("other-model", f"{app}-httproute-http-80-0", 2),
+        ("remote-model", f"{app}-httproute-http-80-0", 16),
+        ("remote-model", f"{app}-httproute-http-80-1", 4),
+    ]
+    first_rule = httproutes[1].spec["rules"][0]
+    assert first_rule["matches"][0]["path"]["value"] == "/path00"
+    assert first_rule["backendRefs"][0]["name"] == "remote-app00"
+
+
+def test_construct_httproutes_timeouts(istio_ingress_charm, istio_ingress_context):
+    """Test that route timeouts end up on the rule of that route only."""
+    routes = [
+        RouteInfo(
+            service_name=f"remote-app{i}",
+            namespace="remote-model",
+            port=1234,
+            strip_prefix=False,
+            prefix=f"/path{i}",
+        )
+        for i in range(2)
+    ]
+
+    with istio_ingress_context(
+        istio_ingress_context.on.update_status(),
+        state=scenario.State(leader=True, config={"pack-http-routes": True}),
+    ) as manager:
+        charm: IstioIngressCharm = manager.charm
+        http_routes = create_test_http_routes(routes)
+        http_routes[1]["timeouts"] = {"request": "30s", "backendRequest": "10s"}
+
+        (httproute,) = charm._construct_httproutes(http_routes)
+
+    first_rule, second_rule = httproute.spec["rules"]
+    assert "timeouts" not in first_rule
+    assert second_rule["timeouts"] == {"request": "30s", "backendRequest": "10s"}
+    assert second_rule["backendRefs"][0]["name"] == "remote-app1"
+
+
+def _istio_ingress_route_relation(listener_fields=None, **http_route_fields):
+    """Return an istio-ingress-route relation with the config a requirer using the lib publishes."""
+    listener = local_lib.Listener(
+        port=8080, protocol=local_lib.ProtocolType.HTTP, **(listener_fields or {})
+    )
+    config = local_lib.IstioIngressRouteConfig(
+        model="remote-model",
+        listeners=[listener],
+        http_routes=[
+            local_lib.HTTPRoute(
+                name="api",
+                listener=listener,
+                matches=[local_lib.HTTPRouteMatch(path=local_lib.HTTPPathMatch(value="/api"))],
+                backends=[local_lib.BackendRef(service="remote-app", port=8080)],
+                **http_route_fields,
+            )
+        ],
+    )
+    return scenario.Relation(
+        "istio-ingress-route",
+        remote_app_name="remote-app",
+        remote_app_data={"config": config.model_dump_json()},
+    )
+
+
+def test_istio_ingress_route_timeouts_relation_round_trip(istio_ingress_context):
+    """Test that route timeouts survive the relation data, as published by a requirer."""
+    relation = _istio_ingress_route_relation(
+        timeouts=local_lib.HTTPRouteTimeouts(request="30s", backendRequest="10s")
+    )
+
+    with istio_ingress_context(
+        istio_ingress_context.on.update_status(),
+        state=scenario.State(leader=True, relations=[relation]),
+    ) as manager:
+        (http_route,) = manager.charm._build_ingress_snapshot().valid_http_routes
+
+    assert http_route["timeouts"] == {"request": "30s", "backendRequest": "10s"}
+
+
+def test_istio_ingress_route_rate_limit_relation_round_trip(istio_ingress_context):
+    """Test that a listener's rate limit survives the relation data, as published by a requirer."""
+    relation = _istio_ingress_route_relation(
+        listener_fields={"rateLimit": local_lib.ListenerRateLimit(requestsPerSecond=20, burst=40)}
+    )
+
+    with istio_ingress_context(
+        istio_ingress_context.on.update_status(),
+        state=scenario.State(leader=True, relations=[relation]),
+    ) as manager:
+        listeners = manager.charm._build_ingress_snapshot().listeners
+
+    listener = next(listener for listener in listeners if listener["port"] == 8080)
+    assert listener["rate_limit"] == {"requests_per_second": 20, "burst": 40}
+
+
+def test_istio_ingress_route_compression_relation_round_trip(istio_ingress_context):
+    """Test that a listener's compression survives the relation data, as published by a requirer."""
+    relation = _istio_ingress_route_relation(
+        listener_fields={
+            "compression": local_lib.ListenerCompression(
+                algorithms=[local_lib.CompressionAlgorithm.ZSTD], minContentLength=10
+            )
+        }
+    )
+
+    with istio_ingress_context(
+        istio_ingress_context.on.update_status(),
+        state=scenario.State(leader=True, relations=[relation]),
+    ) as manager:
+        listeners = manager.charm._build_ingress_snapshot().listeners
+
+    listener = next(listener for listener in listeners if listener["port"] == 8080)
+    assert listener["compression"] == {
+        "algorithms": ["zstd"],
+        "min_content_length": 10,
+        "content_types": [],
+    }
+
+
+def test_istio_ingress_route_traffic_policy_relation_round_trip(istio_ingress_context):
+    """Test that backend traffic settings survive the relation data, as published by a requirer."""
+    relation = _istio_ingress_route_relation(
+        trafficPolicy=local_lib.BackendTrafficPolicy(maxConnections=10, loadBalancer="RANDOM")
+    )
+
+    with istio_ingress_context(
+        istio_ingress_context.on.update_status(),
+        state=scenario.State(leader=True, relations=[relation]),
+    ) as manager:
+        charm: IstioIngressCharm = manager.charm
+        (http_route,) = charm._build_ingress_snapshot().valid_http_routes
+        (destination_rule,) = charm._construct_destination_rules([http_route], [])
+
+    assert http_route["traffic_policy"] == {"maxConnections": 10, "loadBalancer": "RANDOM"}
+    assert destination_rule.spec["trafficPolicy"] == {
+        "connectionPool": {"tcp": {"maxConnections": 10}},
+        "loadBalancer": {"simple": "RANDOM"},
+    }
+
+
+def test_istio_ingress_route_consistent_hash_relation_round_trip(istio_ingress_context):
+    """Test that session affinity survives the relation data, as published by a requirer."""
+    relation = _istio_ingress_route_relation(
+        trafficPolicy=local_lib.BackendTrafficPolicy(
+            loadBalancer="RANDOM",
+            consistentHash=local_lib.ConsistentHash(
+                httpCookie=local_lib.HashCookie(name="session", ttlSeconds=0)
+            ),
+        )
+    )
+
+    with istio_ingress_context(
+        istio_ingress_context.on.update_status(),
+        state=scenario.State(leader=True, relations=[relation]),
+    ) as manager:
+        charm: IstioIngressCharm = manager.charm
+        (http_route,) = charm._build_ingress_snapshot().valid_http_routes
+        (destination_rule,) = charm._construct_destination_rules([http_route], [])
+
+    assert destination_rule.spec["trafficPolicy"] == {
+        "loadBalancer": {"consistentHash": {"httpCookie": {"name": "session", "ttl": "0s"}}},
+    }
+
+
+def test_reconcile_ingress_resources_packed(istio_ingress_charm, istio_ingress_context):
+    """Test that incremental reconciles rebuild the packed HTTPRoutes of the changed listener."""
+    mock_route_krm = MagicMock()
+    routes = [
+        RouteInfo(
+            service_name=f"remote-app{i:02}",
+            namespace="remote-model",
+            port=1234,
+            strip_prefix=False,
+            prefix=f"/path{i:02}",
+        )
+        for i in range(17)
+    ]
+
+    with patch.object(IstioIngressCharm, "_is_ready"), patch.object(
+        Client, "delete"
+    ) as mock_delete, istio_ingress_context(
+        istio_ingress_context.on.update_status(),
+        state=scenario.State(leader=True, config={"pack-http-routes": True}),
+    ) as manager:
+        charm: IstioIngressCharm = manager.charm
+        charm._get_ingress_route_resource_manager = MagicMock(return_value=mock_route_krm)
+        charm._get_ingress_auth_policy_resource_manager = MagicMock()
+        charm._get_ingress_auth_policy_patch_manager = MagicMock()
+
+        charm._reconcile_ingress_resources(
+            http_routes=create_test_http_routes(routes), grpc_routes=[]
+        )
+        assert len(mock_route_krm.reconcile.call_args[0][0]) == 2
+
+        # Dropping one app shrinks the packed routes back into a single object
+        charm._reconcile_ingress_resources(
+            http_routes=create_test_http_routes(routes[1:]), grpc_routes=[]
+        )
+        patched = mock_route_krm.patch.call_args[0][0]
+        assert [(r.metadata.name, len(r.spec["rules"])) for r in patched] == [
+            (f"{charm.app.name}-httproute-http-80-0", 16)
+        ]
+        deleted = {call.kwargs["name"] for call in mock_delete.call_args_list}
+        assert f"{charm.app.name}-httproute-http-80-1" in deleted
+
+
 @pytest.mark.parametrize(
     "ingress_relations, paths_expected",
     [
@@ -708,7 +1055,7 @@ def test_ingress_e2e(
 
 
 def test_construct_grpc_destination_rules(istio_ingress_charm, istio_ingress_context):
-    """Test that _construct_grpc_destination_rules creates DestinationRules correctly."""
+    """Test that _construct_destination_rules creates DestinationRules for gRPC backends correctly."""
     # Create test gRPC routes with some duplicate backends to test deduplication
     grpc_routes = [
         # Route 1: tester-grpc service on port 9000
@@ -772,7 +1119,7 @@ def test_construct_grpc_destination_rules(istio_ingress_charm, istio_ingress_con
         state=scenario.State(leader=True),
     ) as manager:
         charm: IstioIngressCharm = manager.charm
-        destination_rules = charm._construct_grpc_destination_rules(grpc_routes)
+        destination_rules = charm._construct_destination_rules([], grpc_routes)
 
         # Should create 2 DestinationRules (tester-grpc deduplicated, another-service)
         assert len(destination_rules) == 2
@@ -798,3 +1145,125 @@ def test_construct_grpc_destination_rules(istio_ingress_charm, istio_ingress_con
         assert another_service_dr.metadata.namespace == "other-namespace"
         assert another_service_dr.spec["host"] == "another-service.other-namespace.svc.cluster.local"
         assert another_service_dr.spec["trafficPolicy"]["connectionPool"]["http"]["useClientProtocol"] is True
+
+
+def test_construct_destination_rules_traffic_policy(istio_ingress_charm, istio_ingress_context):
+    """Test that backend traffic settings come from the config, overridden by route hints."""
+    http_routes = create_test_http_routes(
+        [
+            RouteInfo(
+                service_name=f"remote-app{i}",
+                namespace="remote-model",
+                port=1234,
+                strip_prefix=False,
+                prefix=f"/path{i}",
+            )
+            for i in range(2)
+        ]
+    )
+    http_routes[1]["traffic_policy"] = {"maxConnections": 10, "idleTimeoutSeconds": 30}
+
+    with patch.object(IstioIngressCharm, "_is_ready"), istio_ingress_context(
+        istio_ingress_context.on.update_status(),
+        state=scenario.State(
+            leader=True,
+            config={"backend-max-connections": 100, "backend-load-balancer": "LEAST_REQUEST"},
+        ),
+    ) as manager:
+        charm: IstioIngressCharm = manager.charm
+        destination_rules = charm._construct_destination_rules(http_routes, [])
+        gateway_namespace = charm.model.name
+
+    assert [dr.metadata.name for dr in destination_rules] == [
+        "remote-app0-remote-model-dest-rule-istio-ingress-k8s",
+        "remote-app1-remote-model-dest-rule-istio-ingress-k8s",
+    ]
+    # The settings only apply to the gateway's traffic
+    for dr in destination_rules:
+        assert dr.metadata.namespace == gateway_namespace
+        assert dr.spec["exportTo"] == ["."]
+    assert destination_rules[0].spec["trafficPolicy"] == {
+        "connectionPool": {"tcp": {"maxConnections": 100}},
+        "loadBalancer": {"simple": "LEAST_REQUEST"},
+    }
+    assert destination_rules[1].spec["trafficPolicy"] == {
+        "connectionPool": {"tcp": {"maxConnections": 10}, "http": {"idleTimeout": "30s"}},
+        "loadBalancer": {"simple": "LEAST_REQUEST"},
+    }
+
+
+def test_construct_destination_rules_grpc_backend_with_settings(
+    istio_ingress_charm, istio_ingress_context
+):
+    """Test that a gRPC backend with settings keeps its rule and gets one for the gateway."""
+    grpc_routes = [
+        {
+            "name": "tester-grpc-route-grpcroute-http-9000-istio-ingress-k8s",
+            "listener_port": 9000,
+            "listener_protocol": "HTTP",
+            "namespace": "test-namespace",
+            "source_app": "tester-grpc",
+            "source_relation": "istio-ingress-route",
+            "matches": [],
+            "backend_refs": [
+                BackendRef(name="tester-grpc", port=9000, namespace="test-namespace")
+            ],
+            "filters": [],
+            "traffic_policy": {"maxConnections": 10},
+        }
+    ]
+
+    with patch.object(IstioIngressCharm, "_is_ready"), istio_ingress_context(
+        istio_ingress_context.on.update_status(),
+        state=scenario.State(leader=True),
+    ) as manager:
+        charm: IstioIngressCharm = manager.charm
+        destination_rules = charm._construct_destination_rules([], grpc_routes)
+        gateway_namespace = charm.model.name
+
+    grpc_dr, settings_dr = destination_rules
+    assert grpc_dr.metadata.name == "tester-grpc-grpc-dest-rule-istio-ingress-k8s"
+    assert grpc_dr.metadata.namespace == "test-namespace"
+    assert grpc_dr.spec == {
+        "host": "tester-grpc.test-namespace.svc.cluster.local",
+        "trafficPolicy": {"connectionPool": {"http": {"useClientProtocol": True}}},
+    }
+    assert settings_dr.metadata.name == "tester-grpc-test-namespace-dest-rule-istio-ingress-k8s"
+    assert settings_dr.metadata.namespace == gateway_namespace
+    assert settings_dr.spec == {
+        "host": "tester-grpc.test-namespace.svc.cluster.local",
+        "exportTo": ["."],
+        "trafficPolicy": {
+            "connectionPool": {"tcp": {"maxConnections": 10}, "http": {"useClientProtocol": True}}
+        },
+    }
+
+
+def test_construct_destination_rules_skips_plain_http_backends(
+    istio_ingress_charm, istio_ingress_context
+):
+    """Test that HTTP backends get no DestinationRule without traffic settings."""
+    http_routes = create_test_http_routes(
+        [
+            RouteInfo(
+                service_name="remote-app",
+                namespace="remote-model",
+                port=1234,
+                strip_prefix=False,
+                prefix="/path",
+            )
+        ]
+    )
+
+    with patch.object(IstioIngressCharm, "_is_ready"), istio_ingress_context(
+        istio_ingress_context.on.update_status(),
+        state=scenario.State(leader=True, config={"backend-load-balancer": "FASTEST"}),
+    ) as manager:
+        charm: IstioIngressCharm = manager.charm
+        assert charm._construct_destination_rules(http_routes, []) == []
+
+        event = MagicMock()
+        charm._collect_backend_traffic_status(event)
+        status = event.add_status.call_args[0][0]
+        assert isinstance(status, BlockedStatus)
+        assert "backend-load-balancer" in status.message
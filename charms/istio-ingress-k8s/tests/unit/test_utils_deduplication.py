@@ -10,25 +10,34 @@ from canonical_service_mesh.models import (
     HTTPPathMatch,
     HTTPRouteMatch,
 )
-from charmlibs.interfaces.istio_ingress_route import (
+from charms.istio_ingress_k8s.v0.istio_ingress_route import (
     BackendRef as LibBackendRef,
 )
-from charmlibs.interfaces.istio_ingress_route import (
+from charms.istio_ingress_k8s.v0.istio_ingress_route import (
     HTTPPathMatch as LibHTTPPathMatch,
 )
-from charmlibs.interfaces.istio_ingress_route import (
+from charms.istio_ingress_k8s.v0.istio_ingress_route import (
     HTTPRoute as LibHTTPRoute,
 )
-from charmlibs.interfaces.istio_ingress_route import (
+from charms.istio_ingress_k8s.v0.istio_ingress_route import (
     HTTPRouteMatch as LibHTTPRouteMatch,
 )
-from charmlibs.interfaces.istio_ingress_route import (
+from charms.istio_ingress_k8s.v0.istio_ingress_route import (
     IstioIngressRouteConfig,
     Listener,
     ProtocolType,
 )
 
-from utils import clear_conflicting_routes, deduplicate_grpc_routes, deduplicate_http_routes
+from utils import (
+    RouteIndex,
+    clear_conflicting_routes,
+    deduplicate_grpc_routes,
+    deduplicate_http_routes,
+    group_routes_by_source,
+    minimize_not_paths,
+    partition_not_paths,
+    route_group_digest,
+)
 
 
 def test_deduplicate_http_routes_no_conflicts():
@@ -287,3 +296,196 @@ def test_clear_conflicting_routes():
 
     assert len(istio_ingress_route_configs[("app3", "istio-ingress-route")]["config"].http_routes) == 0
     assert len(istio_ingress_route_configs[("app4", "istio-ingress-route")]["config"].http_routes) == 1
+
+
+def _http_route(name, source_app, path, match_type="PathPrefix"):
+    return {
+        "name": name,
+        "listener_port": 80,
+        "listener_protocol": "HTTP",
+        "namespace": "model1",
+        "source_app": source_app,
+        "source_relation": "ingress",
+        "matches": [HTTPRouteMatch(path=HTTPPathMatch(type=match_type, value=path))],
+        "backend_refs": [BackendRef(name=f"{source_app}-svc", port=8080, namespace="model1")],
+        "filters": [],
+    }
+
+
+def test_deduplicate_http_routes_exact_paths():
+    """Test that only identical matches conflict: Exact /api, Exact /api/ and a prefix differ."""
+    routes = [
+        _http_route("r1", "app1", "/api", match_type="Exact"),
+        _http_route("r2", "app2", "/api/", match_type="Exact"),
+        _http_route("r3", "app3", "/api"),
+    ]
+
+    valid_routes, apps_to_clear = deduplicate_http_routes(routes)
+
+    assert apps_to_clear == set()
+    assert valid_routes == routes
+
+    routes.append(_http_route("r4", "app4", "/api/", match_type="Exact"))
+    valid_routes, apps_to_clear = deduplicate_http_routes(routes)
+
+    assert apps_to_clear == {("app2", "ingress"), ("app4", "ingress")}
+    assert [route["name"] for route in valid_routes] == ["r1", "r3"]
+
+
+def test_deduplicate_grpc_routes_method_without_service():
+    """Test that a method matched in any service doesn't collide with a service of that name."""
+
+    def _grpc_route(name, source_app, service, method):
+        return {
+            "name": name,
+            "listener_port": 9090,
+            "listener_protocol": "HTTP",
+            "namespace": "model1",
+            "source_app": source_app,
+            "source_relation": "istio-ingress-route",
+            "matches": [GRPCRouteMatch(method=GRPCMethodMatch(service=service, method=method))],
+            "backend_refs": [BackendRef(name=f"{source_app}-svc", port=9000, namespace="model1")],
+        }
+
+    routes = [
+        _grpc_route("r1", "app1", None, "Method"),
+        _grpc_route("r2", "app2", "Method", None),
+        _grpc_route("r3", "app3", "Method", "Get"),
+    ]
+
+    valid_routes, apps_to_clear = deduplicate_grpc_routes(routes)
+
+    assert apps_to_clear == set()
+    assert valid_routes == routes
+
+    routes.append(_grpc_route("r4", "app4", None, "Method"))
+    valid_routes, apps_to_clear = deduplicate_grpc_routes(routes)
+
+    assert apps_to_clear == {("app1", "istio-ingress-route"), ("app4", "istio-ingress-route")}
+    assert [route["name"] for route in valid_routes] == ["r2", "r3"]
+
+
+def test_group_routes_by_source():
+    """Test grouping normalized routes by the (app, relation) that requested them."""
+    routes = [
+        _http_route("r1", "app1", "/a"),
+        _http_route("r2", "app2", "/b"),
+        _http_route("r3", "app1", "/c"),
+    ]
+
+    groups = group_routes_by_source(routes, [])
+
+    assert set(groups) == {("app1", "ingress"), ("app2", "ingress")}
+    assert [r["name"] for r in groups[("app1", "ingress")][0]] == ["r1", "r3"]
+    assert groups[("app2", "ingress")][1] == []
+
+
+def test_route_group_digest():
+    """Test that the digest ignores route order but changes with any route content."""
+    routes = [_http_route("r1", "app1", "/a"), _http_route("r2", "app1", "/b")]
+
+    assert route_group_digest(routes, []) == route_group_digest(list(reversed(routes)), [])
+    assert route_group_digest(routes, []) != route_group_digest(routes[:1], [])
+    assert route_group_digest(routes, []) != route_group_digest(
+        [routes[0], _http_route("r2", "app1", "/changed")], []
+    )
+
+
+def test_route_index_exact_and_overlapping_prefixes():
+    """Test that the RouteIndex finds exact conflicts and prefixes shadowing other routes."""
+    index = RouteIndex()
+    index.insert((80, "HTTP"), "/api", owner=("app1", "ingress"), prefix=True)
+    index.insert((80, "HTTP"), "/api/", owner=("app2", "ingress"), prefix=True)
+    index.insert((80, "HTTP"), "/api/v1", owner=("app3", "ingress"), prefix=True)
+    index.insert((80, "HTTP"), "/apiv2", owner=("app4", "ingress"), prefix=True)
+    index.insert((443, "HTTPS"), "/api", owner=("app5", "ingress"), prefix=True)
+
+    # A trailing slash is not significant, so /api and /api/ conflict; other listeners don't
+    conflicts = list(index.conflicts())
+    assert len(conflicts) == 1
+    listener, entries = conflicts[0]
+    assert listener == (80, "HTTP")
+    assert {entry["owner"] for entry in entries} == {("app1", "ingress"), ("app2", "ingress")}
+
+    # Prefixes match whole segments: /api shadows /api/v1, but not /apiv2
+    assert {e["owner"] for e in index.shadowing((80, "HTTP"), "/api/v1")} == {
+        ("app1", "ingress"),
+        ("app2", "ingress"),
+    }
+    assert index.shadowing((80, "HTTP"), "/apiv2") == []
+    assert [e["path"] for e in index.shadowed_by((80, "HTTP"), "/api")] == ["/api/v1"]
+    assert len(list(index.overlaps())) == 2
+
+
+def test_route_index_grpc_service_prefix():
+    """Test that a /service/* gRPC route is a prefix over the service's methods, not a conflict."""
+    index = RouteIndex()
+    index.insert((8080, "HTTP"), "/UserService/*", owner=("app1", "istio-ingress-route"))
+    index.insert((8080, "HTTP"), "/UserService/GetUser", owner=("app2", "istio-ingress-route"))
+
+    assert list(index.conflicts()) == []
+    assert [e["path"] for e in index.shadowing((8080, "HTTP"), "/UserService/GetUser")] == [
+        "/UserService/*"
+    ]
+
+
+def test_minimize_not_paths():
+    """Test that notPaths already matched by a wildcard above them are dropped."""
+    paths = ["/a", "/a/*", "/a/b", "/a/b/*", "/c", "/c/*", "/a", "/Svc/Method", "/Svc/*"]
+
+    assert minimize_not_paths(paths) == ["/Svc/*", "/a", "/a/*", "/c", "/c/*"]
+    assert minimize_not_paths(["", "/*", "/x", "/x/*"]) == ["", "/*"]
+
+
+def _matches_any(patterns, path):
+    """Return whether a request path matches any Istio exact or prefix (`<prefix>*`) path pattern."""
+    return any(
+        path.startswith(pattern[:-1]) if pattern.endswith("*") else path == pattern
+        for pattern in patterns
+    )
+
+
+def _requires_auth(operations, path):
+    """Return whether a request path matches any of the (paths, notPaths) operations."""
+    return any(
+        (not paths or _matches_any(paths, path)) and not _matches_any(not_paths, path)
+        for paths, not_paths in operations
+    )
+
+
+def test_partition_not_paths():
+    """Test that long notPaths lists are split into operations scoped by a shared prefix."""
+    # Short lists, and lists that splitting would not shorten, are left alone
+    assert partition_not_paths(["/a", "/a/*"], 1) == [([], ["/a", "/a/*"])]
+    not_paths = ["/a", "/a/*", "/b", "/b/*", "/c", "/c/*"]
+    assert partition_not_paths(not_paths, 2) == [([], not_paths)]
+    not_paths = ["/*", "/a/x", "/a/y", "/a/z"]
+    assert partition_not_paths(not_paths, 2) == [([], not_paths)]
+
+    not_paths = minimize_not_paths(
+        ["/app", "/app/*"]
+        + [f"/svc.A/Method{i}" for i in range(3)]
+        + [f"/svc.B/Method{i}" for i in range(3)]
+        + ["/svc.C/Get"]
+    )
+    assert partition_not_paths(not_paths, 4) == [
+        # The catch-all: requests outside of every group
+        ([], ["/app", "/app/*", "/svc.A/Method*", "/svc.B/Method*", "/svc.C/Get"]),
+        (["/svc.A/Method*"], ["/svc.A/Method0", "/svc.A/Method1", "/svc.A/Method2"]),
+        (["/svc.B/Method*"], ["/svc.B/Method0", "/svc.B/Method1", "/svc.B/Method2"]),
+    ]
+
+
+def test_partition_not_paths_ipa_layout():
+    """Test that the `/<model>-<app>` and `/<model>-<app>/*` pairs of IPA apps are split too."""
+    not_paths = minimize_not_paths(
+        [path for i in range(100) for path in (f"/prod-app{i}", f"/prod-app{i}/*")]
+    )
+
+    operations = partition_not_paths(not_paths, 64)
+
+    assert len(operations) > 1
+    assert max(len(operation_not_paths) for _, operation_not_paths in operations) <= 64
+    # The split policy requires authentication for exactly the same requests
+    for path in ["/prod-app1", "/prod-app1/x", "/prod-app12/x", "/prod-app100", "/prod-app1x", "/other"]:
+        assert _requires_auth(operations, path) == _requires_auth([([], not_paths)], path)
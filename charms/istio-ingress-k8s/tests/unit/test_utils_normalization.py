@@ -3,31 +3,34 @@
 
 """Tests for utils.py normalization functions."""
 
-from charmlibs.interfaces.istio_ingress_route import (
+import pytest
+from charms.istio_ingress_k8s.v0 import istio_ingress_route as local_lib
+from charms.istio_ingress_k8s.v0.istio_ingress_route import (
     BackendRef as LibBackendRef,
 )
-from charmlibs.interfaces.istio_ingress_route import (
+from charms.istio_ingress_k8s.v0.istio_ingress_route import (
     FilterType,
     GRPCMethodMatch,
     IstioIngressRouteConfig,
     Listener,
     ProtocolType,
 )
-from charmlibs.interfaces.istio_ingress_route import (
+from charms.istio_ingress_k8s.v0.istio_ingress_route import (
     GRPCRoute as LibGRPCRoute,
 )
-from charmlibs.interfaces.istio_ingress_route import (
+from charms.istio_ingress_k8s.v0.istio_ingress_route import (
     GRPCRouteMatch as LibGRPCRouteMatch,
 )
-from charmlibs.interfaces.istio_ingress_route import (
+from charms.istio_ingress_k8s.v0.istio_ingress_route import (
     HTTPPathMatch as LibHTTPPathMatch,
 )
-from charmlibs.interfaces.istio_ingress_route import (
+from charms.istio_ingress_k8s.v0.istio_ingress_route import (
     HTTPRoute as LibHTTPRoute,
 )
-from charmlibs.interfaces.istio_ingress_route import (
+from charms.istio_ingress_k8s.v0.istio_ingress_route import (
     HTTPRouteMatch as LibHTTPRouteMatch,
 )
+from pydantic import ValidationError
 
 from utils import (
     deduplicate_listeners,
@@ -38,6 +41,7 @@ from utils import (
     normalize_istio_ingress_route_grpc_routes,
     normalize_istio_ingress_route_http_routes,
     normalize_istio_ingress_route_listeners,
+    route_group_digest,
 )
 
 
@@ -197,6 +201,125 @@ def test_merge_listeners_with_duplicates():
     assert merged[1]["source_app"] == "app1"
 
 
+def test_merge_listeners_keeps_strictest_rate_limit():
+    """Test that merging listeners keeps the strictest rate limit an app requested for them."""
+    listener = {"port": 8080, "gateway_protocol": "HTTP", "tls_secret_name": None}
+    listeners = [
+        {**listener, "source_app": "app1"},
+        {**listener, "source_app": "app1", "rate_limit": {"requests_per_second": 100, "burst": 200}},
+        {**listener, "source_app": "app1", "rate_limit": {"requests_per_second": 50, "burst": 500}},
+        {**listener, "source_app": "app1", "rate_limit": {"requests_per_second": 50, "burst": 50}},
+    ]
+
+    (merged,) = deduplicate_listeners(listeners)
+
+    assert merged["source_app"] == "app1"
+    assert merged["rate_limit"] == {"requests_per_second": 50, "burst": 50}
+    assert "rate_limit" not in listeners[0]
+
+
+@pytest.mark.parametrize("other_app", ["ipa", "app2"])
+def test_merge_listeners_drops_rate_limit_of_shared_listener(other_app):
+    """Test that an app's rate limit is not applied to a listener other apps use too."""
+    listener = {"port": 80, "gateway_protocol": "HTTP", "tls_secret_name": None}
+    listeners = [
+        {**listener, "source_app": other_app},
+        {**listener, "source_app": "app1", "rate_limit": {"requests_per_second": 5, "burst": 5}},
+    ]
+
+    (merged,) = deduplicate_listeners(listeners)
+
+    assert merged["source_app"] == other_app
+    assert not merged.get("rate_limit")
+
+
+@pytest.mark.parametrize("other_app", ["ipa", "app2"])
+def test_merge_listeners_drops_compression_of_shared_listener(other_app):
+    """Test that an app's compression is not applied to a listener other apps use too."""
+    listener = {"port": 80, "gateway_protocol": "HTTP", "tls_secret_name": None}
+    compression = {"algorithms": ["gzip"], "min_content_length": 0, "content_types": []}
+    listeners = [
+        {**listener, "source_app": other_app},
+        {**listener, "source_app": "app1", "compression": compression},
+    ]
+
+    (merged,) = deduplicate_listeners(listeners)
+
+    assert not merged.get("compression")
+
+
+def test_merge_listeners_compression_independent_of_order():
+    """Test that the compression an app requested twice for a listener doesn't depend on order."""
+    listener = {"port": 8080, "gateway_protocol": "HTTP", "tls_secret_name": None}
+    gzip = {"algorithms": ["gzip"], "min_content_length": 0, "content_types": []}
+    zstd = {"algorithms": ["zstd"], "min_content_length": 0, "content_types": []}
+    listeners = [
+        {**listener, "source_app": "app1", "compression": gzip},
+        {**listener, "source_app": "app1", "compression": zstd},
+    ]
+
+    (merged,) = deduplicate_listeners(listeners)
+    (merged_reversed,) = deduplicate_listeners(listeners[::-1])
+
+    assert merged["compression"] == merged_reversed["compression"] == gzip
+
+
+def test_normalize_istio_ingress_route_listener_rate_limit_and_compression():
+    """Test that the rate limit and compression requested for a listener are normalized."""
+    configs = {
+        ("app1", "istio-ingress-route"): {
+            "config": local_lib.IstioIngressRouteConfig(
+                model="model1",
+                listeners=[
+                    local_lib.Listener(
+                        port=8080,
+                        protocol=local_lib.ProtocolType.HTTP,
+                        rateLimit=local_lib.ListenerRateLimit(requestsPerSecond=20),
+                        compression=local_lib.ListenerCompression(
+                            algorithms=[local_lib.CompressionAlgorithm.GZIP]
+                        ),
+                    )
+                ],
+                http_routes=[],
+                grpc_routes=[],
+            )
+        }
+    }
+
+    (listener,) = normalize_istio_ingress_route_listeners(configs, tls_secret_name=None)
+
+    assert listener["rate_limit"] == {"requests_per_second": 20, "burst": 20}
+    assert listener["compression"] == {
+        "algorithms": ["gzip"],
+        "min_content_length": 1024,
+        "content_types": [],
+    }
+
+
+def test_normalize_istio_ingress_route_listener_empty_compression():
+    """Test that an empty list of compression algorithms requests no compression."""
+    configs = {
+        ("app1", "istio-ingress-route"): {
+            "config": local_lib.IstioIngressRouteConfig(
+                model="model1",
+                listeners=[
+                    local_lib.Listener(
+                        port=8080,
+                        protocol=local_lib.ProtocolType.HTTP,
+                        compression=local_lib.ListenerCompression(algorithms=[]),
+                    )
+                ],
+                http_routes=[],
+                grpc_routes=[],
+            )
+        }
+    }
+
+    (listener,) = normalize_istio_ingress_route_listeners(configs, tls_secret_name=None)
+
+    assert listener["compression"] is None
+
+
 def test_normalize_ipa_routes_with_strip_prefix():
     """Test normalizing IPA routes includes URLRewrite filter when strip_prefix is True."""
     ipa_relations = {
@@ -333,6 +456,85 @@ def test_normalize_istio_ingress_route_http_and_grpc_routes():
     assert len(grpc_route["matches"]) == 1
 
 
+def test_normalize_istio_ingress_route_http_route_timeouts():
+    """Test that the timeouts requested by a route are carried to the normalized route."""
+    listener = local_lib.Listener(port=8080, protocol=local_lib.ProtocolType.HTTP)
+
+    def configs(timeouts):
+        return {
+            ("app1", "istio-ingress-route"): {
+                "config": local_lib.IstioIngressRouteConfig(
+                    model="model1",
+                    listeners=[listener],
+                    http_routes=[
+                        local_lib.HTTPRoute(
+                            name="http-route",
+                            listener=listener,
+                            backends=[local_lib.BackendRef(service="http-svc", port=80)],
+                            timeouts=timeouts,
+                        )
+                    ],
+                    grpc_routes=[],
+                )
+            }
+        }
+
+    (route,) = normalize_istio_ingress_route_http_routes(
+        configs(local_lib.HTTPRouteTimeouts(request="30s")), False, "istio-ingress-k8s"
+    )
+    (route_without_timeouts,) = normalize_istio_ingress_route_http_routes(
+        configs(None), False, "istio-ingress-k8s"
+    )
+
+    assert route["timeouts"] == {"request": "30s"}
+    assert route_without_timeouts["timeouts"] is None
+    assert route_group_digest([route], []) != route_group_digest([route_without_timeouts], [])
+
+
+def test_normalize_istio_ingress_route_grpc_route_traffic_policy():
+    """Test that the backend traffic hints of a route are carried to the normalized route."""
+    listener = local_lib.Listener(port=9090, protocol=local_lib.ProtocolType.GRPC)
+    configs = {
+        ("app1", "istio-ingress-route"): {
+            "config": local_lib.IstioIngressRouteConfig(
+                model="model1",
+                listeners=[listener],
+                http_routes=[],
+                grpc_routes=[
+                    local_lib.GRPCRoute(
+                        name="grpc-route",
+                        listener=listener,
+                        backends=[local_lib.BackendRef(service="grpc-svc", port=9000)],
+                        trafficPolicy=local_lib.BackendTrafficPolicy(
+                            http2MaxRequests=500,
+                            loadBalancer=local_lib.LoadBalancerType.LEAST_REQUEST,
+                        ),
+                    )
+                ],
+            )
+        }
+    }
+
+    (route,) = normalize_istio_ingress_route_grpc_routes(configs, False, "istio-ingress-k8s")
+
+    assert route["traffic_policy"] == {"http2MaxRequests": 500, "loadBalancer": "LEAST_REQUEST"}
+
+
+@pytest.mark.parametrize(
+    "timeouts",
+    [
+        {"request": "0s"},
+        {"request": "61m"},
+        {"request": "30"},
+        {"request": "10s", "backendRequest": "1m"},
+    ],
+)
+def test_http_route_timeouts_are_bounded(timeouts):
+    """Test that the library rejects malformed, unbounded or inconsistent timeouts."""
+    with pytest.raises(ValidationError):
+        local_lib.HTTPRouteTimeouts(**timeouts)
+
+
 def test_get_unauthenticated_paths():
     """Test extracting unauthenticated paths from IPA includes wildcard suffixes."""
     application_route_data = {
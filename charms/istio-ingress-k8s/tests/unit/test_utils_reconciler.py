@@ -0,0 +1,62 @@
+# Copyright 2024 Canonical Ltd.
+# See LICENSE file for licensing details.
+
+"""Tests for the ConcurrentReconciler in utils.py."""
+
+import threading
+
+import pytest
+
+from utils import ConcurrentReconciler
+
+
+def test_reconciler_runs_steps_after_their_dependencies():
+    """Test that a step only starts once every step it depends on has finished."""
+    gateway_started = threading.Event()
+    release_gateway = threading.Event()
+    order = []
+
+    def _gateway():
+        gateway_started.set()
+        release_gateway.wait(timeout=5)
+        order.append("gateway")
+        return "ready"
+
+    with ConcurrentReconciler(max_workers=3) as reconciler:
+        reconciler.submit("gateway", _gateway)
+        reconciler.submit("policies", lambda: order.append("policies"))
+        reconciler.submit("routes", lambda: order.append("routes"), after=["gateway"])
+        assert gateway_started.wait(timeout=5)
+        assert reconciler.result("policies") is None
+        # The independent step ran while the gateway was still in progress
+        assert order == ["policies"]
+        release_gateway.set()
+
+    assert order == ["policies", "gateway", "routes"]
+    assert reconciler.result("gateway") == "ready"
+
+
+def test_reconciler_skips_dependents_of_failed_steps_and_raises_first_error():
+    """Test that a failed step skips its dependents and is re-raised on exit."""
+    ran = []
+
+    def _fail():
+        raise ValueError("gateway failed")
+
+    with pytest.raises(ValueError, match="gateway failed"):
+        with ConcurrentReconciler(max_workers=2) as reconciler:
+            reconciler.submit("gateway", _fail)
+            reconciler.submit("policies", lambda: ran.append("policies"))
+            reconciler.submit("routes", lambda: ran.append("routes"), after=["gateway"])
+
+    assert ran == ["policies"]
+    with pytest.raises(RuntimeError, match="gateway failed"):
+        reconciler.result("routes")
+
+
+def test_reconciler_rejects_duplicate_steps():
+    """Test that a step name can only be submitted once."""
+    with ConcurrentReconciler(max_workers=1) as reconciler:
+        reconciler.submit("gateway", lambda: None)
+        with pytest.raises(ValueError):
+            reconciler.submit("gateway", lambda: None)
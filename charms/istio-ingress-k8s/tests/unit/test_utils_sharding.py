@@ -0,0 +1,38 @@
+# Copyright 2024 Canonical Ltd.
+# See LICENSE file for licensing details.
+
+"""Tests for the gateway sharding functions in utils.py."""
+
+from collections import Counter
+
+import pytest
+
+from utils import gateway_shard, jump_consistent_hash
+
+
+def test_jump_consistent_hash_moves_keys_only_to_new_buckets():
+    """Test that growing the number of buckets only moves keys to the new bucket."""
+    keys = range(0, 2**64, 2**52)
+    for buckets in range(1, 8):
+        for key in keys:
+            before = jump_consistent_hash(key, buckets)
+            after = jump_consistent_hash(key, buckets + 1)
+            assert 0 <= before < buckets
+            assert after in (before, buckets)
+
+    with pytest.raises(ValueError):
+        jump_consistent_hash(1, 0)
+
+
+def test_gateway_shard_is_stable_and_balanced():
+    """Test that apps are spread evenly across shards, and always to the same shard."""
+    apps = [f"app{i}" for i in range(3000)]
+    shards = [gateway_shard(app, 3) for app in apps]
+
+    assert shards == [gateway_shard(app, 3) for app in apps]
+    assert all(count > 800 for count in Counter(shards).values())
+    assert {gateway_shard(app, 1) for app in apps} == {0}
+    # Going from 3 to 4 shards moves about a quarter of the apps, all to the new shard
+    moved = [app for app, shard in zip(apps, shards) if gateway_shard(app, 4) != shard]
+    assert {gateway_shard(app, 4) for app in moved} == {3}
+    assert 600 < len(moved) < 900
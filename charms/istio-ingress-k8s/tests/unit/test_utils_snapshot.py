@@ -0,0 +1,146 @@
+# Copyright 2024 Canonical Ltd.
+# See LICENSE file for licensing details.
+
+"""Tests for the IngressSnapshot in utils.py."""
+
+from unittest.mock import patch
+
+from charms.istio_ingress_k8s.v0.istio_ingress_route import (
+    BackendRef as LibBackendRef,
+)
+from charms.istio_ingress_k8s.v0.istio_ingress_route import (
+    HTTPPathMatch as LibHTTPPathMatch,
+)
+from charms.istio_ingress_k8s.v0.istio_ingress_route import (
+    HTTPRoute as LibHTTPRoute,
+)
+from charms.istio_ingress_k8s.v0.istio_ingress_route import (
+    HTTPRouteMatch as LibHTTPRouteMatch,
+)
+from charms.istio_ingress_k8s.v0.istio_ingress_route import (
+    IstioIngressRouteConfig,
+    Listener,
+    ProtocolType,
+)
+
+import utils
+from utils import IngressSnapshot
+
+
+def _ipa_route(prefix, service_name):
+    return {
+        "prefix": prefix,
+        "service_name": service_name,
+        "port": 8080,
+        "namespace": "model1",
+        "strip_prefix": False,
+    }
+
+
+def _istio_config(prefix, service_name):
+    http_listener = Listener(port=80, protocol=ProtocolType.HTTP)
+    return IstioIngressRouteConfig(
+        model="model2",
+        listeners=[http_listener],
+        http_routes=[
+            LibHTTPRoute(
+                name=f"{service_name}-route",
+                listener=http_listener,
+                backends=[LibBackendRef(service=service_name, port=80)],
+                matches=[
+                    LibHTTPRouteMatch(path=LibHTTPPathMatch(type="PathPrefix", value=prefix))
+                ],
+            )
+        ],
+        grpc_routes=[],
+    )
+
+
+def _conflicting_snapshot():
+    application_route_data = {
+        ("app1", "ingress-unauthenticated"): {
+            "handler": None,
+            "routes": [_ipa_route("/api", "svc1")],
+        },
+        ("app2", "ingress"): {
+            "handler": None,
+            "routes": [_ipa_route("/users", "svc2")],
+        },
+    }
+    istio_ingress_route_configs = {
+        ("app3", "istio-ingress-route"): {
+            "handler": None,
+            "config": _istio_config("/api", "svc3"),
+        },
+    }
+    snapshot = IngressSnapshot(
+        application_route_data=application_route_data,
+        istio_ingress_route_configs=istio_ingress_route_configs,
+        tls_secret_name=None,
+        ingress_app_name="istio-ingress-k8s",
+    )
+    return snapshot, application_route_data, istio_ingress_route_configs
+
+
+def test_snapshot_clears_conflicts_on_copies_only():
+    """Test that conflict clearing never mutates the relation data the snapshot was built from."""
+    snapshot, application_route_data, istio_ingress_route_configs = _conflicting_snapshot()
+
+    assert snapshot.apps_to_clear == {
+        ("app1", "ingress-unauthenticated"),
+        ("app3", "istio-ingress-route"),
+    }
+    assert [route["name"] for route in snapshot.valid_http_routes] == [
+        "svc2-httproute-http-80-istio-ingress-k8s"
+    ]
+
+    cleared_ipa = snapshot.cleared_application_route_data
+    cleared_istio = snapshot.cleared_istio_ingress_route_configs
+    assert cleared_ipa[("app1", "ingress-unauthenticated")]["routes"] == []
+    assert len(cleared_ipa[("app2", "ingress")]["routes"]) == 1
+    assert cleared_istio[("app3", "istio-ingress-route")]["config"].http_routes == []
+
+    # The originals are untouched
+    assert len(application_route_data[("app1", "ingress-unauthenticated")]["routes"]) == 1
+    assert len(istio_ingress_route_configs[("app3", "istio-ingress-route")]["config"].http_routes) == 1
+    assert snapshot.application_route_data == application_route_data
+
+    # Unauthenticated paths of conflicting apps are not exposed
+    assert snapshot.unauthenticated_paths == []
+
+
+def test_snapshot_computes_derived_data_once():
+    """Test that normalization and deduplication run once, however often results are read."""
+    snapshot, _, _ = _conflicting_snapshot()
+
+    with patch.object(
+        utils, "deduplicate_http_routes", wraps=utils.deduplicate_http_routes
+    ) as dedup, patch.object(
+        utils, "normalize_ipa_routes", wraps=utils.normalize_ipa_routes
+    ) as normalize:
+        for _ in range(3):
+            assert snapshot.valid_http_routes
+            assert snapshot.apps_to_clear
+            assert snapshot.listeners
+
+    assert dedup.call_count == 1
+    assert normalize.call_count == 1
+
+
+def test_snapshot_tls():
+    """Test that the TLS secret name drives the listeners and routes derived by the snapshot."""
+    snapshot = IngressSnapshot(
+        application_route_data={
+            ("app1", "ingress"): {"handler": None, "routes": [_ipa_route("/app1", "svc1")]},
+        },
+        istio_ingress_route_configs={},
+        tls_secret_name="istio-ingress-k8s-gateway-tls",
+        ingress_app_name="istio-ingress-k8s",
+    )
+
+    assert snapshot.tls_enabled
+    assert {listener["gateway_protocol"] for listener in snapshot.listeners} == {"HTTP", "HTTPS"}
+    assert {route["listener_protocol"] for route in snapshot.valid_http_routes} == {
+        "HTTP",
+        "HTTPS",
+    }
@@ -0,0 +1,71 @@
+# Copyright 2024 Canonical Ltd.
+# See LICENSE file for licensing details.
+
+"""Tests for the backend traffic policy functions in utils.py."""
+
+import pytest
+from charms.istio_ingress_k8s.v0 import istio_ingress_route as local_lib
+from pydantic import ValidationError
+
+from utils import build_traffic_policy
+
+
+def _consistent_hash_setting(**kwargs):
+    """Return the consistentHash setting normalized from a library ConsistentHash."""
+    return local_lib.ConsistentHash(**kwargs).model_dump(mode="json", exclude_none=True)
+
+
+@pytest.mark.parametrize(
+    "consistent_hash, expected",
+    [
+        ({"httpHeaderName": "x-user"}, {"httpHeaderName": "x-user"}),
+        ({"useSourceIp": True}, {"useSourceIp": True}),
+        (
+            {"httpCookie": local_lib.HashCookie(name="session", ttlSeconds=0)},
+            {"httpCookie": {"name": "session", "ttl": "0s"}},
+        ),
+        (
+            {"httpCookie": local_lib.HashCookie(name="session", path="/app")},
+            {"httpCookie": {"name": "session", "path": "/app"}},
+        ),
+    ],
+)
+def test_build_traffic_policy_consistent_hash(consistent_hash, expected):
+    """Test that consistent-hash affinity is rendered as an Istio loadBalancer.consistentHash."""
+    traffic_policy = build_traffic_policy(
+        {
+            "loadBalancer": "LEAST_REQUEST",
+            "consistentHash": _consistent_hash_setting(**consistent_hash),
+        },
+        use_client_protocol=False,
+    )
+
+    # The simple load balancer is replaced, as Istio accepts only one of them
+    assert traffic_policy == {"loadBalancer": {"consistentHash": expected}}
+
+
+def test_build_traffic_policy_grpc_backend():
+    """Test that gRPC backends keep the client protocol alongside their settings."""
+    traffic_policy = build_traffic_policy(
+        {"http2MaxRequests": 100, "consecutive5xxErrors": 5}, use_client_protocol=True
+    )
+
+    assert traffic_policy == {
+        "connectionPool": {"http": {"useClientProtocol": True, "http2MaxRequests": 100}},
+        "outlierDetection": {"consecutive5xxErrors": 5},
+    }
+
+
+@pytest.mark.parametrize(
+    "consistent_hash",
+    [
+        {},
+        {"useSourceIp": False},
+        {"httpHeaderName": "x-user", "useSourceIp": True},
+        {"httpHeaderName": "not a header"},
+    ],
+)
+def test_consistent_hash_needs_a_single_valid_key(consistent_hash):
+    """Test that the library rejects consistent hashes without exactly one valid key."""
+    with pytest.raises(ValidationError):
+        local_lib.ConsistentHash(**consistent_hash)
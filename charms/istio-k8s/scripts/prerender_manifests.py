@@ -0,0 +1,58 @@
+#!/usr/bin/env python3
+# Copyright 2025 Canonical Ltd.
+# See LICENSE file for licensing details.
+
+"""Pre-render the Istio manifests of the charm's default config, at pack time.
+
+The manifests are written with `Istioctl.prerender_manifest`, keyed by a digest of the istioctl
+settings, so that the charm finds them whenever its settings match the default config.  They are
+rendered for a placeholder namespace, replaced by the model name when they are used.  They are
+only valid with the istioctl binary they are rendered with, so this must run with the binary packed
+in the charm.  Run with the charm's src, lib and dependencies in PYTHONPATH.
+"""
+
+import argparse
+import logging
+from pathlib import Path
+
+import yaml
+
+from charm import (
+    CONTROL_PLANE_COMPONENTS,
+    ISTIO_CRDS_COMPONENTS,
+    ISTIOCTL_PROFILE,
+    config_setting_overrides,
+)
+from config import CharmConfig
+from istioctl import Istioctl
+
+CHARMCRAFT_YAML = Path(__file__).parent.parent / "charmcraft.yaml"
+
+
+def default_config() -> dict:
+    """Return the parsed default config of the charm."""
+    options = yaml.safe_load(CHARMCRAFT_YAML.read_text())["config"]["options"]
+    defaults = {name: option["default"] for name, option in options.items()}
+    return CharmConfig(**defaults).dict(by_alias=True)
+
+
+def main():
+    """Pre-render the manifests of the default config."""
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--istioctl", required=True, help="Path to the packed istioctl binary")
+    parser.add_argument("--output", required=True, help="Directory to write the manifests to")
+    args = parser.parse_args()
+
+    ictl = Istioctl(
+        istioctl_path=args.istioctl,
+        profile=ISTIOCTL_PROFILE,
+        setting_overrides=config_setting_overrides(default_config()),
+    )
+    for components in (CONTROL_PLANE_COMPONENTS, ISTIO_CRDS_COMPONENTS):
+        manifest_file = ictl.prerender_manifest(args.output, components=components)
+        logging.info(f"Rendered {components} to {manifest_file}")
+
+
+if __name__ == "__main__":
+    logging.basicConfig(level=logging.INFO)
+    main()
@@ -34,7 +34,7 @@ from charms.prometheus_k8s.v0.prometheus_scrape import MetricsEndpointProvider
 from charms.tempo_coordinator_k8s.v0.tracing import TracingEndpointRequirer
 
 # Ignore pyright errors until https://github.com/gtsystem/lightkube/pull/70 is released
-from lightkube import Client, codecs  # type: ignore
+from lightkube import ApiError, Client, codecs  # type: ignore
 from lightkube.codecs import AnyResource
 from lightkube.generic_resource import create_namespaced_resource
 from lightkube.models.autoscaling_v2 import (
@@ -52,7 +52,7 @@ from lightkube.resources.admissionregistration_v1 import (
 from lightkube.resources.apiextensions_v1 import CustomResourceDefinition
 from lightkube.resources.apps_v1 import DaemonSet, Deployment
 from lightkube.resources.autoscaling_v2 import HorizontalPodAutoscaler
-from lightkube.resources.core_v1 import ConfigMap, Service, ServiceAccount
+from lightkube.resources.core_v1 import ConfigMap, Namespace, Service, ServiceAccount
 from lightkube.resources.policy_v1 import PodDisruptionBudget
 from lightkube.resources.rbac_authorization_v1 import (
     ClusterRole,
@@ -62,6 +62,7 @@ from lightkube.resources.rbac_authorization_v1 import (
 )
 from ops import tracing
 from ops.pebble import ChangeError, Layer
+from pydantic import ValidationError
 
 from config import CharmConfig
 from istioctl import Istioctl, IstioctlError
@@ -97,6 +98,11 @@ GATEWAY_API_CRDS_RESOURCE_TYPES = {
     ValidatingAdmissionPolicy,
     ValidatingAdmissionPolicyBinding,
 }
+ISTIOCTL_PROFILE = "empty"
+# The charm container outlives hooks, so its temporary directory keeps the cache between them
+ISTIOCTL_CACHE_DIR = Path(tempfile.gettempdir()) / "istioctl-manifest-cache"
+# Manifests of the default config, rendered at pack time by scripts/prerender_manifests.py
+PRERENDERED_MANIFESTS_DIR = SOURCE_PATH / "manifests" / "prerendered"
 
 # Rock image settings
 ROCK_REGISTRY = "docker.io/ubuntu"
@@ -112,10 +118,32 @@ RESOURCE_TYPES = {
         "AuthorizationPolicy",
         "authorizationpolicies",
     ),
+    "Telemetry": create_namespaced_resource(
+        "telemetry.istio.io",
+        "v1",
+        "Telemetry",
+        "telemetries",
+    ),
+    "Gateway": create_namespaced_resource(
+        "gateway.networking.k8s.io",
+        "v1",
+        "Gateway",
+        "gateways",
+    ),
 }
 AUTHORIZATION_POLICY_LABEL = "istio-authorization-policy"
 JWKS_CA_CERT_RELATION = "jwks-ca-cert"
 AUTHORIZATION_POLICY_RESOURCE_TYPES = {RESOURCE_TYPES["AuthorizationPolicy"]}
+TELEMETRY_LABEL = "istio-telemetry"
+TELEMETRY_RESOURCE_TYPES = {RESOURCE_TYPES["Telemetry"]}
+# Built-in Istio access log provider, writing to the file set by meshConfig.accessLogFile
+ACCESS_LOG_PROVIDER = "envoy"
+ACCESS_LOG_ERRORS_FILTER = "response.code >= 400"
+HEX_DIGITS = "0123456789abcdef"
+# Label set by Kubernetes on every namespace, used to select namespaces by name
+NAMESPACE_NAME_LABEL = "kubernetes.io/metadata.name"
+# Classes of the Gateways run by Istio: ingress gateways, and the waypoints of the beacons
+ISTIO_GATEWAY_CLASSES = {"istio", "istio-waypoint"}
 
 
 class IstioCoreCharm(ops.CharmBase):
@@ -124,8 +152,11 @@ class IstioCoreCharm(ops.CharmBase):
     def __init__(self, *args):
         super().__init__(*args)
         self._parsed_config = None
+        # Resources are deleted in this order on remove, so Telemetry resources go before the
+        # Istio CRDs that define them
         self._resource_manager_factories = {
             CONTROL_PLANE_LABEL: self._get_control_plane_kubernetes_resource_manager,
+            TELEMETRY_LABEL: self._get_telemetry_resource_manager,
             ISTIO_CRDS_LABEL: self._get_crds_kubernetes_resource_manager,
             GATEWAY_API_CRDS_LABEL: self._get_gateway_apis_kubernetes_resource_manager,
         }
@@ -215,6 +246,9 @@ class IstioCoreCharm(ops.CharmBase):
         # Reconciliation can only be attempted by the leader.
         if not self.unit.is_leader():
             return
+        if self._config_error:
+            LOGGER.error(f"Invalid config, skipping reconciliation: {self._config_error}")
+            return
         # Order here matters, we want to ensure rel data is populated before we reconcile objects/config
         self._publish_ext_authz_provider_names()
         self._publish_istio_metadata()
@@ -222,6 +256,7 @@ class IstioCoreCharm(ops.CharmBase):
         self._reconcile_gateway_api_crds()
         self._reconcile_istio_crds()
         self._reconcile_authorization_policies()
+        self._reconcile_telemetry()
         self._reconcile_control_plane()
         self._set_istio_version()
 
@@ -234,9 +269,26 @@ class IstioCoreCharm(ops.CharmBase):
             event.add_status(ops.ActiveStatus("Standby (non-leader)"))
             return
 
+        if self._config_error:
+            event.add_status(ops.BlockedStatus(f"Invalid config: {self._config_error}"))
+
         for status in self._get_control_plane_statuses():
             event.add_status(status)
 
+        if not self._config_error:
+            try:
+                excluded_namespaces = self._namespaces_excluded_by_discovery_selectors()
+            except Exception as e:
+                LOGGER.error(f"Failed to check the namespaces watched by istiod: {e}")
+                excluded_namespaces = []
+            if excluded_namespaces:
+                event.add_status(
+                    ops.BlockedStatus(
+                        "discovery-selectors exclude the mesh namespaces "
+                        f"{', '.join(excluded_namespaces)}"
+                    )
+                )
+
     def _get_control_plane_statuses(self) -> list:
         """Check control plane components and return list of statuses."""
         statuses = []
@@ -308,6 +360,15 @@ class IstioCoreCharm(ops.CharmBase):
             self._parsed_config = CharmConfig(**config)  # pyright: ignore
         return self._parsed_config.dict(by_alias=True)
 
+    @property
+    def _config_error(self) -> str | None:
+        """Return the names of the invalid config options, or None if the config is valid."""
+        try:
+            self.parsed_config
+        except ValidationError as e:
+            return ", ".join(str(error["loc"][0]) for error in e.errors())
+        return None
+
     @property
     def lightkube_client(self):
         """Returns a lightkube client configured for this charm."""
@@ -342,14 +403,12 @@ class IstioCoreCharm(ops.CharmBase):
             # Only the istiod HPA is overridden for scaling it with the charm.
             # Refer this issue for more details: https://github.com/canonical/istio-k8s-operator/issues/22
             hpa_override = self._construct_hpa(unit_count=unit_count)
-            manifests = ictl.manifest_generate(
+            resources = ictl.manifest_generate_resources(
                 components=CONTROL_PLANE_COMPONENTS,
                 overrides=[
                     hpa_override,
                 ]
             )
-
-            resources = codecs.load_all_yaml(manifests, create_resources_for_crds=True)
             resources = self._patch_pebble_runtime(resources)
             resources = self._add_metrics_labels(resources)
 
@@ -383,8 +442,7 @@ class IstioCoreCharm(ops.CharmBase):
         # istioctl includes a ServiceAccount in the Base manifest that we don't need.  Build the
         # manifests and remove that resource before passing to KubernetesResourceHandler
         ictl = self._get_istioctl()
-        manifests = ictl.manifest_generate(components=ISTIO_CRDS_COMPONENTS)
-        resources = codecs.load_all_yaml(manifests, create_resources_for_crds=True)
+        resources = ictl.manifest_generate_resources(components=ISTIO_CRDS_COMPONENTS)
         if resources[-1].kind == "ServiceAccount":
             resources.pop()
         else:
@@ -457,6 +515,16 @@ class IstioCoreCharm(ops.CharmBase):
             logger=LOGGER,
         )
 
+    def _get_telemetry_resource_manager(self):
+        return KubernetesResourceManager(
+            labels=create_charm_default_labels(
+                self.app.name, self.model.name, scope=TELEMETRY_LABEL
+            ),
+            resource_types=TELEMETRY_RESOURCE_TYPES,  # pyright: ignore
+            lightkube_client=self.lightkube_client,
+            logger=LOGGER,
+        )
+
     def _workload_tracing_provider(self) -> Tuple[List[Any], Dict[str, Any]]:
         """Return a tuple with the tracing provider and global tracing settings as dictionaries."""
         if not self.workload_tracing.is_ready():
@@ -476,7 +544,7 @@ class IstioCoreCharm(ops.CharmBase):
         global_config = {
             "meshConfig.enableTracing": "true",
             "meshConfig.defaultProviders.tracing[0]": "otel-tracing",
-            "meshConfig.defaultConfig.tracing.sampling": 100.0,
+            "meshConfig.defaultConfig.tracing.sampling": self.parsed_config["tracing-sampling-rate"],
         }
         return [provider], global_config
 
@@ -560,49 +628,11 @@ class IstioCoreCharm(ops.CharmBase):
         # Merge global tracing settings (if any).
         setting_overrides.update(global_tracing)
 
-        # Enable Envoy access logs
-        # (see https://istio.io/latest/docs/tasks/observability/logs/access-log/)
-        setting_overrides["meshConfig.accessLogFile"] = "/dev/stdout"
-
-        # Ignore the settings if they are not set or empty
-        if self.parsed_config["platform"]:
-            setting_overrides["values.global.platform"] = self.parsed_config["platform"]
-        if self.parsed_config["cni-bin-dir"]:
-            setting_overrides["values.cni.cniBinDir"] = self.parsed_config["cni-bin-dir"]
-        if self.parsed_config["cni-conf-dir"]:
-            setting_overrides["values.cni.cniConfDir"] = self.parsed_config["cni-conf-dir"]
-
-        # Configure the sidecar injector to exclude outbound traffic to all IP ranges.  This is a
-        # workaround for CNI limitations with init containers
-        # (https://istio.io/latest/docs/setup/additional-setup/cni/#compatibility-with-application-init-containers)
-        # This can be removed if we drop support for sidecars
-        setting_overrides[
-            r"values.sidecarInjectorWebhook.injectedAnnotations.traffic\.sidecar\.istio\.io/excludeOutboundIPRanges"
-        ] = "0.0.0.0/0"
-
-        setting_overrides["values.profile"] = "ambient"
-
-        # Enable CNI iptables reconciliation on startup to ensure pods are properly enrolled
-        # in the ambient mesh after CNI restarts. Without this, corrupted/stale iptables rules
-        # in existing pods won't be fixed, leading to mesh security bypass.
-        # (see https://istio.io/latest/news/releases/1.25.x/announcing-1.25/upgrade-notes/)
-        setting_overrides["values.cni.ambient.reconcileIptablesOnStartup"] = "true"
-
-        if self.parsed_config["auto-allow-waypoint-policy"]:
-            setting_overrides["values.pilot.env.PILOT_AUTO_ALLOW_WAYPOINT_POLICY"] = "true"
-
-        # Use Canonical rock images for Istio components (envoy/proxyv2 stays upstream)
-        setting_overrides["values.pilot.hub"] = ROCK_REGISTRY
-        setting_overrides["values.pilot.image"] = PILOT_IMAGE
-        setting_overrides["values.pilot.tag"] = ISTIO_ROCK_TAG
-        setting_overrides["values.cni.hub"] = ROCK_REGISTRY
-        setting_overrides["values.cni.image"] = CNI_IMAGE
-        setting_overrides["values.cni.tag"] = ISTIO_ROCK_TAG
-        setting_overrides["values.ztunnel.hub"] = ROCK_REGISTRY
-        setting_overrides["values.ztunnel.image"] = ZTUNNEL_IMAGE
-        setting_overrides["values.ztunnel.tag"] = ISTIO_ROCK_TAG
-        # Disable the default distroless variant suffix that istioctl appends to image tags
-        setting_overrides["values.global.variant"] = ""
+        # Settings derived from the charm config only
+        setting_overrides.update(config_setting_overrides(self.parsed_config))
+
+        # Namespaces watched by istiod
+        setting_overrides.update(self._discovery_selectors_config())
 
         overlay_files = []
         ca_bundle = self._get_ca_certificates()
@@ -612,11 +642,68 @@ class IstioCoreCharm(ops.CharmBase):
         return Istioctl(
             istioctl_path="./istioctl",
             namespace=self.model.name,
-            profile="empty",
+            profile=ISTIOCTL_PROFILE,
             setting_overrides=setting_overrides,
             overlay_files=overlay_files,
+            **self._istioctl_cache_args(),
         )
 
+    def _discovery_selectors_config(self) -> Dict[str, Any]:
+        """Return the meshConfig.discoverySelectors settings bounding the namespaces watched by istiod.
+
+        Unless discovery-selectors is set, istiod watches every namespace.  Otherwise, it watches the namespaces matching
+        any of the configured selectors, plus its own namespace.
+        (see https://istio.io/latest/docs/reference/config/istio.mesh.v1alpha1/#MeshConfig-discovery_selectors)
+        """
+        expressions = self.parsed_config["discovery-selectors"]
+        if not expressions:
+            return {}
+
+        selectors = [{"matchExpressions": [expression]} for expression in expressions]
+        selectors.append(
+            {
+                "matchExpressions": [
+                    {"key": NAMESPACE_NAME_LABEL, "operator": "In", "values": [self.model.name]}
+                ]
+            }
+        )
+        return flatten_config(selectors, "meshConfig.discoverySelectors")
+
+    def _namespaces_excluded_by_discovery_selectors(self) -> List[str]:
+        """Return the namespaces running Istio gateways or waypoints that istiod does not watch.
+
+        Those are the namespaces of the ingress charms and the beacons, whose gateways and waypoints istiod ignores if it
+        does not watch them.
+        """
+        expressions = self.parsed_config["discovery-selectors"]
+        if not expressions:
+            return []
+
+        client = self.lightkube_client
+        mesh_namespaces = {
+            gateway.metadata.namespace
+            for gateway in client.list(RESOURCE_TYPES["Gateway"], namespace="*")
+            if gateway.metadata and (gateway.spec or {}).get("gatewayClassName") in ISTIO_GATEWAY_CLASSES
+        }
+        excluded = []
+        for namespace in client.list(Namespace):
+            name = namespace.metadata.name if namespace.metadata else None
+            if name not in mesh_namespaces or name == self.model.name:
+                continue
+            labels = namespace.metadata.labels or {}  # pyright: ignore
+            if not any(_label_expression_matches(expression, labels) for expression in expressions):
+                excluded.append(name)
+        return sorted(excluded)
+
+    def _istioctl_cache_args(self) -> Dict[str, Any]:
+        """Return the Istioctl arguments to reuse manifests, unless disabled by cache-manifests."""
+        if not self.parsed_config["cache-manifests"]:
+            return {}
+        return {
+            "cache_dir": str(ISTIOCTL_CACHE_DIR),
+            "prerendered_dir": str(PRERENDERED_MANIFESTS_DIR),
+        }
+
     @staticmethod
     def _patch_pebble_runtime(resources: List[AnyResource]) -> List[AnyResource]:
         """Patch resources for compatibility with Pebble-based rocks.
@@ -696,6 +783,90 @@ class IstioCoreCharm(ops.CharmBase):
         krm = self._get_authorization_policy_resource_manager()
         krm.reconcile(authorization_policies)  # type: ignore
 
+    def _reconcile_telemetry(self) -> None:
+        """Sync the mesh-wide and the per-namespace Telemetry resources."""
+        telemetries = [self._build_mesh_telemetry(), *self._build_tracing_sampling_telemetries()]
+        krm = self._get_resource_manager(TELEMETRY_LABEL)
+        krm.reconcile(telemetries)  # type: ignore
+
+    def _build_mesh_telemetry(self):
+        """Build the Telemetry resource configuring the proxies of the whole mesh.
+
+        A Telemetry without a selector in the root namespace applies mesh-wide, and Istio only
+        supports one of these, so every mesh-wide telemetry setting goes in this resource.
+        """
+        return RESOURCE_TYPES["Telemetry"](
+            metadata=ObjectMeta(
+                name=f"{self.app.name}-mesh-default",
+                namespace=self.model.name,
+            ),
+            spec={"accessLogging": [self._access_logging_config()]},
+        )
+
+    def _build_tracing_sampling_telemetries(self):
+        """Build a Telemetry resource overriding the tracing sampling rate of each configured namespace.
+
+        The overrides select no provider, so they apply to the default tracing provider of the
+        mesh.  They are only rendered while workload tracing is configured, and for the
+        namespaces that exist; the others are picked up by a later reconcile.
+        """
+        tracing_providers, _ = self._workload_tracing_provider()
+        if not tracing_providers:
+            return []
+
+        telemetries = []
+        for namespace, rate in sorted(self.parsed_config["tracing-sampling-overrides"].items()):
+            if namespace == self.model.name:
+                LOGGER.warning(
+                    f"Ignoring the tracing sampling override of the root namespace {namespace}, "
+                    "use tracing-sampling-rate instead"
+                )
+                continue
+            if not self._namespace_exists(namespace):
+                LOGGER.warning(
+                    f"Skipping the tracing sampling override of namespace {namespace}, "
+                    "which does not exist"
+                )
+                continue
+            telemetries.append(
+                RESOURCE_TYPES["Telemetry"](
+                    metadata=ObjectMeta(
+                        name=f"{self.app.name}-{self.model.name}-tracing-sampling",
+                        namespace=namespace,
+                    ),
+                    spec={"tracing": [{"randomSamplingPercentage": rate}]},
+                )
+            )
+        return telemetries
+
+    def _namespace_exists(self, namespace: str) -> bool:
+        """Return whether a namespace exists in the cluster."""
+        try:
+            self.lightkube_client.get(Namespace, name=namespace)
+        except ApiError as e:
+            if e.status.code == 404:
+                return False
+            raise
+        return True
+
+    def _access_logging_config(self) -> Dict[str, Any]:
+        """Return the Telemetry access logging entry for the configured access-log-mode.
+
+        See `sampled_access_log_filter` for how requests are sampled.
+        """
+        mode = self.parsed_config["access-log-mode"]
+        if mode == "off":
+            return {"disabled": True}
+
+        access_logging: Dict[str, Any] = {"providers": [{"name": ACCESS_LOG_PROVIDER}]}
+        if mode == "errors":
+            access_logging["filter"] = {"expression": ACCESS_LOG_ERRORS_FILTER}
+        elif mode == "sampled":
+            percentage = self.parsed_config["access-log-sampling-percentage"]
+            if expression := sampled_access_log_filter(percentage):
+                access_logging["filter"] = {"expression": expression}
+        return access_logging
+
     def _build_authorization_policies_for_hardened_mode(self):
         """Build required globally managed authorization policies to operate istio in hardened-mode.
 
@@ -727,6 +898,94 @@ class IstioCoreCharm(ops.CharmBase):
         ]
 
 
+def config_setting_overrides(config: Dict[str, Any]) -> Dict[str, Any]:
+    """Return the istioctl setting overrides derived from the parsed charm config alone.
+
+    These are also what the manifests pre-rendered at pack time are generated with, so this must
+    not depend on anything but `config`.
+    """
+    setting_overrides: Dict[str, Any] = {}
+
+    # Enable Envoy access logs
+    # (see https://istio.io/latest/docs/tasks/observability/logs/access-log/)
+    setting_overrides["meshConfig.accessLogFile"] = "/dev/stdout"
+
+    # Ignore the settings if they are not set or empty
+    if config["platform"]:
+        setting_overrides["values.global.platform"] = config["platform"]
+    if config["cni-bin-dir"]:
+        setting_overrides["values.cni.cniBinDir"] = config["cni-bin-dir"]
+    if config["cni-conf-dir"]:
+        setting_overrides["values.cni.cniConfDir"] = config["cni-conf-dir"]
+
+    # Configure the sidecar injector to exclude outbound traffic to all IP ranges.  This is a
+    # workaround for CNI limitations with init containers
+    # (https://istio.io/latest/docs/setup/additional-setup/cni/#compatibility-with-application-init-containers)
+    # This can be removed if we drop support for sidecars
+    setting_overrides[
+        r"values.sidecarInjectorWebhook.injectedAnnotations.traffic\.sidecar\.istio\.io/excludeOutboundIPRanges"
+    ] = "0.0.0.0/0"
+
+    setting_overrides["values.profile"] = "ambient"
+
+    # Enable CNI iptables reconciliation on startup to ensure pods are properly enrolled
+    # in the ambient mesh after CNI restarts. Without this, corrupted/stale iptables rules
+    # in existing pods won't be fixed, leading to mesh security bypass.
+    # (see https://istio.io/latest/news/releases/1.25.x/announcing-1.25/upgrade-notes/)
+    setting_overrides["values.cni.ambient.reconcileIptablesOnStartup"] = "true"
+
+    if config["auto-allow-waypoint-policy"]:
+        setting_overrides["values.pilot.env.PILOT_AUTO_ALLOW_WAYPOINT_POLICY"] = "true"
+
+    setting_overrides.update(_pilot_setting_overrides(config))
+
+    # Use Canonical rock images for Istio components (envoy/proxyv2 stays upstream)
+    setting_overrides["values.pilot.hub"] = ROCK_REGISTRY
+    setting_overrides["values.pilot.image"] = PILOT_IMAGE
+    setting_overrides["values.pilot.tag"] = ISTIO_ROCK_TAG
+    setting_overrides["values.cni.hub"] = ROCK_REGISTRY
+    setting_overrides["values.cni.image"] = CNI_IMAGE
+    setting_overrides["values.cni.tag"] = ISTIO_ROCK_TAG
+    setting_overrides["values.ztunnel.hub"] = ROCK_REGISTRY
+    setting_overrides["values.ztunnel.image"] = ZTUNNEL_IMAGE
+    setting_overrides["values.ztunnel.tag"] = ISTIO_ROCK_TAG
+    # Disable the default distroless variant suffix that istioctl appends to image tags
+    setting_overrides["values.global.variant"] = ""
+
+    return setting_overrides
+
+
+def _pilot_setting_overrides(config: Dict[str, Any]) -> Dict[str, Any]:
+    """Return the istiod tuning settings, only set where the config deviates from the Istio defaults."""
+    setting_overrides: Dict[str, Any] = {}
+
+    # Push debouncing and throttling
+    if config["pilot-debounce-after"]:
+        setting_overrides["values.pilot.env.PILOT_DEBOUNCE_AFTER"] = config["pilot-debounce-after"]
+    if config["pilot-debounce-max"]:
+        setting_overrides["values.pilot.env.PILOT_DEBOUNCE_MAX"] = config["pilot-debounce-max"]
+    if config["pilot-push-throttle"]:
+        setting_overrides["values.pilot.env.PILOT_PUSH_THROTTLE"] = str(config["pilot-push-throttle"])
+    if not config["pilot-enable-eds-debounce"]:
+        setting_overrides["values.pilot.env.PILOT_ENABLE_EDS_DEBOUNCE"] = "false"
+    if config["pilot-filter-gateway-cluster-config"]:
+        setting_overrides["values.pilot.env.PILOT_FILTER_GATEWAY_CLUSTER_CONFIG"] = "true"
+    if config["pilot-enable-quic-listeners"]:
+        setting_overrides["values.pilot.env.PILOT_ENABLE_QUIC_LISTENERS"] = "true"
+
+    # istiod resources
+    for option, resource in (
+        ("pilot-cpu-request", "requests.cpu"),
+        ("pilot-memory-request", "requests.memory"),
+        ("pilot-cpu-limit", "limits.cpu"),
+        ("pilot-memory-limit", "limits.memory"),
+    ):
+        if config[option]:
+            setting_overrides[f"values.pilot.resources.{resource}"] = config[option]
+
+    return setting_overrides
+
+
 def flatten_config(value: Any, prefix: str = "") -> Dict[str, Any]:
     """Recursively flatten a nested dictionary or list into a dictionary of key/value pairs."""
     flat: Dict[str, Any] = {}
@@ -743,6 +1002,46 @@ def flatten_config(value: Any, prefix: str = "") -> Dict[str, Any]:
     return flat
 
 
+def _label_expression_matches(expression: Dict[str, Any], labels: Dict[str, str]) -> bool:
+    """Return whether labels match a label selector expression, as parsed from discovery-selectors."""
+    if expression["key"] not in labels:
+        return False
+    return expression["operator"] == "Exists" or labels[expression["key"]] in expression["values"]
+
+
+def sampled_access_log_filter(percentage: float) -> str | None:
+    """Return the access log filter expression for errors and a percentage of other requests.
+
+    Requests are sampled on the first two hex digits of their x-request-id rather than randomly,
+    so that every proxy on the path of a request consistently logs it or not.  Returns None if
+    every request is logged.
+    """
+    # Request IDs are UUIDs, so their first two hex digits split them in 256 even buckets
+    buckets = round(percentage * 256 / 100)
+    if buckets <= 0:
+        return ACCESS_LOG_ERRORS_FILTER
+    if buckets >= 256:
+        return None
+
+    full_rows, remainder = divmod(buckets, 16)
+    alternatives = []
+    if full_rows:
+        alternatives.append(f"{_hex_digit_class(full_rows)}[0-9a-f]")
+    if remainder:
+        alternatives.append(f"{HEX_DIGITS[full_rows]}{_hex_digit_class(remainder)}")
+    return f"{ACCESS_LOG_ERRORS_FILTER} || request.id.matches('^({'|'.join(alternatives)})')"
+
+
+def _hex_digit_class(count: int) -> str:
+    """Return a regex character class matching the first `count` hex digits."""
+    if count == 1:
+        return "0"
+    ranges = f"0-{HEX_DIGITS[min(count, 10) - 1]}"
+    if count > 10:
+        ranges += f"a-{HEX_DIGITS[count - 1]}"
+    return f"[{ranges}]"
+
+
 def generate_telemetry_labels(app_name: str, model_name: str) -> Dict[str, str]:
     """Generate telemetry labels for the application, ensuring it is always <=63 characters and usually unique.
 
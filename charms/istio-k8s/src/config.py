@@ -1,6 +1,22 @@
 """Configuration parser for the charm."""
 
-from pydantic import BaseModel, Field
+import re
+from typing import Any, Dict, List, Literal
+
+from pydantic import BaseModel, Field, field_validator
+
+# Kubernetes namespace names are RFC 1123 labels
+NAMESPACE_PATTERN = re.compile(r"^[a-z0-9]([-a-z0-9]{0,61}[a-z0-9])?$")
+# Go durations, as read by istiod, e.g. "100ms" or "1m30s", or empty to keep the Istio default
+DURATION_PATTERN = r"^(([0-9]+(\.[0-9]+)?(ns|us|µs|ms|s|m|h))+)?$"
+# Kubernetes resource quantities, e.g. "500m", "2" or "1.5Gi", or empty to keep the Istio default
+RESOURCE_QUANTITY_PATTERN = r"^([0-9]+(\.[0-9]+)?(m|k|M|G|T|Ki|Mi|Gi|Ti)?)?$"
+# Kubernetes label keys (an optional DNS subdomain prefix and a name) and values
+LABEL_KEY_PATTERN = re.compile(
+    r"^([a-z0-9]([-a-z0-9]*[a-z0-9])?(\.[a-z0-9]([-a-z0-9]*[a-z0-9])?)*/)?"
+    r"[A-Za-z0-9]([-A-Za-z0-9_.]{0,61}[A-Za-z0-9])?$"
+)
+LABEL_VALUE_PATTERN = re.compile(r"^([A-Za-z0-9]([-A-Za-z0-9_.]{0,61}[A-Za-z0-9])?)?$")
 
 
 class CharmConfig(BaseModel):
@@ -11,3 +27,64 @@ class CharmConfig(BaseModel):
     cni_conf_dir: str = Field(alias="cni-conf-dir")  # type: ignore
     auto_allow_waypoint_policy: bool = Field(alias="auto-allow-waypoint-policy")  # type: ignore
     hardened_mode: bool = Field(alias="hardened-mode")  # type: ignore
+    cache_manifests: bool = Field(alias="cache-manifests")  # type: ignore
+    access_log_mode: Literal["off", "errors", "sampled", "full"] = Field(alias="access-log-mode")  # type: ignore
+    access_log_sampling_percentage: float = Field(
+        alias="access-log-sampling-percentage", ge=0, le=100
+    )  # type: ignore
+    tracing_sampling_rate: float = Field(alias="tracing-sampling-rate", ge=0, le=100)  # type: ignore
+    tracing_sampling_overrides: Dict[str, float] = Field(alias="tracing-sampling-overrides")  # type: ignore
+    pilot_debounce_after: str = Field(alias="pilot-debounce-after", pattern=DURATION_PATTERN)  # type: ignore
+    pilot_debounce_max: str = Field(alias="pilot-debounce-max", pattern=DURATION_PATTERN)  # type: ignore
+    pilot_push_throttle: int = Field(alias="pilot-push-throttle", ge=0)  # type: ignore
+    pilot_enable_eds_debounce: bool = Field(alias="pilot-enable-eds-debounce")  # type: ignore
+    pilot_filter_gateway_cluster_config: bool = Field(
+        alias="pilot-filter-gateway-cluster-config"
+    )  # type: ignore
+    pilot_enable_quic_listeners: bool = Field(alias="pilot-enable-quic-listeners")  # type: ignore
+    pilot_cpu_request: str = Field(alias="pilot-cpu-request", pattern=RESOURCE_QUANTITY_PATTERN)  # type: ignore
+    pilot_memory_request: str = Field(
+        alias="pilot-memory-request", pattern=RESOURCE_QUANTITY_PATTERN
+    )  # type: ignore
+    pilot_cpu_limit: str = Field(alias="pilot-cpu-limit", pattern=RESOURCE_QUANTITY_PATTERN)  # type: ignore
+    pilot_memory_limit: str = Field(alias="pilot-memory-limit", pattern=RESOURCE_QUANTITY_PATTERN)  # type: ignore
+    discovery_selectors: List[Dict[str, Any]] = Field(alias="discovery-selectors")  # type: ignore
+
+    @field_validator("tracing_sampling_overrides", mode="before")
+    @classmethod
+    def parse_sampling_overrides(cls, value: str) -> Dict[str, float]:
+        """Parse a comma-separated list of namespace=percentage pairs."""
+        overrides = {}
+        for item in filter(None, (item.strip() for item in value.split(","))):
+            namespace, separator, rate = (part.strip() for part in item.partition("="))
+            if not separator or not NAMESPACE_PATTERN.match(namespace):
+                raise ValueError(f"expected namespace=percentage, got {item!r}")
+            try:
+                overrides[namespace] = float(rate)
+            except ValueError:
+                raise ValueError(
+                    f"invalid percentage for namespace {namespace!r}: {rate!r}"
+                ) from None
+            if not 0 <= overrides[namespace] <= 100:
+                raise ValueError(f"percentage for namespace {namespace!r} is not in [0, 100]")
+        return overrides
+
+    @field_validator("discovery_selectors", mode="before")
+    @classmethod
+    def parse_discovery_selectors(cls, value: str) -> List[Dict[str, Any]]:
+        """Parse a comma-separated list of label selectors into Kubernetes label selector expressions.
+
+        Each `key` selects the namespaces with that label, and each `key=value` the namespaces where it has that value.
+        """
+        expressions = []
+        for item in filter(None, (item.strip() for item in value.split(","))):
+            key, separator, label_value = (part.strip() for part in item.partition("="))
+            if not LABEL_KEY_PATTERN.match(key):
+                raise ValueError(f"invalid label key in discovery selector {item!r}")
+            if not separator:
+                expressions.append({"key": key, "operator": "Exists"})
+                continue
+            if not LABEL_VALUE_PATTERN.match(label_value):
+                raise ValueError(f"invalid label value in discovery selector {item!r}")
+            expressions.append({"key": key, "operator": "In", "values": [label_value]})
+        return expressions
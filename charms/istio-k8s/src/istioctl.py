@@ -1,16 +1,34 @@
 """A python API for operating the istioctl binary."""
 
+import hashlib
+import json
 import logging
+import os
 import subprocess
 import sys
+import tempfile
+import time
 from itertools import chain
-from typing import Dict, List, Optional
+from pathlib import Path
+from typing import Any, Dict, List, Optional
 
 import yaml
+from lightkube import codecs
+from lightkube.codecs import AnyResource
 from lightkube.core.resource import Resource
+from lightkube.generic_resource import create_resources_from_crd
 
 logger = logging.getLogger(__name__)
 
+# Number of generated manifests kept in the cache, the least recently used being evicted first
+DEFAULT_CACHE_MAX_ENTRIES = 8
+
+# Namespace the manifests are pre-rendered for, replaced by the actual namespace when they are used
+PRERENDERED_NAMESPACE_PLACEHOLDER = "istio-k8s-prerendered-namespace"
+
+# The libyaml loader parses manifests several times faster, if PyYAML was built with it
+YAML_LOADER = getattr(yaml, "CSafeLoader", yaml.SafeLoader)
+
 
 class IstioctlError(Exception):
     """Error raised when an istioctl command fails."""
@@ -43,6 +61,9 @@ class Istioctl:
         profile: Optional[str] = "empty",
         setting_overrides: Optional[Dict[str, str]] = None,
         overlay_files: Optional[List[str]] = None,
+        cache_dir: Optional[str] = None,
+        cache_max_entries: int = DEFAULT_CACHE_MAX_ENTRIES,
+        prerendered_dir: Optional[str] = None,
     ):
         """Python API for operating the istioctl binary.
 
@@ -57,18 +78,32 @@ class Istioctl:
                                                 options
             overlay_files (optional, list): A list of file paths to IstioOperator overlay YAML files,
                                             passed to istioctl as `-f` options
+            cache_dir (optional, str): A directory in which to cache the output of
+                                       `manifest_generate`, keyed by the istioctl binary and all of
+                                       its inputs.  If undefined, istioctl is always run.
+            cache_max_entries (int): The number of manifests kept in `cache_dir`
+            prerendered_dir (optional, str): A directory of manifests written by
+                                             `prerender_manifest` with this same istioctl binary,
+                                             looked up before `cache_dir`
         """
         self._istioctl_path = istioctl_path
         self._namespace = namespace
         self._profile = profile
         self._setting_overrides = setting_overrides if setting_overrides is not None else {}
         self._overlay_files = overlay_files or []
+        self._cache_dir = Path(cache_dir) if cache_dir is not None else None
+        self._cache_max_entries = cache_max_entries
+        self._prerendered_dir = Path(prerendered_dir) if prerendered_dir is not None else None
 
     @property
     def _args(self) -> List[str]:
+        return self._args_for_namespace(self._namespace)
+
+    def _args_for_namespace(self, namespace: Optional[str]) -> List[str]:
+        """Return the arguments shared by all commands, installing Istio into `namespace`."""
         settings = {
             "profile": self._profile,
-            "values.global.istioNamespace": self._namespace,
+            "values.global.istioNamespace": namespace,
         }
         settings.update(self._setting_overrides)
         args = settings_dict_to_args(settings)
@@ -101,20 +136,101 @@ class Istioctl:
         Returns:
             (str) a YAML string of the Kubernetes manifest for Istio
         """
-        components = components if components is not None else []
-        # Format the requested components into istioctl args
-        components_args = chain.from_iterable(
-            ("--set", f"components.{component}.enabled=true") for component in components
-        )
-        args = ["manifest", "generate", *self._args, *components_args]
-        manifest_yaml = self._run(*args)
+        manifest_yaml = self._manifest_generate_yaml(components)
 
         # Apply overrides if provided
         if overrides:
-            manifest_yaml = _apply_manifest_overrides(manifest_yaml, overrides)
+            documents = load_manifest(manifest_yaml)
+            _apply_manifest_overrides(documents, overrides)
+            manifest_yaml = yaml.dump_all(documents, default_flow_style=False)
 
         return manifest_yaml
 
+    def manifest_generate_resources(
+        self, components: Optional[List[str]] = None, overrides: Optional[List[Resource]] = None
+    ) -> List[AnyResource]:
+        """Generate Istio's manifests as lightkube resources.
+
+        This is equivalent to loading the YAML returned by `manifest_generate` with
+        `codecs.load_all_yaml(..., create_resources_for_crds=True)`, but parses the manifest only
+        once and never serializes it back to YAML.
+
+        Args:
+            components: See `manifest_generate`
+            overrides: See `manifest_generate`
+
+        Returns:
+            (list) the lightkube resources of the Kubernetes manifest for Istio
+        """
+        documents = load_manifest(self._manifest_generate_yaml(components))
+        if overrides:
+            _apply_manifest_overrides(documents, overrides)
+        return manifest_to_resources(documents)
+
+    def prerender_manifest(self, output_dir: str, components: Optional[List[str]] = None) -> Path:
+        """Generate Istio's manifest into a directory usable as another instance's `prerendered_dir`.
+
+        The manifest is stored under a digest of the arguments and overlay files, but not of the
+        istioctl binary: it is only valid with the same binary, such as the one it is packed with.
+        It is rendered for a placeholder namespace, whatever the namespace of this instance, so
+        that it can be used in any namespace.
+
+        Args:
+            output_dir: The directory to write the manifest to
+            components: See `manifest_generate`
+
+        Returns:
+            (Path) the path of the written manifest
+        """
+        args = self._manifest_generate_args(components, PRERENDERED_NAMESPACE_PLACEHOLDER)
+        settings_key = self._settings_key(args)
+        if settings_key is None:
+            raise IstioctlError("Failed to pre-render the manifest - overlay files not readable")
+        manifest_file = Path(output_dir) / f"{settings_key}.yaml"
+        manifest_file.parent.mkdir(parents=True, exist_ok=True)
+        manifest_file.write_text(self._run(*args))
+        return manifest_file
+
+    def _manifest_generate_yaml(self, components: Optional[List[str]]) -> str:
+        """Return the output of `istioctl manifest generate` for the given components.
+
+        The output is first looked up in the pre-rendered manifests, then in the cache.
+        """
+        if (output := self._prerendered_manifest(components)) is not None:
+            return output
+        return self._run_cached(*self._manifest_generate_args(components))
+
+    def _prerendered_manifest(self, components: Optional[List[str]]) -> Optional[str]:
+        """Return the pre-rendered manifest of the given components in our namespace, if any."""
+        if self._prerendered_dir is None or self._namespace is None:
+            return None
+        args = self._manifest_generate_args(components, PRERENDERED_NAMESPACE_PLACEHOLDER)
+        if (settings_key := self._settings_key(args)) is None:
+            return None
+        try:
+            output = (self._prerendered_dir / f"{settings_key}.yaml").read_text()
+        except OSError:
+            return None
+        logger.debug(f"Using the pre-rendered output of istioctl {' '.join(args[:2])}")
+        return output.replace(PRERENDERED_NAMESPACE_PLACEHOLDER, self._namespace)
+
+    def _manifest_generate_args(
+        self, components: Optional[List[str]], namespace: Optional[str] = None
+    ) -> List[str]:
+        """Return the `istioctl manifest generate` arguments for the given components.
+
+        Args:
+            components: See `manifest_generate`
+            namespace: The namespace to install Istio into, if not that of this instance
+        """
+        components = components if components is not None else []
+        # Format the requested components into istioctl args
+        components_args = chain.from_iterable(
+            ("--set", f"components.{component}.enabled=true") for component in components
+        )
+        args = self._args_for_namespace(namespace) if namespace is not None else self._args
+        return ["manifest", "generate", *args, *components_args]
+
     def precheck(self):
         """Execute `istioctl x precheck` to validate whether the environment can be updated.
 
@@ -146,6 +262,79 @@ class Istioctl:
 
         return output.decode(sys.stdout.encoding)
 
+    def _run_cached(self, *args) -> str:
+        """Run an istioctl command with the given arguments, reusing its cached output if any.
+
+        The output is cached under a digest of the istioctl binary, the arguments and the content
+        of the overlay files, so any change to those runs istioctl again.  The cache is best
+        effort: failing to read or write it only costs running istioctl.
+        """
+        if self._cache_dir is None or (settings_key := self._settings_key(args)) is None:
+            return self._run(*args)
+        if (key := self._cache_key(settings_key)) is None:
+            return self._run(*args)
+
+        cache_file = self._cache_dir / f"{key}.yaml"
+        try:
+            output = cache_file.read_text()
+            _mark_used(cache_file)
+            logger.debug(f"Using the cached output of istioctl {' '.join(args[:2])}")
+            return output
+        except OSError:
+            pass
+
+        output = self._run(*args)
+        try:
+            self._cache_store(cache_file, output)
+        except OSError as e:
+            logger.warning(f"Failed to cache the output of istioctl: {e}")
+        return output
+
+    def _settings_key(self, args) -> Optional[str]:
+        """Return a digest of the inputs of an istioctl command, or None if they cannot be read."""
+        try:
+            overlays = [Path(f).read_text() for f in self._overlay_files]
+        except OSError:
+            return None
+        payload = {"args": list(args), "overlays": overlays}
+        return hashlib.sha256(json.dumps(payload, sort_keys=True).encode()).hexdigest()
+
+    def _cache_key(self, settings_key: str) -> Optional[str]:
+        """Return the cache key of an istioctl command, or None if it cannot be cached."""
+        try:
+            # The binary is identified by its stat rather than its content, to avoid reading it
+            # on every call.  It is replaced, and so changes, whenever the charm is upgraded.
+            binary = os.stat(self._istioctl_path)  # pyright: ignore
+        except OSError:
+            return None
+        payload = {
+            "istioctl": [
+                os.path.realpath(self._istioctl_path),  # pyright: ignore
+                binary.st_size,
+                binary.st_mtime_ns,
+            ],
+            "settings": settings_key,
+        }
+        return hashlib.sha256(json.dumps(payload, sort_keys=True).encode()).hexdigest()
+
+    def _cache_store(self, cache_file: Path, output: str):
+        """Atomically write an entry to the cache, then evict the least recently used ones."""
+        cache_file.parent.mkdir(parents=True, exist_ok=True)
+        with tempfile.NamedTemporaryFile(
+            "w", dir=cache_file.parent, suffix=".tmp", delete=False
+        ) as f:
+            f.write(output)
+        os.replace(f.name, cache_file)
+        _mark_used(cache_file)
+
+        entries = sorted(
+            cache_file.parent.glob("*.yaml"),
+            key=lambda entry: entry.stat().st_mtime_ns,
+            reverse=True,
+        )
+        for entry in entries[self._cache_max_entries:]:
+            entry.unlink(missing_ok=True)
+
     def uninstall(self):
         """Uninstall Istio using istioctl.
 
@@ -235,22 +424,57 @@ def get_control_plane_version(version_dict: dict) -> str:
     return version
 
 
-def _apply_manifest_overrides(manifest_yaml: str, overrides: List[Resource]) -> str:
-    """Apply lightkube resource overrides to specific resources in a Kubernetes manifest.
+def _mark_used(cache_file: Path) -> None:
+    """Mark a cache entry as the most recently used one, for the eviction.
 
-    Args:
-        manifest_yaml: The YAML string containing Kubernetes manifests
-        overrides: List of lightkube Resource objects to override matching resources
+    The time is set explicitly as file timestamps otherwise come from a coarse clock, which can
+    give the same time to entries used in quick succession.
+    """
+    now = time.time_ns()
+    os.utime(cache_file, ns=(now, now))
 
-    Returns:
-        The modified YAML string with overrides applied
+
+def load_manifest(manifest_yaml: str) -> List[Dict[str, Any]]:
+    """Parse a multi-document Kubernetes manifest into a list of resource dicts.
+
+    Empty documents are skipped and the items of `*List` resources are flattened, as done by
+    `codecs.load_all_yaml`.
     """
-    documents = list(yaml.safe_load_all(manifest_yaml))
+    return _flatten_documents(yaml.load_all(manifest_yaml, Loader=YAML_LOADER))
 
+
+def _flatten_documents(documents) -> List[Dict[str, Any]]:
+    """Return the non-empty documents, replacing `*List` resources with their items."""
+    flattened = []
     for doc in documents:
         if doc is None:
             continue
+        if doc.get("kind", "").endswith("List"):
+            flattened.extend(_flatten_documents(doc.get("items") or []))
+        else:
+            flattened.append(doc)
+    return flattened
+
+
+def manifest_to_resources(documents: List[Dict[str, Any]]) -> List[AnyResource]:
+    """Build lightkube resources from resource dicts, creating generic resources for any CRD."""
+    resources = []
+    for doc in documents:
+        resource = codecs.from_dict(doc)
+        resources.append(resource)
+        if resource.kind == "CustomResourceDefinition":
+            create_resources_from_crd(resource)  # pyright: ignore
+    return resources
+
 
+def _apply_manifest_overrides(documents: List[Dict[str, Any]], overrides: List[Resource]) -> None:
+    """Apply lightkube resource overrides in place to matching resources of a Kubernetes manifest.
+
+    Args:
+        documents: The resource dicts of the manifest
+        overrides: List of lightkube Resource objects to override matching resources
+    """
+    for doc in documents:
         # Check if this document matches any override resource
         for override in overrides:
             if _is_same_resource(doc, override):
@@ -258,8 +482,6 @@ def _apply_manifest_overrides(manifest_yaml: str, overrides: List[Resource]) ->
                 _deep_merge_dict(doc, override_dict)
                 break
 
-    return yaml.dump_all(documents, default_flow_style=False)
-
 
 def _is_same_resource(manifest_doc: dict, override_resource: Resource) -> bool:
     """Check if a manifest document matches an override resource.
@@ -19,7 +19,8 @@ def istio_core_charm():
                 with patch.object(IstioCoreCharm, "_reconcile_gateway_api_crds"):
                     with patch.object(IstioCoreCharm, "_setup_proxy_pebble_service"):
                         with patch.object(IstioCoreCharm, "_set_istio_version"):
-                            yield IstioCoreCharm
+                            with patch.object(IstioCoreCharm, "_reconcile_telemetry"):
+                                yield IstioCoreCharm
 
 
 @pytest.fixture()
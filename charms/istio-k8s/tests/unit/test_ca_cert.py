@@ -14,6 +14,25 @@ from scenario import Relation, State
 
 from charm import IstioCoreCharm
 
+PARSED_CONFIG = {
+    "platform": "microk8s",
+    "cni-bin-dir": "",
+    "cni-conf-dir": "",
+    "auto-allow-waypoint-policy": True,
+    "cache-manifests": False,
+    "pilot-debounce-after": "",
+    "pilot-debounce-max": "",
+    "pilot-push-throttle": 0,
+    "pilot-enable-eds-debounce": True,
+    "pilot-filter-gateway-cluster-config": False,
+    "pilot-enable-quic-listeners": False,
+    "pilot-cpu-request": "",
+    "pilot-memory-request": "",
+    "pilot-cpu-limit": "",
+    "pilot-memory-limit": "",
+    "discovery-selectors": [],
+}
+
 SAMPLE_CA_CERT_1 = """-----BEGIN CERTIFICATE-----
 MIIBdTCCARqgAwIBAgIRAMPx/GDYAt1V3FdGMOjANOYwCgYIKoZIzj0EAwIwHDEa
 MBgGA1UEAxMRdGVzdC1jYS1jZXJ0LW9uZTAeFw0yNDA1MDEwMDAwMDBaFw0yNTA1
@@ -100,12 +119,9 @@ def test_get_istioctl_without_ca(istio_core_context):
     state = State(relations=[], leader=True)
     with istio_core_context(istio_core_context.on.update_status(), state) as mgr:
         charm: IstioCoreCharm = mgr.charm
-        with patch.object(type(charm), "parsed_config", new_callable=lambda: property(lambda self: {
-            "platform": "microk8s",
-            "cni-bin-dir": "",
-            "cni-conf-dir": "",
-            "auto-allow-waypoint-policy": True,
-        })):
+        with patch.object(
+            type(charm), "parsed_config", new_callable=lambda: property(lambda self: PARSED_CONFIG)
+        ):
             ictl = charm._get_istioctl()
             # No -f flags should be present in args
             assert "-f" not in ictl._args
@@ -116,12 +132,9 @@ def test_get_istioctl_with_ca(istio_core_context, jwks_ca_cert_relation_single):
     state = State(relations=[jwks_ca_cert_relation_single], leader=True)
     with istio_core_context(istio_core_context.on.update_status(), state) as mgr:
         charm: IstioCoreCharm = mgr.charm
-        with patch.object(type(charm), "parsed_config", new_callable=lambda: property(lambda self: {
-            "platform": "microk8s",
-            "cni-bin-dir": "",
-            "cni-conf-dir": "",
-            "auto-allow-waypoint-policy": True,
-        })):
+        with patch.object(
+            type(charm), "parsed_config", new_callable=lambda: property(lambda self: PARSED_CONFIG)
+        ):
             ictl = charm._get_istioctl()
             args = ictl._args
             assert "-f" in args
@@ -2,10 +2,172 @@
 # Copyright 2024 Canonical Ltd.
 # See LICENSE file for licensing details.
 
-from scenario import State
+from unittest.mock import MagicMock, PropertyMock, patch
+
+import ops
+import pytest
+from lightkube.models.meta_v1 import ObjectMeta
+from lightkube.resources.core_v1 import Namespace
+from scenario import Model, State
+
+from charm import RESOURCE_TYPES, config_setting_overrides
 
 
 def test_start_charm_active(istio_core_context):
     state = State()
     out = istio_core_context.run(istio_core_context.on.config_changed(), state)
     assert out.unit_status.name == "active"
+
+
+def test_pilot_tuning_config(istio_core_context):
+    """The istiod tuning config is mapped onto the pilot env and resources settings."""
+    config = {
+        "pilot-debounce-after": "500ms",
+        "pilot-debounce-max": "1m30s",
+        "pilot-push-throttle": 20,
+        "pilot-enable-eds-debounce": False,
+        "pilot-filter-gateway-cluster-config": True,
+        "pilot-cpu-request": "500m",
+        "pilot-memory-limit": "4Gi",
+    }
+    with istio_core_context(
+        istio_core_context.on.update_status(), State(config=config)
+    ) as mgr:
+        settings = config_setting_overrides(mgr.charm.parsed_config)
+
+    pilot_settings = {
+        key: value
+        for key, value in settings.items()
+        if key.startswith(("values.pilot.env.", "values.pilot.resources."))
+    }
+    assert pilot_settings == {
+        "values.pilot.env.PILOT_AUTO_ALLOW_WAYPOINT_POLICY": "true",
+        "values.pilot.env.PILOT_DEBOUNCE_AFTER": "500ms",
+        "values.pilot.env.PILOT_DEBOUNCE_MAX": "1m30s",
+        "values.pilot.env.PILOT_PUSH_THROTTLE": "20",
+        "values.pilot.env.PILOT_ENABLE_EDS_DEBOUNCE": "false",
+        "values.pilot.env.PILOT_FILTER_GATEWAY_CLUSTER_CONFIG": "true",
+        "values.pilot.resources.requests.cpu": "500m",
+        "values.pilot.resources.limits.memory": "4Gi",
+    }
+
+
+def test_pilot_tuning_default_config(istio_core_context):
+    """The default config leaves every istiod tuning setting to the Istio defaults."""
+    with istio_core_context(istio_core_context.on.update_status(), State()) as mgr:
+        settings = config_setting_overrides(mgr.charm.parsed_config)
+
+    assert not [key for key in settings if key.startswith("values.pilot.resources.")]
+    assert [key for key in settings if key.startswith("values.pilot.env.")] == [
+        "values.pilot.env.PILOT_AUTO_ALLOW_WAYPOINT_POLICY"
+    ]
+
+
+@pytest.mark.parametrize(
+    "config",
+    [
+        {"pilot-debounce-after": "100"},
+        {"pilot-debounce-max": "ten seconds"},
+        {"pilot-push-throttle": -1},
+        {"pilot-cpu-request": "2 cores"},
+        {"pilot-memory-limit": "4GB"},
+    ],
+)
+def test_invalid_pilot_tuning_config_blocks(istio_core_context, config):
+    """An invalid istiod tuning config sets a blocked status naming the faulty option."""
+    state = istio_core_context.run(
+        istio_core_context.on.config_changed(), State(leader=True, config=config)
+    )
+
+    assert state.unit_status == ops.BlockedStatus(f"Invalid config: {next(iter(config))}")
+
+
+def test_discovery_selectors_default_config(istio_core_context):
+    """By default, istiod watches every namespace."""
+    with istio_core_context(istio_core_context.on.update_status(), State()) as mgr:
+        assert mgr.charm._discovery_selectors_config() == {}
+
+
+def test_discovery_selectors_config(istio_core_context):
+    """The selectors are rendered along with one selecting the root namespace."""
+    state = State(
+        config={"discovery-selectors": "istio.io/dataplane-mode, team=payments"},
+        model=Model(name="istio-system"),
+    )
+    with istio_core_context(istio_core_context.on.update_status(), state) as mgr:
+        settings = mgr.charm._discovery_selectors_config()
+
+    prefix = "meshConfig.discoverySelectors"
+    assert settings == {
+        f"{prefix}[0].matchExpressions[0].key": "istio.io/dataplane-mode",
+        f"{prefix}[0].matchExpressions[0].operator": "Exists",
+        f"{prefix}[1].matchExpressions[0].key": "team",
+        f"{prefix}[1].matchExpressions[0].operator": "In",
+        f"{prefix}[1].matchExpressions[0].values[0]": "payments",
+        f"{prefix}[2].matchExpressions[0].key": "kubernetes.io/metadata.name",
+        f"{prefix}[2].matchExpressions[0].operator": "In",
+        f"{prefix}[2].matchExpressions[0].values[0]": "istio-system",
+    }
+
+
+def _gateway(namespace, gateway_class):
+    return RESOURCE_TYPES["Gateway"](
+        metadata=ObjectMeta(name="gateway", namespace=namespace),
+        spec={"gatewayClassName": gateway_class},
+    )
+
+
+def _namespace(name, labels=None):
+    return Namespace(metadata=ObjectMeta(name=name, labels=labels))
+
+
+def test_discovery_selectors_excluding_mesh_namespaces_block(istio_core_context):
+    """Namespaces with Istio gateways or waypoints that are not selected set a blocked status."""
+    client = MagicMock()
+    client.list.side_effect = lambda resource, **_: {
+        RESOURCE_TYPES["Gateway"]: [
+            _gateway("ingress", "istio"),
+            _gateway("beacon", "istio-waypoint"),
+            _gateway("labelled-beacon", "istio-waypoint"),
+            _gateway("istio-system", "istio"),
+            _gateway("other", "envoy"),
+        ],
+        Namespace: [
+            _namespace("ingress"),
+            _namespace("beacon", {"team": "ops"}),
+            _namespace("labelled-beacon", {"istio.io/dataplane-mode": "ambient"}),
+            _namespace("istio-system"),
+            _namespace("other"),
+        ],
+    }[resource]
+    state = State(
+        leader=True,
+        config={"discovery-selectors": "istio.io/dataplane-mode,team=payments"},
+        model=Model(name="istio-system"),
+    )
+
+    with istio_core_context(istio_core_context.on.update_status(), state) as mgr:
+        charm = mgr.charm
+        with patch.object(type(charm), "lightkube_client", new_callable=PropertyMock) as mock:
+            mock.return_value = client
+            assert charm._namespaces_excluded_by_discovery_selectors() == ["beacon", "ingress"]
+            with patch.object(type(charm), "_get_control_plane_statuses", return_value=[]):
+                state_out = mgr.run()
+
+    assert state_out.unit_status == ops.BlockedStatus(
+        "discovery-selectors exclude the mesh namespaces beacon, ingress"
+    )
+
+
+@pytest.mark.parametrize(
+    "selectors",
+    ["istio.io/", "team=pay ments", "=payments", "Istio.io/dataplane-mode"],
+)
+def test_invalid_discovery_selectors_block(istio_core_context, selectors):
+    """Discovery selectors that are not valid label selectors set a blocked status."""
+    state = istio_core_context.run(
+        istio_core_context.on.config_changed(),
+        State(leader=True, config={"discovery-selectors": selectors}),
+    )
+
+    assert state.unit_status == ops.BlockedStatus("Invalid config: discovery-selectors")
@@ -73,6 +73,16 @@ def test_tracing_config(istio_core_context, workload_tracing):
         assert merged == expected
 
 
+def test_tracing_sampling_rate_config(istio_core_context, workload_tracing):
+    """Test that the tracing-sampling-rate config sets the mesh-wide tracing sampling."""
+    state = State(relations=[workload_tracing], config={"tracing-sampling-rate": 2.5})
+    with istio_core_context(istio_core_context.on.update_status(), state) as mgr:
+        charm: IstioCoreCharm = mgr.charm
+        mgr.run()
+        _, global_tracing = charm._workload_tracing_provider()
+        assert global_tracing["meshConfig.defaultConfig.tracing.sampling"] == 2.5
+
+
 def test_external_authorizer_config(istio_core_context, ingress_config):
     """Test that the external authorizer provider configuration is generated and flattened correctly."""
     state = State(relations=[ingress_config], leader=True)
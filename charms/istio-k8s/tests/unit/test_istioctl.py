@@ -7,6 +7,7 @@ from unittest.mock import MagicMock
 import pytest
 import yaml
 from jinja2 import Environment, FileSystemLoader
+from lightkube import codecs
 from lightkube.models.autoscaling_v2 import (
     CrossVersionObjectReference,
     HorizontalPodAutoscalerSpec,
@@ -15,10 +16,13 @@ from lightkube.models.meta_v1 import ObjectMeta
 from lightkube.resources.autoscaling_v2 import HorizontalPodAutoscaler
 
 from istioctl import (
+    PRERENDERED_NAMESPACE_PLACEHOLDER,
     Istioctl,
     IstioctlError,
     get_client_version,
     get_control_plane_version,
+    load_manifest,
+    manifest_to_resources,
     settings_dict_to_args,
 )
 
@@ -234,6 +238,73 @@ def mocked_lightkube_client(mocker):
     yield mocked_lightkube_client
 
 
+def test_istioctl_manifest_resources(mocked_check_output_manifest):
+    """Test that manifest_generate_resources matches loading the YAML of manifest_generate."""
+    ictl = Istioctl(istioctl_path=ISTIOCTL_BINARY, namespace=NAMESPACE, profile=PROFILE)
+    hpa_override = HorizontalPodAutoscaler(
+        metadata=ObjectMeta(name="istiod", namespace=NAMESPACE),
+        spec=HorizontalPodAutoscalerSpec(
+            scaleTargetRef=CrossVersionObjectReference(
+                apiVersion="apps/v1", kind="Deployment", name="istiod"
+            ),
+            minReplicas=3,
+            maxReplicas=3,
+        ),
+    )
+
+    resources = ictl.manifest_generate_resources(overrides=[hpa_override])
+    expected = codecs.load_all_yaml(ictl.manifest_generate(overrides=[hpa_override]))
+
+    assert [r.to_dict() for r in resources] == [r.to_dict() for r in expected]
+    assert resources[0].spec.minReplicas == 3
+
+
+def test_load_manifest_flattens_lists():
+    """Test that empty documents are skipped and List resources are flattened."""
+    manifest = """---
+apiVersion: v1
+kind: ConfigMapList
+items:
+- apiVersion: v1
+  kind: ConfigMap
+  metadata:
+    name: first
+- apiVersion: v1
+  kind: ConfigMap
+  metadata:
+    name: second
+---
+---
+apiVersion: v1
+kind: ServiceAccount
+metadata:
+  name: third
+"""
+    documents = load_manifest(manifest)
+
+    assert [doc["metadata"]["name"] for doc in documents] == ["first", "second", "third"]
+
+
+def test_manifest_to_resources_creates_crd_resources():
+    """Test that loading a CRD makes its custom resources loadable too."""
+    crd = {
+        "apiVersion": "apiextensions.k8s.io/v1",
+        "kind": "CustomResourceDefinition",
+        "metadata": {"name": "widgets.example.com"},
+        "spec": {
+            "group": "example.com",
+            "names": {"kind": "Widget", "plural": "widgets", "singular": "widget"},
+            "scope": "Namespaced",
+            "versions": [{"name": "v1", "served": True, "storage": True}],
+        },
+    }
+    widget = {"apiVersion": "example.com/v1", "kind": "Widget", "metadata": {"name": "w"}}
+
+    resources = manifest_to_resources([crd, widget])
+
+    assert [r.kind for r in resources] == ["CustomResourceDefinition", "Widget"]
+
+
 def test_istioctl_remove(mocked_check_output):
     ictl = Istioctl(istioctl_path=ISTIOCTL_BINARY, namespace=NAMESPACE, profile=PROFILE)
 
@@ -440,3 +511,141 @@ def test_istioctl_no_overlay_files(mocked_check_output):
 )
 def test_settings_dict_to_args(settings, expected_args):
     assert settings_dict_to_args(settings) == expected_args
+
+
+@pytest.fixture()
+def istioctl_binary(tmp_path):
+    """Return the path to a fake istioctl binary, as the cache is keyed by the binary."""
+    binary = tmp_path / "istioctl"
+    binary.write_bytes(b"istioctl v1")
+    return binary
+
+
+def test_istioctl_manifest_cache(mocked_check_output, istioctl_binary, tmp_path):
+    """Test that a manifest is only generated once for the same inputs."""
+    cache_dir = tmp_path / "cache"
+    overlay = tmp_path / "overlay.yaml"
+    overlay.write_text("spec: {}")
+
+    def istioctl(setting_overrides):
+        return Istioctl(
+            istioctl_path=str(istioctl_binary),
+            namespace=NAMESPACE,
+            profile=PROFILE,
+            setting_overrides=setting_overrides,
+            overlay_files=[str(overlay)],
+            cache_dir=str(cache_dir),
+        )
+
+    assert istioctl({"k1": "v1"}).manifest_generate(components=["pilot"]) == "stdout"
+    mocked_check_output.return_value = b"other stdout"
+    assert istioctl({"k1": "v1"}).manifest_generate(components=["pilot"]) == "stdout"
+    assert mocked_check_output.call_count == 1
+
+    # Any change to the inputs generates the manifest again
+    assert istioctl({"k1": "v2"}).manifest_generate(components=["pilot"]) == "other stdout"
+    istioctl({"k1": "v1"}).manifest_generate(components=["cni"])
+    overlay.write_text("spec: {values: {}}")
+    istioctl({"k1": "v1"}).manifest_generate(components=["pilot"])
+    istioctl_binary.write_bytes(b"istioctl v2")
+    istioctl({"k1": "v1"}).manifest_generate(components=["pilot"])
+    assert mocked_check_output.call_count == 5
+
+
+def test_istioctl_manifest_cache_applies_overrides(
+    mocked_check_output_manifest, istioctl_binary, tmp_path
+):
+    """Test that overrides are applied to the cached manifests rather than cached with them."""
+    ictl = Istioctl(
+        istioctl_path=str(istioctl_binary),
+        namespace=NAMESPACE,
+        profile=PROFILE,
+        cache_dir=str(tmp_path / "cache"),
+    )
+    hpa_override = HorizontalPodAutoscaler(
+        metadata=ObjectMeta(name="istiod", namespace=NAMESPACE),
+        spec=HorizontalPodAutoscalerSpec(
+            scaleTargetRef=CrossVersionObjectReference(
+                apiVersion="apps/v1", kind="Deployment", name="istiod"
+            ),
+            minReplicas=3,
+            maxReplicas=3,
+        ),
+    )
+
+    ictl.manifest_generate()
+    manifest = ictl.manifest_generate(overrides=[hpa_override])
+
+    mocked_check_output_manifest.assert_called_once()
+    hpa = next(yaml.safe_load_all(manifest))
+    assert hpa["spec"]["minReplicas"] == 3
+
+
+def test_istioctl_manifest_cache_eviction(mocked_check_output, istioctl_binary, tmp_path):
+    """Test that the least recently used manifests are evicted from the cache."""
+    cache_dir = tmp_path / "cache"
+    ictl = Istioctl(
+        istioctl_path=str(istioctl_binary),
+        namespace=NAMESPACE,
+        profile=PROFILE,
+        cache_dir=str(cache_dir),
+        cache_max_entries=2,
+    )
+
+    ictl.manifest_generate(components=["base"])
+    ictl.manifest_generate(components=["pilot"])
+    # Reusing "base" makes "pilot" the least recently used entry
+    ictl.manifest_generate(components=["base"])
+    ictl.manifest_generate(components=["cni"])
+    assert len(list(cache_dir.iterdir())) == 2
+    assert mocked_check_output.call_count == 3
+
+    ictl.manifest_generate(components=["base"])
+    ictl.manifest_generate(components=["pilot"])
+    assert mocked_check_output.call_count == 4
+
+
+def test_istioctl_manifest_cache_disabled(mocked_check_output, istioctl_binary):
+    """Test that istioctl is always run without a cache directory."""
+    ictl = Istioctl(istioctl_path=str(istioctl_binary), namespace=NAMESPACE, profile=PROFILE)
+
+    ictl.manifest_generate()
+    ictl.manifest_generate()
+
+    assert mocked_check_output.call_count == 2
+
+
+def test_istioctl_prerendered_manifest(mocked_check_output, istioctl_binary, tmp_path):
+    """Test that a pre-rendered manifest is used for the same settings, whatever the binary."""
+    mocked_check_output.return_value = f"namespace: {PRERENDERED_NAMESPACE_PLACEHOLDER}".encode()
+    prerendered_dir = tmp_path / "prerendered"
+    renderer = Istioctl(istioctl_path=str(istioctl_binary), profile=PROFILE)
+    manifest_file = renderer.prerender_manifest(str(prerendered_dir), components=["pilot"])
+    assert manifest_file.read_text() == f"namespace: {PRERENDERED_NAMESPACE_PLACEHOLDER}"
+    assert (
+        f"values.global.istioNamespace={PRERENDERED_NAMESPACE_PLACEHOLDER}"
+        in mocked_check_output.call_args.args[0]
+    )
+
+    mocked_check_output.reset_mock()
+    mocked_check_output.return_value = b"other stdout"
+    ictl = Istioctl(
+        istioctl_path=ISTIOCTL_BINARY,
+        namespace=NAMESPACE,
+        profile=PROFILE,
+        prerendered_dir=str(prerendered_dir),
+    )
+    # The manifest is rendered for the namespace of the instance using it
+    assert ictl.manifest_generate(components=["pilot"]) == f"namespace: {NAMESPACE}"
+    other_namespace = Istioctl(
+        istioctl_path=ISTIOCTL_BINARY,
+        namespace="other-model",
+        profile=PROFILE,
+        prerendered_dir=str(prerendered_dir),
+    )
+    assert other_namespace.manifest_generate(components=["pilot"]) == "namespace: other-model"
+    mocked_check_output.assert_not_called()
+
+    # Other settings are not pre-rendered
+    assert ictl.manifest_generate(components=["cni"]) == "other stdout"
+    mocked_check_output.assert_called_once()
@@ -0,0 +1,167 @@
+#!/usr/bin/env python3
+# Copyright 2024 Canonical Ltd.
+# See LICENSE file for licensing details.
+
+"""Unit tests for the mesh-wide Telemetry resource."""
+
+import re
+import uuid
+from unittest.mock import MagicMock, PropertyMock, patch
+
+import httpx
+import ops
+import pytest
+from lightkube import ApiError
+from scenario import Model, State
+
+from charm import ISTIO_CRDS_LABEL, TELEMETRY_LABEL, IstioCoreCharm, sampled_access_log_filter
+
+
+@pytest.mark.parametrize(
+    "config, expected",
+    [
+        ({}, {"providers": [{"name": "envoy"}]}),
+        ({"access-log-mode": "off"}, {"disabled": True}),
+        (
+            {"access-log-mode": "errors"},
+            {"providers": [{"name": "envoy"}], "filter": {"expression": "response.code >= 400"}},
+        ),
+        (
+            {"access-log-mode": "sampled", "access-log-sampling-percentage": 50.0},
+            {
+                "providers": [{"name": "envoy"}],
+                "filter": {
+                    "expression": "response.code >= 400 || request.id.matches('^([0-7][0-9a-f])')"
+                },
+            },
+        ),
+        (
+            {"access-log-mode": "sampled", "access-log-sampling-percentage": 100.0},
+            {"providers": [{"name": "envoy"}]},
+        ),
+    ],
+)
+def test_mesh_telemetry_access_logging(istio_core_context, config, expected):
+    """The access-log-mode config is rendered into the mesh-wide Telemetry resource."""
+    state = State(leader=True, config=config, model=Model(name="istio-system"))
+    with istio_core_context(istio_core_context.on.update_status(), state) as mgr:
+        charm: IstioCoreCharm = mgr.charm
+        telemetry = charm._build_mesh_telemetry()
+
+    assert telemetry.metadata.namespace == "istio-system"
+    assert telemetry.spec == {"accessLogging": [expected]}
+
+
+def test_tracing_sampling_overrides(istio_core_context, workload_tracing):
+    """Each tracing sampling override is rendered as a Telemetry in its namespace."""
+    config = {"tracing-sampling-overrides": "payments=10, checkout=0.5,istio-system=1"}
+    state = State(
+        leader=True,
+        config=config,
+        relations=[workload_tracing],
+        model=Model(name="istio-system"),
+    )
+    with istio_core_context(istio_core_context.on.update_status(), state) as mgr:
+        charm: IstioCoreCharm = mgr.charm
+        mgr.run()
+        with patch.object(type(charm), "lightkube_client", new_callable=PropertyMock):
+            telemetries = charm._build_tracing_sampling_telemetries()
+
+    # The root namespace is left to the mesh-wide tracing-sampling-rate
+    assert [(t.metadata.namespace, t.spec) for t in telemetries] == [
+        ("checkout", {"tracing": [{"randomSamplingPercentage": 0.5}]}),
+        ("payments", {"tracing": [{"randomSamplingPercentage": 10.0}]}),
+    ]
+
+
+def _api_error(code: int) -> ApiError:
+    request = httpx.Request("GET", "http://localhost")
+    response = httpx.Response(code, json={"message": "x", "code": code}, request=request)
+    return ApiError(request=request, response=response)
+
+
+def test_tracing_sampling_overrides_skip_missing_namespaces(istio_core_context, workload_tracing):
+    """Overrides of namespaces that don't exist are skipped instead of failing the hook."""
+    state = State(
+        leader=True,
+        config={"tracing-sampling-overrides": "payments=10,checkout=0.5"},
+        relations=[workload_tracing],
+    )
+
+    def get_namespace(_, name):
+        if name == "payments":
+            raise _api_error(404)
+
+    client = MagicMock()
+    client.get.side_effect = get_namespace
+
+    with istio_core_context(istio_core_context.on.update_status(), state) as mgr:
+        charm: IstioCoreCharm = mgr.charm
+        mgr.run()
+        with patch.object(
+            type(charm), "lightkube_client", new_callable=PropertyMock, return_value=client
+        ):
+            telemetries = charm._build_tracing_sampling_telemetries()
+
+    assert [t.metadata.namespace for t in telemetries] == ["checkout"]
+
+
+def test_tracing_sampling_overrides_need_tracing(istio_core_context):
+    """No sampling override is rendered without a tracing backend."""
+    state = State(leader=True, config={"tracing-sampling-overrides": "payments=10"})
+    with istio_core_context(istio_core_context.on.update_status(), state) as mgr:
+        charm: IstioCoreCharm = mgr.charm
+        assert charm._build_tracing_sampling_telemetries() == []
+
+
+@pytest.mark.parametrize("percentage", [0.5, 1.0, 10.0, 33.3, 75.0])
+def test_sampled_access_log_filter_samples_request_ids(percentage):
+    """The sampled filter matches about the requested share of request IDs."""
+    expression = sampled_access_log_filter(percentage)
+    assert expression is not None
+    (pattern,) = re.findall(r"matches\('(.+)'\)", expression)
+
+    request_ids = [format(prefix, "02x") + uuid.uuid4().hex[2:] for prefix in range(256)]
+    sampled = [request_id for request_id in request_ids if re.match(pattern, request_id)]
+    assert len(sampled) == round(percentage * 256 / 100)
+
+
+def test_sampled_access_log_filter_bounds():
+    """A zero percentage only logs errors, and a full percentage drops the filter."""
+    assert sampled_access_log_filter(0) == "response.code >= 400"
+    assert sampled_access_log_filter(100) is None
+
+
+@pytest.mark.parametrize(
+    "config",
+    [
+        {"access-log-mode": "verbose"},
+        {"access-log-sampling-percentage": 150.0},
+        {"tracing-sampling-rate": -1.0},
+        {"tracing-sampling-overrides": "payments"},
+        {"tracing-sampling-overrides": "payments=many"},
+        {"tracing-sampling-overrides": "Payments=10"},
+        {"tracing-sampling-overrides": "payments=101"},
+    ],
+)
+def test_invalid_config_blocks(istio_core_context, config):
+    """An invalid config sets a blocked status naming the faulty option."""
+    state = istio_core_context.run(
+        istio_core_context.on.config_changed(), State(leader=True, config=config)
+    )
+
+    assert state.unit_status == ops.BlockedStatus(f"Invalid config: {next(iter(config))}")
+
+
+def test_remove_deletes_telemetry_before_crds(istio_core_context):
+    """Telemetry resources are deleted before the Istio CRDs, which would take them along."""
+    deleted = []
+    with istio_core_context(istio_core_context.on.remove(), State(leader=True)) as mgr:
+        charm: IstioCoreCharm = mgr.charm
+        for name in charm._resource_manager_factories:
+            manager = MagicMock()
+            manager.delete.side_effect = lambda name=name: deleted.append(name)
+            charm._resource_manager_factories[name] = lambda manager=manager: manager
+        mgr.run()
+
+    assert deleted.index(TELEMETRY_LABEL) < deleted.index(ISTIO_CRDS_LABEL)